@@ -0,0 +1,26 @@
+"""Add (model_id, display_order) index on parameters
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Lets get_model_parameters filter and sort by display_order straight off the index
+    op.create_index('ix_parameters_model_display', 'parameters', ['model_id', 'display_order'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_parameters_model_display', table_name='parameters')
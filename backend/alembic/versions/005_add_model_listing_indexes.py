@@ -0,0 +1,36 @@
+"""Add indexes for the model listing queries
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Published-only listing: filter + paginate without touching unpublished rows
+    op.create_index(
+        'ix_models_published_id',
+        'economic_models',
+        ['id'],
+        postgresql_where=sa.text('is_published = true'),
+    )
+    # Per-model scenario counts in list_models
+    # (parameters are already covered by ix_parameters_model_display from 004)
+    op.create_index(op.f('ix_scenarios_model_id'), 'scenarios', ['model_id'])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_scenarios_model_id'), table_name='scenarios')
+    op.drop_index('ix_models_published_id', table_name='economic_models')
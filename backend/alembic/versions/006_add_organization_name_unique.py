@@ -0,0 +1,26 @@
+"""Add unique constraint on organizations.name
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Backs the ON CONFLICT (name) insert in create_organization
+    op.create_unique_constraint('uq_organizations_name', 'organizations', ['name'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_organizations_name', 'organizations', type_='unique')
@@ -0,0 +1,66 @@
+"""Replace native enum columns with text + CHECK constraints
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column, enum type, allowed values)
+ENUM_COLUMNS = [
+    ('economic_models', 'model_type', 'modeltype',
+     ['markov', 'decision_tree', 'partition_survival']),
+    ('parameters', 'data_type', 'datatype',
+     ['float', 'int', 'percentage', 'currency', 'boolean']),
+    ('parameters', 'input_type', 'inputtype',
+     ['slider', 'number', 'select', 'checkbox']),
+    ('users', 'role', 'userrole',
+     ['global_admin', 'local_user', 'viewer']),
+]
+
+
+def upgrade() -> None:
+    # Extending the allowed values becomes a constraint swap instead of ALTER TYPE ... ADD VALUE
+    for table, column, enum_name, values in ENUM_COLUMNS:
+        op.alter_column(table, column, server_default=None)
+        op.alter_column(
+            table, column,
+            type_=sa.String(),
+            postgresql_using=f'{column}::text',
+        )
+        allowed = ', '.join(f"'{v}'" for v in values)
+        op.create_check_constraint(f'ck_{table}_{column}', table, f'{column} IN ({allowed})')
+
+    # Restore the server defaults dropped above (they referenced the enum types)
+    op.alter_column('parameters', 'data_type', server_default='float')
+    op.alter_column('parameters', 'input_type', server_default='number')
+
+    for _, _, enum_name, _ in ENUM_COLUMNS:
+        op.execute(f'DROP TYPE IF EXISTS {enum_name}')
+
+
+def downgrade() -> None:
+    # Same values as the CHECK constraints, so every row passes the cast back
+    for _, _, enum_name, values in ENUM_COLUMNS:
+        labels = ', '.join(f"'{v}'" for v in values)
+        op.execute(f'CREATE TYPE {enum_name} AS ENUM ({labels})')
+
+    for table, column, enum_name, _ in ENUM_COLUMNS:
+        op.drop_constraint(f'ck_{table}_{column}', table, type_='check')
+        op.alter_column(table, column, server_default=None)
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE {enum_name} USING {column}::{enum_name}')
+
+    op.alter_column('parameters', 'data_type', server_default='float')
+    op.alter_column('parameters', 'input_type', server_default='number')
@@ -0,0 +1,28 @@
+"""Add indexes on organization foreign keys
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-organization user/scenario counts in list_organizations, and org-scoped listings
+    op.create_index(op.f('ix_users_organization_id'), 'users', ['organization_id'])
+    op.create_index(op.f('ix_scenarios_organization_id'), 'scenarios', ['organization_id'])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_scenarios_organization_id'), table_name='scenarios')
+    op.drop_index(op.f('ix_users_organization_id'), table_name='users')
@@ -0,0 +1,28 @@
+"""Add (created_at, id) indexes for keyset pagination
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Newest-first listings seek on (created_at, id) instead of OFFSET
+    op.create_index('ix_economic_models_created_at_id', 'economic_models', ['created_at', 'id'])
+    op.create_index('ix_organizations_created_at_id', 'organizations', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_organizations_created_at_id', table_name='organizations')
+    op.drop_index('ix_economic_models_created_at_id', table_name='economic_models')
@@ -0,0 +1,58 @@
+"""Use timezone-aware, server-generated created_at/updated_at
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column) pairs filled by now() instead of datetime.utcnow() in the app
+TIMESTAMP_COLUMNS = [
+    ('organizations', 'created_at'),
+    ('organizations', 'updated_at'),
+    ('users', 'created_at'),
+    ('users', 'updated_at'),
+    ('economic_models', 'created_at'),
+    ('economic_models', 'updated_at'),
+    ('parameters', 'created_at'),
+    ('parameters', 'updated_at'),
+    ('scenarios', 'created_at'),
+    ('scenarios', 'updated_at'),
+    ('simulations', 'created_at'),
+]
+
+
+def upgrade() -> None:
+    for table, column in TIMESTAMP_COLUMNS:
+        # Existing values were written with datetime.utcnow()
+        op.execute(f'UPDATE {table} SET {column} = now() WHERE {column} IS NULL')
+        op.alter_column(
+            table, column,
+            type_=sa.DateTime(timezone=True),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+            server_default=sa.func.now(),
+            nullable=False,
+        )
+
+
+def downgrade() -> None:
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=sa.DateTime(),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+            server_default=None,
+            nullable=True,
+        )
@@ -0,0 +1,26 @@
+"""Add index on simulations.scenario_id
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-scenario simulation counts in list_scenarios/get_scenario
+    op.create_index(op.f('ix_simulations_scenario_id'), 'simulations', ['scenario_id'])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_simulations_scenario_id'), table_name='simulations')
@@ -0,0 +1,27 @@
+"""Add (created_at, id) index on scenarios for keyset pagination
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-16 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # list_scenarios seeks on (created_at, id), newest first.
+    # list_parameters reuses ix_parameters_model_display from 004.
+    op.create_index('ix_scenarios_created_at_id', 'scenarios', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_scenarios_created_at_id', table_name='scenarios')
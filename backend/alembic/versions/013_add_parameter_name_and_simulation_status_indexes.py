@@ -0,0 +1,37 @@
+"""Add unique (model_id, name) on parameters and (scenario_id, status, created_at) on simulations
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '013'
+down_revision: Union[str, None] = '012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Duplicate-name checks in create_parameter(s) become index seeks
+    op.create_index('ix_parameters_model_name', 'parameters', ['model_id', 'name'], unique=True)
+
+    # Latest completed simulation per scenario; its scenario_id prefix also
+    # serves the per-scenario counts, so the single-column index from 011 goes
+    op.create_index(
+        'ix_simulations_scenario_status_created',
+        'simulations',
+        ['scenario_id', 'status', 'created_at'],
+    )
+    op.drop_index(op.f('ix_simulations_scenario_id'), table_name='simulations')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_simulations_scenario_id'), 'simulations', ['scenario_id'])
+    op.drop_index('ix_simulations_scenario_status_created', table_name='simulations')
+    op.drop_index('ix_parameters_model_name', table_name='parameters')
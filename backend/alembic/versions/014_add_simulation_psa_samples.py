@@ -0,0 +1,38 @@
+"""Add simulation_psa_samples for per-iteration PSA results
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-16 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '014'
+down_revision: Union[str, None] = '013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # PSA iterations move out of simulations.sensitivity_results into rows,
+    # paged by (simulation_id, iteration) through the primary key
+    op.create_table(
+        'simulation_psa_samples',
+        sa.Column('simulation_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('iteration', sa.Integer(), nullable=False),
+        sa.Column('delta_cost', sa.Float(), nullable=False),
+        sa.Column('delta_qaly', sa.Float(), nullable=False),
+        sa.Column('icer', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['simulation_id'], ['simulations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('simulation_id', 'iteration')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('simulation_psa_samples')
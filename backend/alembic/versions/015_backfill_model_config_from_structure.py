@@ -0,0 +1,47 @@
+"""Backfill economic_models.config from the legacy structure column in batches
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '015'
+down_revision: Union[str, None] = '014'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rows copied per statement
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    # 002 copies structure -> config in one UPDATE; this picks up any row still
+    # missing its config, a bounded batch per statement. It runs inside the
+    # upgrade's transaction (no autocommit block) so the upgrade stays atomic.
+    if op.get_context().as_sql:
+        # Offline (--sql) mode has no rowcount to loop on; emit the plain statement
+        op.execute("UPDATE economic_models SET config = structure WHERE structure IS NOT NULL AND config IS NULL")
+        return
+
+    batch = sa.text(
+        "UPDATE economic_models SET config = structure WHERE id IN ("
+        " SELECT id FROM economic_models"
+        " WHERE structure IS NOT NULL AND config IS NULL"
+        " LIMIT :batch_size)"
+    )
+    conn = op.get_bind()
+    while conn.execute(batch, {"batch_size": BACKFILL_BATCH_SIZE}).rowcount:
+        pass
+
+
+def downgrade() -> None:
+    # Data-only revision: structure is left untouched, so there is nothing to undo
+    pass
@@ -0,0 +1,39 @@
+"""Make parameters.display_order NOT NULL
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '017'
+down_revision: Union[str, None] = '016'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Parameter listings page on (display_order, id); a NULL display_order
+    # compares as unknown in the keyset filter and drops rows from later pages
+    op.execute('UPDATE parameters SET display_order = 0 WHERE display_order IS NULL')
+    op.alter_column(
+        'parameters', 'display_order',
+        existing_type=sa.Integer(),
+        server_default='0',
+        nullable=False,
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'parameters', 'display_order',
+        existing_type=sa.Integer(),
+        server_default='0',
+        nullable=True,
+    )
@@ -1,25 +1,38 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.core.security import verify_password, create_access_token, create_refresh_token
+from app.core.security import verify_password, get_password_hash, create_access_token, create_refresh_token
 from app.schemas.auth import LoginRequest, LoginResponse, UserResponse
 from app.models.user import User
 
 router = APIRouter()
 
+# Built once at import and reused with bound parameters on every login
+_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+
+# Verified against when the email is unknown, so both failure paths cost one bcrypt check
+_DUMMY_PASSWORD_HASH = get_password_hash("ecomodel-dummy-password")
+
 
 @router.post("/login", response_model=LoginResponse)
-async def login(
+def login(
     login_data: LoginRequest,
     db: Session = Depends(get_db)
 ):
     """
     Login endpoint - returns JWT tokens
+
+    Sync on purpose: the DB lookup and bcrypt check block, so FastAPI
+    runs this in its threadpool instead of on the event loop.
     """
     # Find user by email
-    user = db.query(User).filter(User.email == login_data.email).first()
+    user = db.execute(_USER_BY_EMAIL, {"email": login_data.email}).scalar_one_or_none()
+
+    password_hash = user.password_hash if user else _DUMMY_PASSWORD_HASH
+    password_ok = verify_password(login_data.password, password_hash)
 
-    if not user or not verify_password(login_data.password, user.password_hash):
+    if not user or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -32,8 +45,9 @@ async def login(
         )
 
     # Create tokens
-    access_token = create_access_token(data={"sub": str(user.id)})
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
+    # Undashed hex keeps the token short; get_current_user accepts either form
+    access_token = create_access_token(data={"sub": user.id.hex})
+    refresh_token = create_refresh_token(data={"sub": user.id.hex})
 
     return LoginResponse(
         access_token=access_token,
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import bindparam, func, select, tuple_, update
+from typing import List, Optional
+from datetime import datetime
 from uuid import UUID
 
 from app.db.session import get_db
 from app.models.user import User
 from app.models.economic_model import EconomicModel
 from app.models.parameter import Parameter
+from app.models.scenario import Scenario
+from app.core.cache import MODELS_CACHE_NAMESPACE, cache_get, cache_set, cache_clear
+from app.core.pagination import decode_cursor, set_next_cursor
 from app.core.permissions import (
     get_current_user,
     require_global_admin,
@@ -24,40 +29,99 @@ import hashlib
 
 router = APIRouter()
 
+# Seconds a cached list_models page lives; writes clear it sooner
+MODELS_CACHE_TTL = 60
+
+# Correlated counts so stats come back in the same round trip as the models
+parameter_count = (
+    select(func.count(Parameter.id))
+    .where(Parameter.model_id == EconomicModel.id)
+    .correlate(EconomicModel)
+    .scalar_subquery()
+    .label("parameter_count")
+)
+scenario_count = (
+    select(func.count(Scenario.id))
+    .where(Scenario.model_id == EconomicModel.id)
+    .correlate(EconomicModel)
+    .scalar_subquery()
+    .label("scenario_count")
+)
+
+
+def _query_with_stats(db: Session):
+    """Models with their counts and creator name, all in one statement"""
+    return (
+        db.query(EconomicModel, parameter_count, scenario_count, User.full_name)
+        .outerjoin(User, User.id == EconomicModel.created_by_id)
+    )
+
+
+# Built once at import and reused with bound parameters
+_MODEL_BY_ID = select(EconomicModel).where(EconomicModel.id == bindparam("model_id"))
+
+
+def _hash_script(script_content: str) -> str:
+    """SHA256 of a model script, used for versioning"""
+    return hashlib.sha256(script_content.encode()).hexdigest()
+
 
 @router.get("/", response_model=List[ModelWithStats])
 def list_models(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
     show_unpublished: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
-    List economic models.
+    List economic models, newest first.
     - Regular users only see published models
     - Admins can see all models with show_unpublished=true
+    - Pass the X-Next-Cursor header of a full page as `after` to fetch the next one
     """
-    query = db.query(EconomicModel)
-
     # Non-admins only see published models
-    if current_user.role != "global_admin" or not show_unpublished:
+    published_only = current_user.role != "global_admin" or not show_unpublished
+
+    cache_key = f"{MODELS_CACHE_NAMESPACE}:list:{int(published_only)}:{after or skip}:{limit}"
+    cached = cache_get(cache_key)
+    if cached is not None:
+        if cached:
+            set_next_cursor(response, len(cached), limit, cached[-1]["created_at"], cached[-1]["id"])
+        return cached
+
+    query = _query_with_stats(db)
+
+    if published_only:
         query = query.filter(EconomicModel.is_published == True)
 
-    models = query.offset(skip).limit(limit).all()
+    query = query.order_by(EconomicModel.created_at.desc(), EconomicModel.id.desc())
+
+    # Keyset pagination on (created_at, id) when a cursor is given; skip is kept for old clients
+    if after:
+        created_at, model_id = decode_cursor(after, datetime.fromisoformat, UUID)
+        query = query.filter(tuple_(EconomicModel.created_at, EconomicModel.id) < (created_at, model_id))
+    else:
+        query = query.offset(skip)
 
-    # Add stats
+    rows = query.limit(limit).all()
+
+    # Add stats: validate the row once, then attach the stats without re-validating
     result = []
-    for model in models:
-        model_dict = Model.from_orm(model).model_dump()
-        model_dict["parameter_count"] = len(model.parameters)
-        model_dict["scenario_count"] = len(model.scenarios)
+    for model, param_count, scen_count, creator_name in rows:
+        result.append(ModelWithStats.model_construct(
+            **Model.model_validate(model).__dict__,
+            parameter_count=param_count,
+            scenario_count=scen_count,
+            created_by_name=creator_name,
+        ))
 
-        # Get creator name
-        if model.created_by:
-            model_dict["created_by_name"] = model.created_by.full_name
+    cache_set(cache_key, [m.model_dump(mode="json") for m in result], expire=MODELS_CACHE_TTL)
 
-        result.append(ModelWithStats(**model_dict))
+    if result:
+        set_next_cursor(response, len(result), limit, result[-1].created_at, result[-1].id)
 
     return result
 
@@ -72,7 +136,7 @@ def create_model(
     # Calculate script hash if script provided
     script_hash = None
     if model_data.script_content:
-        script_hash = hashlib.sha256(model_data.script_content.encode()).hexdigest()
+        script_hash = _hash_script(model_data.script_content)
 
     # Convert model_type to lowercase DB enum value
     model_type_value = model_data.model_type.lower()
@@ -89,11 +153,14 @@ def create_model(
         is_published=False,  # New models start unpublished
     )
 
+    # Defaults are client-side, so the flushed object is complete; no refresh SELECT needed
     db.add(model)
+    db.flush()
+    response = Model.from_orm(model)
     db.commit()
-    db.refresh(model)
+    cache_clear(MODELS_CACHE_NAMESPACE)
 
-    return Model.from_orm(model)
+    return response
 
 
 @router.get("/{model_id}", response_model=ModelWithStats)
@@ -103,14 +170,16 @@ def get_model(
     current_user: User = Depends(get_current_user),
 ):
     """Get a specific model by ID"""
-    model = db.query(EconomicModel).filter(EconomicModel.id == model_id).first()
+    row = _query_with_stats(db).filter(EconomicModel.id == model_id).first()
 
-    if not model:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Model not found",
         )
 
+    model, param_count, scen_count, creator_name = row
+
     # Non-admins can only see published models
     if current_user.role != "global_admin" and not model.is_published:
         raise HTTPException(
@@ -119,14 +188,12 @@ def get_model(
         )
 
     # Build response with stats
-    model_dict = Model.from_orm(model).model_dump()
-    model_dict["parameter_count"] = len(model.parameters)
-    model_dict["scenario_count"] = len(model.scenarios)
-
-    if model.created_by:
-        model_dict["created_by_name"] = model.created_by.full_name
-
-    return ModelWithStats(**model_dict)
+    return ModelWithStats.model_construct(
+        **Model.model_validate(model).__dict__,
+        parameter_count=param_count,
+        scenario_count=scen_count,
+        created_by_name=creator_name,
+    )
 
 
 @router.patch("/{model_id}", response_model=Model)
@@ -137,7 +204,33 @@ def update_model(
     current_user: User = Depends(require_global_admin),
 ):
     """Update a model. Admin only."""
-    model = db.query(EconomicModel).filter(EconomicModel.id == model_id).first()
+    update_data = model_data.dict(exclude_unset=True)
+
+    # Convert model_type to lowercase DB value
+    if update_data.get("model_type"):
+        update_data["model_type"] = update_data["model_type"].lower()
+
+    # Recalculate hash only if script actually changed
+    if "script_content" in update_data:
+        current_script = db.query(EconomicModel.script_content).filter(
+            EconomicModel.id == model_id
+        ).scalar()
+        new_script = update_data["script_content"]
+        if new_script == current_script:
+            update_data.pop("script_content")
+        elif new_script:
+            update_data["script_hash"] = _hash_script(new_script)
+
+    # UPDATE ... RETURNING gives back the updated row, so no pre-SELECT or refresh
+    if update_data:
+        model = db.scalars(
+            update(EconomicModel)
+            .where(EconomicModel.id == model_id)
+            .values(**update_data)
+            .returning(EconomicModel)
+        ).first()
+    else:
+        model = db.get(EconomicModel, model_id)
 
     if not model:
         raise HTTPException(
@@ -145,22 +238,11 @@ def update_model(
             detail="Model not found",
         )
 
-    # Update fields
-    update_data = model_data.dict(exclude_unset=True)
-
-    # Recalculate hash if script changed
-    if "script_content" in update_data and update_data["script_content"]:
-        update_data["script_hash"] = hashlib.sha256(
-            update_data["script_content"].encode()
-        ).hexdigest()
-
-    for field, value in update_data.items():
-        setattr(model, field, value)
-
+    response = Model.from_orm(model)
     db.commit()
-    db.refresh(model)
+    cache_clear(MODELS_CACHE_NAMESPACE)
 
-    return Model.from_orm(model)
+    return response
 
 
 @router.delete("/{model_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -173,7 +255,7 @@ def delete_model(
     Soft delete a model (unpublish it). Admin only.
     We don't hard delete to preserve referential integrity.
     """
-    model = db.query(EconomicModel).filter(EconomicModel.id == model_id).first()
+    model = db.execute(_MODEL_BY_ID, {"model_id": model_id}).scalar_one_or_none()
 
     if not model:
         raise HTTPException(
@@ -184,6 +266,7 @@ def delete_model(
     # Soft delete: just unpublish
     model.is_published = False
     db.commit()
+    cache_clear(MODELS_CACHE_NAMESPACE)
 
     return None
 
@@ -196,7 +279,7 @@ def publish_model(
     current_user: User = Depends(require_global_admin),
 ):
     """Publish or unpublish a model. Admin only."""
-    model = db.query(EconomicModel).filter(EconomicModel.id == model_id).first()
+    model = db.execute(_MODEL_BY_ID, {"model_id": model_id}).scalar_one_or_none()
 
     if not model:
         raise HTTPException(
@@ -212,10 +295,12 @@ def publish_model(
         )
 
     model.is_published = publish_data.is_published
+    db.flush()  # UPDATE ... RETURNING fills in updated_at
+    response = Model.from_orm(model)
     db.commit()
-    db.refresh(model)
+    cache_clear(MODELS_CACHE_NAMESPACE)
 
-    return Model.from_orm(model)
+    return response
 
 
 @router.get("/{model_id}/parameters", response_model=List[ParameterSchema])
@@ -225,7 +310,10 @@ def get_model_parameters(
     current_user: User = Depends(get_current_user),
 ):
     """Get all parameters for a specific model"""
-    model = db.query(EconomicModel).filter(EconomicModel.id == model_id).first()
+    # Only the publish flag is needed for the access check
+    model = db.query(EconomicModel.is_published).filter(
+        EconomicModel.id == model_id
+    ).first()
 
     if not model:
         raise HTTPException(
@@ -240,7 +328,9 @@ def get_model_parameters(
             detail="Access denied. Model not published.",
         )
 
-    # Return parameters sorted by display_order
-    parameters = sorted(model.parameters, key=lambda p: p.display_order)
+    # Return parameters sorted by display_order (served by ix_parameters_model_display)
+    parameters = db.query(Parameter).filter(
+        Parameter.model_id == model_id
+    ).order_by(Parameter.display_order).all()
 
     return [ParameterSchema.from_orm(p) for p in parameters]
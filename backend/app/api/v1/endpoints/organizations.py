@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from sqlalchemy import bindparam, exists, func, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
+from datetime import datetime
 from uuid import UUID
 
 from app.db.session import get_db
+from app.db.compat import dialect_insert
 from app.models.user import User
 from app.models.organization import Organization
+from app.models.scenario import Scenario
+from app.core.pagination import decode_cursor, set_next_cursor
 from app.core.permissions import (
     get_current_user,
     require_global_admin,
@@ -21,35 +26,67 @@ from app.schemas import (
 
 router = APIRouter()
 
+# Correlated counts so stats come back in the same round trip as the organizations
+user_count = (
+    select(func.count(User.id))
+    .where(User.organization_id == Organization.id)
+    .correlate(Organization)
+    .scalar_subquery()
+    .label("user_count")
+)
+scenario_count = (
+    select(func.count(Scenario.id))
+    .where(Scenario.organization_id == Organization.id)
+    .correlate(Organization)
+    .scalar_subquery()
+    .label("scenario_count")
+)
+
+# Built once at import and reused with bound parameters
+_ORGANIZATION_BY_ID = select(Organization).where(Organization.id == bindparam("organization_id"))
+
 
 @router.get("/", response_model=List[OrganizationWithUsers])
 def list_organizations(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
-    List organizations.
+    List organizations, newest first.
     - Admins see all organizations
     - Regular users only see their own organization
+    - Pass the X-Next-Cursor header of a full page as `after` to fetch the next one
     """
-    if current_user.role == "global_admin":
-        query = db.query(Organization)
+    query = db.query(Organization, user_count, scenario_count)
+    if current_user.role != "global_admin":
+        query = query.filter(Organization.id == current_user.organization_id)
+
+    query = query.order_by(Organization.created_at.desc(), Organization.id.desc())
+
+    # Keyset pagination on (created_at, id) when a cursor is given; skip is kept for old clients
+    if after:
+        created_at, org_id = decode_cursor(after, datetime.fromisoformat, UUID)
+        query = query.filter(tuple_(Organization.created_at, Organization.id) < (created_at, org_id))
     else:
-        query = db.query(Organization).filter(
-            Organization.id == current_user.organization_id
-        )
+        query = query.offset(skip)
 
-    organizations = query.offset(skip).limit(limit).all()
+    rows = query.limit(limit).all()
 
-    # Add stats
+    # Add stats: validate the row once, then attach the stats without re-validating
     result = []
-    for org in organizations:
-        org_dict = OrganizationSchema.from_orm(org).model_dump()
-        org_dict["user_count"] = len(org.users)
-        org_dict["scenario_count"] = len(org.scenarios)
-        result.append(OrganizationWithUsers(**org_dict))
+    for org, users_count, scen_count in rows:
+        result.append(OrganizationWithUsers.model_construct(
+            **OrganizationSchema.model_validate(org).__dict__,
+            user_count=users_count,
+            scenario_count=scen_count,
+        ))
+
+    if result:
+        set_next_cursor(response, len(result), limit, result[-1].created_at, result[-1].id)
 
     return result
 
@@ -61,24 +98,27 @@ def create_organization(
     current_user: User = Depends(require_global_admin),
 ):
     """Create a new organization. Admin only."""
-    # Check if organization name already exists
-    existing = db.query(Organization).filter(
-        Organization.name == org_data.name
-    ).first()
-
-    if existing:
+    # Insert unless the name is taken (uq_organizations_name); no row back means it exists
+    insert = dialect_insert(db.get_bind())
+    stmt = (
+        insert(Organization)
+        .values(**org_data.model_dump())
+        .on_conflict_do_nothing(index_elements=["name"])
+        .returning(Organization)
+    )
+    organization = db.scalars(stmt).first()
+
+    if organization is None:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Organization '{org_data.name}' already exists",
         )
 
-    organization = Organization(**org_data.model_dump())
-
-    db.add(organization)
+    response = OrganizationSchema.from_orm(organization)
     db.commit()
-    db.refresh(organization)
 
-    return OrganizationSchema.from_orm(organization)
+    return response
 
 
 @router.get("/{organization_id}", response_model=OrganizationWithUsers)
@@ -88,9 +128,9 @@ def get_organization(
     current_user: User = Depends(get_current_user),
 ):
     """Get a specific organization"""
-    organization = db.query(Organization).filter(
-        Organization.id == organization_id
-    ).first()
+    organization = db.execute(
+        _ORGANIZATION_BY_ID, {"organization_id": organization_id}
+    ).scalar_one_or_none()
 
     if not organization:
         raise HTTPException(
@@ -100,18 +140,18 @@ def get_organization(
 
     # Non-admins can only see their own organization
     if (current_user.role != "global_admin" and
-        str(organization.id) != str(current_user.organization_id)):
+        organization.id != current_user.organization_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied",
         )
 
     # Build response with stats
-    org_dict = OrganizationSchema.from_orm(organization).model_dump()
-    org_dict["user_count"] = len(organization.users)
-    org_dict["scenario_count"] = len(organization.scenarios)
-
-    return OrganizationWithUsers(**org_dict)
+    return OrganizationWithUsers.model_construct(
+        **OrganizationSchema.model_validate(organization).__dict__,
+        user_count=len(organization.users),
+        scenario_count=len(organization.scenarios),
+    )
 
 
 @router.patch("/{organization_id}", response_model=OrganizationSchema)
@@ -122,9 +162,26 @@ def update_organization(
     current_user: User = Depends(require_global_admin),
 ):
     """Update an organization. Admin only."""
-    organization = db.query(Organization).filter(
-        Organization.id == organization_id
-    ).first()
+    update_data = org_data.dict(exclude_unset=True)
+
+    # UPDATE ... RETURNING gives back the updated row, so no pre-SELECT or refresh.
+    # A rename onto an existing name is rejected by uq_organizations_name.
+    try:
+        if update_data:
+            organization = db.scalars(
+                update(Organization)
+                .where(Organization.id == organization_id)
+                .values(**update_data)
+                .returning(Organization)
+            ).first()
+        else:
+            organization = db.get(Organization, organization_id)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Organization '{org_data.name}' already exists",
+        )
 
     if not organization:
         raise HTTPException(
@@ -132,27 +189,10 @@ def update_organization(
             detail="Organization not found",
         )
 
-    # Check if name is being changed and if it conflicts
-    if org_data.name and org_data.name != organization.name:
-        existing = db.query(Organization).filter(
-            Organization.name == org_data.name
-        ).first()
-
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Organization '{org_data.name}' already exists",
-            )
-
-    # Update fields
-    update_data = org_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(organization, field, value)
-
+    response = OrganizationSchema.from_orm(organization)
     db.commit()
-    db.refresh(organization)
 
-    return OrganizationSchema.from_orm(organization)
+    return response
 
 
 @router.get("/{organization_id}/users", response_model=List[UserSchema])
@@ -170,24 +210,21 @@ def list_organization_users(
     """
     # Check access
     if (current_user.role != "global_admin" and
-        str(organization_id) != str(current_user.organization_id)):
+        organization_id != current_user.organization_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied",
         )
 
-    organization = db.query(Organization).filter(
-        Organization.id == organization_id
-    ).first()
+    users = db.query(User).filter(
+        User.organization_id == organization_id
+    ).offset(skip).limit(limit).all()
 
-    if not organization:
+    # Any user row proves the organization exists; only an empty page needs the check
+    if not users and not db.scalar(select(exists().where(Organization.id == organization_id))):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Organization not found",
         )
 
-    users = db.query(User).filter(
-        User.organization_id == organization_id
-    ).offset(skip).limit(limit).all()
-
     return [UserSchema.from_orm(u) for u in users]
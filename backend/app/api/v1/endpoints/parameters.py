@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import exists, insert, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
 from uuid import UUID
 
 from app.db.session import get_db
 from app.models.user import User
 from app.models.parameter import Parameter
 from app.models.economic_model import EconomicModel
+from app.db.compat import utcnow
+from app.core.cache import MODELS_CACHE_NAMESPACE, cache_clear
+from app.core.pagination import decode_cursor, set_next_cursor
 from app.core.permissions import (
     get_current_user,
     require_global_admin,
@@ -21,18 +26,44 @@ from app.schemas import (
 
 router = APIRouter()
 
+# Columns behind the response fields of list/get_parameter. Selecting them
+# directly returns plain rows, with no ORM instances or identity-map work
+_PARAMETER_COLUMNS = tuple(getattr(Parameter, field) for field in ParameterSchema.model_fields)
+
+
+def _query_with_model_name(db: Session):
+    """Parameter columns with their model's name, in one statement"""
+    return (
+        db.query(*_PARAMETER_COLUMNS, EconomicModel.name.label("model_name"))
+        .outerjoin(EconomicModel, EconomicModel.id == Parameter.model_id)
+    )
+
+
+def _touch_model(db: Session, model_id: UUID) -> None:
+    """Bump the model's updated_at; scenario validation caches parameter names on it"""
+    db.execute(
+        update(EconomicModel)
+        .where(EconomicModel.id == model_id)
+        .values(updated_at=utcnow())
+    )
+
 
 @router.get("/", response_model=List[ParameterWithModel])
 def list_parameters(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
     model_id: UUID | None = None,
     category: str | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """List parameters with optional filters"""
-    query = db.query(Parameter)
+    """
+    List parameters with optional filters.
+    Pass the X-Next-Cursor header of a full page as `after` to fetch the next one.
+    """
+    query = _query_with_model_name(db)
 
     if model_id:
         query = query.filter(Parameter.model_id == model_id)
@@ -40,20 +71,24 @@ def list_parameters(
     if category:
         query = query.filter(Parameter.category == category)
 
-    # Order by display_order
-    query = query.order_by(Parameter.display_order)
+    # Order by display_order (id breaks ties so pages are stable)
+    query = query.order_by(Parameter.display_order, Parameter.id)
 
-    parameters = query.offset(skip).limit(limit).all()
+    # Keyset pagination on (display_order, id) when a cursor is given; skip is kept for old clients
+    if after:
+        display_order, param_id = decode_cursor(after, int, UUID)
+        query = query.filter(tuple_(Parameter.display_order, Parameter.id) > (display_order, param_id))
+    else:
+        query = query.offset(skip)
 
-    # Build response with model details
-    result = []
-    for param in parameters:
-        param_dict = ParameterSchema.from_orm(param).model_dump()
+    rows = query.limit(limit).all()
 
-        if param.model:
-            param_dict["model_name"] = param.model.name
+    # Build response with model details. Rows come from the DB and already match
+    # the schema, so construct directly instead of validate -> dump -> validate
+    result = [ParameterWithModel.model_construct(**row._mapping) for row in rows]
 
-        result.append(ParameterWithModel(**param_dict))
+    if result:
+        set_next_cursor(response, len(result), limit, result[-1].display_order, result[-1].id)
 
     return result
 
@@ -66,35 +101,36 @@ def create_parameter(
 ):
     """Create a new parameter. Admin only."""
     # Verify model exists
-    model = db.query(EconomicModel).filter(
-        EconomicModel.id == parameter_data.model_id
-    ).first()
-
-    if not model:
+    if not db.scalar(select(exists().where(EconomicModel.id == parameter_data.model_id))):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Economic model not found",
         )
 
     # Check if parameter name already exists in this model
-    existing = db.query(Parameter).filter(
+    if db.scalar(select(exists().where(
         Parameter.model_id == parameter_data.model_id,
-        Parameter.name == parameter_data.name
-    ).first()
-
-    if existing:
+        Parameter.name == parameter_data.name,
+    ))):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Parameter '{parameter_data.name}' already exists in this model",
         )
 
-    parameter = Parameter(**parameter_data.model_dump())
+    param_dict = parameter_data.model_dump()
+    # Normalize enum values to lowercase for DB compatibility
+    param_dict['data_type'] = param_dict['data_type'].lower()
+    param_dict['input_type'] = param_dict['input_type'].lower()
+    parameter = Parameter(**param_dict)
 
     db.add(parameter)
+    _touch_model(db, parameter_data.model_id)
+    db.flush()  # INSERT ... RETURNING fills in the server defaults
+    response = ParameterSchema.from_orm(parameter)
     db.commit()
-    db.refresh(parameter)
+    cache_clear(MODELS_CACHE_NAMESPACE)  # parameter_count changed
 
-    return ParameterSchema.from_orm(parameter)
+    return response
 
 
 @router.post("/bulk", response_model=List[ParameterSchema], status_code=status.HTTP_201_CREATED)
@@ -105,11 +141,7 @@ def create_parameters_bulk(
 ):
     """Create multiple parameters at once. Admin only."""
     # Verify model exists
-    model = db.query(EconomicModel).filter(
-        EconomicModel.id == bulk_data.model_id
-    ).first()
-
-    if not model:
+    if not db.scalar(select(exists().where(EconomicModel.id == bulk_data.model_id))):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Economic model not found",
@@ -137,7 +169,7 @@ def create_parameters_bulk(
         )
 
     # Create all parameters
-    created_params = []
+    rows = []
     for param_data in bulk_data.parameters:
         param_dict = param_data.model_dump()
         # Normalize enum values to lowercase for DB compatibility
@@ -145,20 +177,20 @@ def create_parameters_bulk(
             param_dict['data_type'] = param_dict['data_type'].lower()
         if 'input_type' in param_dict and param_dict['input_type']:
             param_dict['input_type'] = param_dict['input_type'].lower()
-        parameter = Parameter(
-            **param_dict,
-            model_id=bulk_data.model_id
-        )
-        db.add(parameter)
-        created_params.append(parameter)
+        rows.append({**param_dict, "model_id": bulk_data.model_id})
 
-    db.commit()
+    # One multi-row INSERT ... RETURNING instead of an INSERT plus refresh SELECT per row
+    created_params = db.scalars(
+        insert(Parameter).returning(Parameter, sort_by_parameter_order=True),
+        rows,
+    ).all()
+    response = [ParameterSchema.from_orm(p) for p in created_params]
+    _touch_model(db, bulk_data.model_id)
 
-    # Refresh all
-    for param in created_params:
-        db.refresh(param)
+    db.commit()
+    cache_clear(MODELS_CACHE_NAMESPACE)  # parameter_count changed
 
-    return [ParameterSchema.from_orm(p) for p in created_params]
+    return response
 
 
 @router.get("/{parameter_id}", response_model=ParameterWithModel)
@@ -168,21 +200,16 @@ def get_parameter(
     current_user: User = Depends(get_current_user),
 ):
     """Get a specific parameter"""
-    parameter = db.query(Parameter).filter(Parameter.id == parameter_id).first()
+    row = _query_with_model_name(db).filter(Parameter.id == parameter_id).first()
 
-    if not parameter:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Parameter not found",
         )
 
     # Build response with model details
-    param_dict = ParameterSchema.from_orm(parameter).model_dump()
-
-    if parameter.model:
-        param_dict["model_name"] = parameter.model.name
-
-    return ParameterWithModel(**param_dict)
+    return ParameterWithModel.model_construct(**row._mapping)
 
 
 @router.patch("/{parameter_id}", response_model=ParameterSchema)
@@ -193,7 +220,34 @@ def update_parameter(
     current_user: User = Depends(require_global_admin),
 ):
     """Update a parameter. Admin only."""
-    parameter = db.query(Parameter).filter(Parameter.id == parameter_id).first()
+    update_data = parameter_data.model_dump(exclude_unset=True)
+    # Normalize enum values to lowercase for DB compatibility
+    for field in ('data_type', 'input_type'):
+        if update_data.get(field):
+            update_data[field] = update_data[field].lower()
+    # display_order is NOT NULL (keyset pagination sorts on it); null means the default 0
+    if 'display_order' in update_data and update_data['display_order'] is None:
+        update_data['display_order'] = 0
+
+    # UPDATE ... RETURNING writes only the given columns and gives back the row,
+    # so no pre-SELECT or refresh. A rename onto another parameter of the same
+    # model is rejected by ix_parameters_model_name.
+    try:
+        if update_data:
+            parameter = db.scalars(
+                update(Parameter)
+                .where(Parameter.id == parameter_id)
+                .values(**update_data)
+                .returning(Parameter)
+            ).first()
+        else:
+            parameter = db.get(Parameter, parameter_id)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Parameter '{parameter_data.name}' already exists in this model",
+        )
 
     if not parameter:
         raise HTTPException(
@@ -201,28 +255,12 @@ def update_parameter(
             detail="Parameter not found",
         )
 
-    # Check if name is being changed and if it conflicts
-    if parameter_data.name and parameter_data.name != parameter.name:
-        existing = db.query(Parameter).filter(
-            Parameter.model_id == parameter.model_id,
-            Parameter.name == parameter_data.name
-        ).first()
-
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Parameter '{parameter_data.name}' already exists in this model",
-            )
-
-    # Update fields
-    update_data = parameter_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(parameter, field, value)
-
+    response = ParameterSchema.from_orm(parameter)
+    _touch_model(db, parameter.model_id)
     db.commit()
-    db.refresh(parameter)
+    cache_clear(MODELS_CACHE_NAMESPACE)  # model updated_at changed
 
-    return ParameterSchema.from_orm(parameter)
+    return response
 
 
 @router.delete("/{parameter_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -235,22 +273,31 @@ def delete_parameter(
     Delete a parameter. Admin only.
     Note: This may affect existing scenarios that reference this parameter.
     """
-    parameter = db.query(Parameter).filter(Parameter.id == parameter_id).first()
-
-    if not parameter:
+    # Only the owning model's id and publish flag are needed; no ORM objects
+    row = (
+        db.query(Parameter.model_id, EconomicModel.is_published)
+        .join(EconomicModel, EconomicModel.id == Parameter.model_id)
+        .filter(Parameter.id == parameter_id)
+        .first()
+    )
+
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Parameter not found",
         )
 
     # Check if model is published
-    if parameter.model.is_published:
+    model_id, is_published = row
+    if is_published:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete parameters from published model. Unpublish first.",
         )
 
-    db.delete(parameter)
+    db.query(Parameter).filter(Parameter.id == parameter_id).delete(synchronize_session=False)
+    _touch_model(db, model_id)
     db.commit()
+    cache_clear(MODELS_CACHE_NAMESPACE)  # parameter_count changed
 
     return None
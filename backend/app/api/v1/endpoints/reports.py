@@ -3,107 +3,197 @@ Reports API endpoints
 Handles PDF and Excel report generation
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import BinaryIO, Optional
+from uuid import UUID
+import tempfile
 
 from app.db.session import get_db
-from app.core.permissions import get_current_user
+from app.core.permissions import get_current_user, filter_by_organization
+from app.core.responses import DefaultJSONResponse
 from app.models.user import User
+from app.models.organization import Organization
+from app.models.report import ReportFormat, ReportJob, ReportJobStatus
 from app.models.scenario import Scenario
-from app.models.simulation import Simulation
+from app.models.simulation import Simulation, SimulationStatus
+from app.schemas.report import ReportStatus
 from app.services.report_service import report_service
+from app.services.simulation_reports import (
+    EXCEL_MEDIA_TYPE, PDF_MEDIA_TYPE, excel_report_kwargs, pdf_report_kwargs, report_filename
+)
+from app.tasks.celery_app import queue_enabled
+from app.tasks.reports import fail_report_job, run_report_task
 
 router = APIRouter()
 
+# Rendered reports stay in memory up to this size, then spill to a temp file
+REPORT_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+
+MEDIA_TYPES = {ReportFormat.PDF.value: PDF_MEDIA_TYPE, ReportFormat.EXCEL.value: EXCEL_MEDIA_TYPE}
+
+
+def _load_simulation(db: Session, simulation_id: str, current_user: User, *columns):
+    """
+    Simulation and its scenario in one statement, with organization access
+    enforced in the WHERE clause. Simulations the user cannot see are a 404,
+    same as missing ones.
+    """
+    query = (
+        db.query(Simulation, Scenario, *columns)
+        .join(Scenario, Scenario.id == Simulation.scenario_id)
+        .filter(Simulation.id == simulation_id)
+    )
+    row = filter_by_organization(query, Scenario, current_user).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Simulation not found")
+    return row
+
+
+def _stream_report(buffer: BinaryIO, media_type: str, filename: str) -> StreamingResponse:
+    """Stream a rendered report from its spool file in chunks, closing it afterwards"""
+    buffer.seek(0)
+    return StreamingResponse(
+        iter(lambda: buffer.read(STREAM_CHUNK_SIZE), b""),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}"
+        },
+        background=BackgroundTask(buffer.close),
+    )
+
+
+# What a status poll reads: never the rendered content
+_JOB_STATUS_COLUMNS = (
+    ReportJob.id, ReportJob.status, ReportJob.created_at, ReportJob.completed_at, ReportJob.error_message
+)
+
+
+def _job_status(job) -> ReportStatus:
+    """ReportStatus body for a report job (entity or _JOB_STATUS_COLUMNS row)"""
+    return ReportStatus(
+        id=job.id,
+        status=job.status,
+        progress=100 if job.status == ReportJobStatus.COMPLETED.value else 0,
+        created_at=job.created_at,
+        completed_at=job.completed_at,
+        error_message=job.error_message,
+    )
+
+
+def _queue_report(
+    db: Session,
+    simulation: Simulation,
+    current_user: User,
+    report_format: ReportFormat,
+    **options
+) -> Response:
+    """Store a PENDING report job, hand it to the worker and answer 202 with its status"""
+    job = ReportJob(
+        simulation_id=simulation.id,
+        created_by_id=current_user.id,
+        format=report_format.value,
+        options=options,
+        status=ReportJobStatus.PENDING.value,
+    )
+    db.add(job)
+    # The worker loads the job by id, so commit it before queueing
+    db.commit()
+    try:
+        run_report_task.apply_async((str(job.id),), task_id=str(job.id))
+    except Exception as e:
+        # Broker unreachable: fail the job so polls of it end
+        fail_report_job(db, job, e)
+        raise HTTPException(status_code=500, detail=f"Could not queue report: {str(e)}")
+
+    return DefaultJSONResponse(
+        _job_status(job).model_dump(mode="json"),
+        status_code=status.HTTP_202_ACCEPTED,
+    )
+
+
+def _load_job(db: Session, job_id: UUID, current_user: User, *columns):
+    """Report job columns, with organization access enforced through its simulation's scenario"""
+    query = (
+        db.query(*columns)
+        .join(Simulation, Simulation.id == ReportJob.simulation_id)
+        .join(Scenario, Scenario.id == Simulation.scenario_id)
+        .filter(ReportJob.id == job_id)
+    )
+    row = filter_by_organization(query, Scenario, current_user).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return row
+
+
+def _user_organization_name(current_user: User):
+    """Scalar subquery for the user's organization name, shown on PDF reports"""
+    return (
+        select(Organization.name)
+        .where(Organization.id == current_user.organization_id)
+        .scalar_subquery()
+    )
+
+
+def _pdf_report_response(
+    db: Session,
+    simulation: Simulation,
+    scenario: Scenario,
+    organization: Optional[str],
+    current_user: User,
+) -> StreamingResponse:
+    """Render the PDF report for an already loaded simulation and scenario"""
+    report_kwargs = pdf_report_kwargs(simulation, scenario, organization)
+    filename = report_filename(scenario, simulation, "pdf")
+
+    # Everything the report needs is loaded; hand the connection back to the
+    # pool instead of holding it while the document renders
+    db.close()
+
+    # Generate PDF into a spool file rather than a bytes copy of the document
+    buffer = tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_MAX_SIZE)
+    try:
+        report_service.generate_pdf_report(
+            user_email=current_user.email,
+            output=buffer,
+            **report_kwargs
+        )
+
+        # Return PDF as download
+        return _stream_report(buffer, PDF_MEDIA_TYPE, filename)
+    except Exception as e:
+        buffer.close()
+        raise HTTPException(status_code=500, detail=f"Error generating PDF: {str(e)}")
+
 
 @router.post("/pdf/{simulation_id}")
 def generate_pdf_report(
     simulation_id: str,
+    queued: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Generate PDF report for a simulation
 
-    Returns PDF file as download
+    Returns PDF file as download. With ?queued=true and Celery enabled the
+    report is rendered by the worker instead: the response is 202 with the
+    job status; poll GET /reports/jobs/{id} and fetch the file from
+    GET /reports/jobs/{id}/download once it is COMPLETED.
     """
-    # Get simulation
-    simulation = db.query(Simulation).filter(Simulation.id == simulation_id).first()
-    if not simulation:
-        raise HTTPException(status_code=404, detail="Simulation not found")
+    # Get simulation, scenario and the user's organization name (access checked in the query)
+    simulation, scenario, organization = _load_simulation(
+        db, simulation_id, current_user, _user_organization_name(current_user)
+    )
 
-    # Check permission
-    scenario = db.query(Scenario).filter(Scenario.id == simulation.scenario_id).first()
-    if not scenario:
-        raise HTTPException(status_code=404, detail="Scenario not found")
-
-    if current_user.role != "global_admin" and scenario.organization_id != current_user.organization_id:
-        raise HTTPException(status_code=403, detail="Access denied")
-
-    # Prepare data
-    scenario_name = scenario.name
-    organization = current_user.organization.name if current_user.organization else "N/A"
-    parameters = simulation.input_snapshot or scenario.parameter_values
-
-    # Get results
-    results = simulation.results or {}
-
-    # Extract drug A and drug B results
-    # Assuming results structure has both strategies
-    results_drug_a = {
-        'total_costs': results.get('drug_a', {}).get('total_costs', 0),
-        'total_qalys': results.get('drug_a', {}).get('total_qalys', 0),
-        'life_years': results.get('drug_a', {}).get('life_years', 0),
-        'discounted_costs': results.get('drug_a', {}).get('discounted_costs', 0),
-        'discounted_qalys': results.get('drug_a', {}).get('discounted_qalys', 0),
-    }
-
-    results_drug_b = {
-        'total_costs': results.get('drug_b', {}).get('total_costs', 0),
-        'total_qalys': results.get('drug_b', {}).get('total_qalys', 0),
-        'life_years': results.get('drug_b', {}).get('life_years', 0),
-        'discounted_costs': results.get('drug_b', {}).get('discounted_costs', 0),
-        'discounted_qalys': results.get('drug_b', {}).get('discounted_qalys', 0),
-    }
-
-    # PSA results if available
-    psa_results = None
-    if simulation.simulation_type == "PSA" and simulation.sensitivity_results:
-        psa_results = {
-            'mean_icer': simulation.sensitivity_results.get('mean_icer', 0),
-            'percentiles': {
-                'p2_5': simulation.sensitivity_results.get('percentiles', {}).get('p2_5', 0),
-                'p50': simulation.sensitivity_results.get('percentiles', {}).get('p50', 0),
-                'p97_5': simulation.sensitivity_results.get('percentiles', {}).get('p97_5', 0),
-            },
-            'prob_cost_effective': simulation.sensitivity_results.get('prob_cost_effective', 0),
-            'n_iterations': simulation.sensitivity_results.get('n_iterations', 1000),
-        }
+    if queued and queue_enabled():
+        return _queue_report(db, simulation, current_user, ReportFormat.PDF)
 
-    # Generate PDF
-    try:
-        pdf_bytes = report_service.generate_pdf_report(
-            scenario_name=scenario_name,
-            user_email=current_user.email,
-            organization=organization,
-            parameters=parameters,
-            results_drug_a=results_drug_a,
-            results_drug_b=results_drug_b,
-            psa_results=psa_results
-        )
-
-        # Return PDF as download
-        filename = f"ecomodel_report_{scenario.name.replace(' ', '_')}_{simulation_id[:8]}.pdf"
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}"
-            }
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating PDF: {str(e)}")
+    return _pdf_report_response(db, simulation, scenario, organization, current_user)
 
 
 @router.post("/excel/{simulation_id}")
@@ -111,6 +201,7 @@ def generate_excel_report(
     simulation_id: str,
     include_psa: bool = False,
     include_tornado: bool = False,
+    queued: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -121,86 +212,38 @@ def generate_excel_report(
         simulation_id: ID of simulation
         include_psa: Include PSA sheet if available
         include_tornado: Include Tornado sheet if available
+        queued: Render on the Celery worker and answer 202 (see generate_pdf_report)
 
     Returns Excel file as download
     """
-    # Get simulation
-    simulation = db.query(Simulation).filter(Simulation.id == simulation_id).first()
-    if not simulation:
-        raise HTTPException(status_code=404, detail="Simulation not found")
+    # Get simulation and scenario (access checked in the query)
+    simulation, scenario = _load_simulation(db, simulation_id, current_user)
 
-    # Check permission
-    scenario = db.query(Scenario).filter(Scenario.id == simulation.scenario_id).first()
-    if not scenario:
-        raise HTTPException(status_code=404, detail="Scenario not found")
-
-    if current_user.role != "global_admin" and scenario.organization_id != current_user.organization_id:
-        raise HTTPException(status_code=403, detail="Access denied")
-
-    # Prepare data
-    scenario_name = scenario.name
-    parameters = simulation.input_snapshot or scenario.parameter_values
-
-    # Get results
-    results = simulation.results or {}
-
-    results_drug_a = {
-        'total_costs': results.get('drug_a', {}).get('total_costs', 0),
-        'total_qalys': results.get('drug_a', {}).get('total_qalys', 0),
-        'life_years': results.get('drug_a', {}).get('life_years', 0),
-        'discounted_costs': results.get('drug_a', {}).get('discounted_costs', 0),
-        'discounted_qalys': results.get('drug_a', {}).get('discounted_qalys', 0),
-    }
-
-    results_drug_b = {
-        'total_costs': results.get('drug_b', {}).get('total_costs', 0),
-        'total_qalys': results.get('drug_b', {}).get('total_qalys', 0),
-        'life_years': results.get('drug_b', {}).get('life_years', 0),
-        'discounted_costs': results.get('drug_b', {}).get('discounted_costs', 0),
-        'discounted_qalys': results.get('drug_b', {}).get('discounted_qalys', 0),
-    }
-
-    # Optional results
-    psa_results = None
-    tornado_results = None
-
-    if include_psa and simulation.simulation_type == "PSA" and simulation.sensitivity_results:
-        psa_results = {
-            'mean_icer': simulation.sensitivity_results.get('mean_icer', 0),
-            'percentiles': {
-                'p2_5': simulation.sensitivity_results.get('percentiles', {}).get('p2_5', 0),
-                'p50': simulation.sensitivity_results.get('percentiles', {}).get('p50', 0),
-                'p97_5': simulation.sensitivity_results.get('percentiles', {}).get('p97_5', 0),
-            },
-            'prob_cost_effective': simulation.sensitivity_results.get('prob_cost_effective', 0),
-            'n_iterations': simulation.sensitivity_results.get('n_iterations', 1000),
-        }
+    if queued and queue_enabled():
+        return _queue_report(
+            db, simulation, current_user, ReportFormat.EXCEL,
+            include_psa=include_psa, include_tornado=include_tornado
+        )
+
+    report_kwargs = excel_report_kwargs(simulation, scenario, include_psa, include_tornado)
+    filename = report_filename(scenario, simulation, "xlsx")
 
-    if include_tornado and simulation.simulation_type == "TORNADO" and simulation.sensitivity_results:
-        tornado_results = simulation.sensitivity_results
+    # Release the connection before rendering (see generate_pdf_report)
+    db.close()
 
-    # Generate Excel
+    # Generate Excel into a spool file (see generate_pdf_report)
+    buffer = tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_MAX_SIZE)
     try:
-        excel_bytes = report_service.generate_excel_report(
-            scenario_name=scenario_name,
+        report_service.generate_excel_report(
             user_email=current_user.email,
-            parameters=parameters,
-            results_drug_a=results_drug_a,
-            results_drug_b=results_drug_b,
-            psa_results=psa_results,
-            tornado_results=tornado_results
+            output=buffer,
+            **report_kwargs
         )
 
         # Return Excel as download
-        filename = f"ecomodel_report_{scenario.name.replace(' ', '_')}_{simulation_id[:8]}.xlsx"
-        return Response(
-            content=excel_bytes,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}"
-            }
-        )
+        return _stream_report(buffer, EXCEL_MEDIA_TYPE, filename)
     except Exception as e:
+        buffer.close()
         raise HTTPException(status_code=500, detail=f"Error generating Excel: {str(e)}")
 
 
@@ -211,31 +254,64 @@ def generate_pdf_from_scenario(
     current_user: User = Depends(get_current_user)
 ):
     """
-    Generate PDF report from scenario's last simulation
-
-    If no simulation exists, runs deterministic analysis first
+    Generate PDF report from scenario's last completed simulation
     """
-    # Get scenario
-    scenario = db.query(Scenario).filter(Scenario.id == scenario_id).first()
-    if not scenario:
-        raise HTTPException(status_code=404, detail="Scenario not found")
-
-    # Check permission
-    if current_user.role != "global_admin" and scenario.organization_id != current_user.organization_id:
-        raise HTTPException(status_code=403, detail="Access denied")
-
-    # Get most recent simulation for this scenario
-    simulation = db.query(Simulation)\
-        .filter(Simulation.scenario_id == scenario_id)\
-        .filter(Simulation.status == "COMPLETED")\
-        .order_by(Simulation.created_at.desc())\
-        .first()
-
-    if not simulation:
+    # Most recent completed simulation with its scenario, access checked in the query
+    query = (
+        db.query(Simulation, Scenario, _user_organization_name(current_user))
+        .join(Scenario, Scenario.id == Simulation.scenario_id)
+        .filter(Scenario.id == scenario_id)
+        .filter(Simulation.status == SimulationStatus.COMPLETED)
+        .order_by(Simulation.created_at.desc())
+    )
+    row = filter_by_organization(query, Scenario, current_user).first()
+
+    if row is None:
+        # Tell an unknown (or other organization's) scenario apart from one without results
+        scenario_query = db.query(Scenario.id).filter(Scenario.id == scenario_id)
+        if not filter_by_organization(scenario_query, Scenario, current_user).first():
+            raise HTTPException(status_code=404, detail="Scenario not found")
         raise HTTPException(
             status_code=404,
             detail="No completed simulation found for this scenario. Please run an analysis first."
         )
 
-    # Redirect to simulation PDF endpoint
-    return generate_pdf_report(simulation.id, db, current_user)
+    simulation, scenario, organization = row
+    return _pdf_report_response(db, simulation, scenario, organization, current_user)
+
+
+@router.get("/jobs/{job_id}", response_model=ReportStatus)
+def get_report_job(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Status of a queued report (PENDING, GENERATING, COMPLETED or FAILED)
+    """
+    return _job_status(_load_job(db, job_id, current_user, *_JOB_STATUS_COLUMNS))
+
+
+@router.get("/jobs/{job_id}/download")
+def download_report_job(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    The rendered file of a COMPLETED report job; 409 while it is still pending
+    """
+    job_status, job_format, filename, content = _load_job(
+        db, job_id, current_user,
+        ReportJob.status, ReportJob.format, ReportJob.filename, ReportJob.content
+    )
+    if job_status != ReportJobStatus.COMPLETED.value:
+        raise HTTPException(status_code=409, detail=f"Report is not ready (status: {job_status})")
+
+    return Response(
+        content=content,
+        media_type=MEDIA_TYPES[job_format],
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}"
+        }
+    )
@@ -1,12 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import exists, func, insert, literal, select, tuple_, update
+from typing import FrozenSet, List, Optional
+from datetime import datetime
 from uuid import UUID
+import threading
 
 from app.db.session import get_db
+from app.db.compat import GUID
 from app.models.user import User
 from app.models.scenario import Scenario
 from app.models.economic_model import EconomicModel
+from app.models.organization import Organization
+from app.models.simulation import Simulation
+from app.models.parameter import Parameter
+from app.core.cache import MODELS_CACHE_NAMESPACE, cache_clear
+from app.core.pagination import decode_cursor, set_next_cursor
 from app.core.permissions import (
     get_current_user,
     filter_by_organization,
@@ -22,21 +31,76 @@ from app.schemas import (
 
 router = APIRouter()
 
+# Columns behind the response fields of list/get_scenario. Selecting them
+# directly returns plain rows, with no ORM instances or identity-map work
+_SCENARIO_COLUMNS = tuple(getattr(Scenario, field) for field in ScenarioSchema.model_fields)
+
+# Correlated count so only an integer per scenario comes back, not every
+# simulation row (with its results payload)
+simulation_count = (
+    select(func.count(Simulation.id))
+    .where(Simulation.scenario_id == Scenario.id)
+    .correlate(Scenario)
+    .scalar_subquery()
+    .label("simulation_count")
+)
+
+# Parameter names per (model id, model.updated_at). Parameter writes bump the
+# model's updated_at, so a changed model simply misses and old keys age out
+PARAM_NAMES_CACHE_SIZE = 256
+_param_names_cache: dict = {}
+_param_names_lock = threading.Lock()
+
+
+def _model_param_names(db: Session, model: EconomicModel) -> FrozenSet[str]:
+    """Names of the model's parameters, for validating scenario parameter_values"""
+    key = (model.id, model.updated_at)
+    names = _param_names_cache.get(key)
+    if names is None:
+        names = frozenset(
+            name for (name,) in db.query(Parameter.name).filter(Parameter.model_id == model.id)
+        )
+        with _param_names_lock:
+            if len(_param_names_cache) >= PARAM_NAMES_CACHE_SIZE:
+                # Dicts keep insertion order; drop the oldest entry
+                _param_names_cache.pop(next(iter(_param_names_cache)), None)
+            _param_names_cache[key] = names
+    return names
+
+
+def _query_with_details(db: Session):
+    """Scenario columns with model/organization/creator names and simulation count in one statement"""
+    return (
+        db.query(
+            *_SCENARIO_COLUMNS,
+            EconomicModel.name.label("model_name"),
+            Organization.name.label("organization_name"),
+            User.full_name.label("created_by_name"),
+            simulation_count,
+        )
+        .outerjoin(EconomicModel, EconomicModel.id == Scenario.model_id)
+        .outerjoin(Organization, Organization.id == Scenario.organization_id)
+        .outerjoin(User, User.id == Scenario.created_by_id)
+    )
+
 
 @router.get("/", response_model=List[ScenarioWithDetails])
 def list_scenarios(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
     model_id: UUID | None = None,
     country_code: str | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
-    List scenarios filtered by user's organization.
+    List scenarios filtered by user's organization, newest first.
     Admins see all scenarios.
+    Pass the X-Next-Cursor header of a full page as `after` to fetch the next one.
     """
-    query = db.query(Scenario)
+    query = _query_with_details(db)
 
     # Filter by organization (admins see all)
     query = filter_by_organization(query, Scenario, current_user)
@@ -48,26 +112,23 @@ def list_scenarios(
     if country_code:
         query = query.filter(Scenario.country_code == country_code)
 
-    scenarios = query.offset(skip).limit(limit).all()
+    query = query.order_by(Scenario.created_at.desc(), Scenario.id.desc())
 
-    # Build response with details
-    result = []
-    for scenario in scenarios:
-        scenario_dict = ScenarioSchema.from_orm(scenario).model_dump()
-
-        # Add related entity details
-        if scenario.model:
-            scenario_dict["model_name"] = scenario.model.name
+    # Keyset pagination on (created_at, id) when a cursor is given; skip is kept for old clients
+    if after:
+        created_at, cursor_id = decode_cursor(after, datetime.fromisoformat, UUID)
+        query = query.filter(tuple_(Scenario.created_at, Scenario.id) < (created_at, cursor_id))
+    else:
+        query = query.offset(skip)
 
-        if scenario.organization:
-            scenario_dict["organization_name"] = scenario.organization.name
+    rows = query.limit(limit).all()
 
-        if scenario.created_by_user:
-            scenario_dict["created_by_name"] = scenario.created_by_user.full_name
+    # Build response with details. Rows come from the DB and already match
+    # the schema, so construct directly instead of validate -> dump -> validate
+    result = [ScenarioWithDetails.model_construct(**row._mapping) for row in rows]
 
-        scenario_dict["simulation_count"] = len(scenario.simulations)
-
-        result.append(ScenarioWithDetails(**scenario_dict))
+    if result:
+        set_next_cursor(response, len(result), limit, result[-1].created_at, result[-1].id)
 
     return result
 
@@ -80,9 +141,7 @@ def create_scenario(
 ):
     """Create a new scenario. Users can only create for their organization."""
     # Verify model exists and is published
-    model = db.query(EconomicModel).filter(
-        EconomicModel.id == scenario_data.model_id
-    ).first()
+    model = db.get(EconomicModel, scenario_data.model_id)
 
     if not model:
         raise HTTPException(
@@ -97,7 +156,7 @@ def create_scenario(
         )
 
     # Validate parameter values against model parameters
-    model_param_names = {p.name for p in model.parameters}
+    model_param_names = _model_param_names(db, model)
     scenario_param_names = set(scenario_data.parameter_values.keys())
 
     if not scenario_param_names.issubset(model_param_names):
@@ -116,10 +175,12 @@ def create_scenario(
     )
 
     db.add(scenario)
+    db.flush()  # INSERT ... RETURNING fills in the server defaults
+    response = ScenarioSchema.from_orm(scenario)
     db.commit()
-    db.refresh(scenario)
+    cache_clear(MODELS_CACHE_NAMESPACE)  # scenario_count changed
 
-    return ScenarioSchema.from_orm(scenario)
+    return response
 
 
 @router.get("/{scenario_id}", response_model=ScenarioWithDetails)
@@ -129,9 +190,9 @@ def get_scenario(
     current_user: User = Depends(get_current_user),
 ):
     """Get a specific scenario"""
-    scenario = db.query(Scenario).filter(Scenario.id == scenario_id).first()
+    row = _query_with_details(db).filter(Scenario.id == scenario_id).first()
 
-    if not scenario:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Scenario not found",
@@ -139,27 +200,14 @@ def get_scenario(
 
     # Check organization access
     if (current_user.role != "global_admin" and
-        str(scenario.organization_id) != str(current_user.organization_id)):
+        row.organization_id != current_user.organization_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied. Scenario belongs to different organization.",
         )
 
     # Build response with details
-    scenario_dict = ScenarioSchema.from_orm(scenario).model_dump()
-
-    if scenario.model:
-        scenario_dict["model_name"] = scenario.model.name
-
-    if scenario.organization:
-        scenario_dict["organization_name"] = scenario.organization.name
-
-    if scenario.created_by_user:
-        scenario_dict["created_by_name"] = scenario.created_by_user.full_name
-
-    scenario_dict["simulation_count"] = len(scenario.simulations)
-
-    return ScenarioWithDetails(**scenario_dict)
+    return ScenarioWithDetails.model_construct(**row._mapping)
 
 
 @router.patch("/{scenario_id}", response_model=ScenarioSchema)
@@ -174,7 +222,7 @@ def update_scenario(
     Users can only edit their own scenarios in their organization.
     Admins can edit any scenario.
     """
-    scenario = db.query(Scenario).filter(Scenario.id == scenario_id).first()
+    scenario = db.get(Scenario, scenario_id)
 
     if not scenario:
         raise HTTPException(
@@ -198,7 +246,7 @@ def update_scenario(
 
     # Validate parameter values if provided
     if scenario_data.parameter_values is not None:
-        model_param_names = {p.name for p in scenario.model.parameters}
+        model_param_names = _model_param_names(db, scenario.model)
         scenario_param_names = set(scenario_data.parameter_values.keys())
 
         if not scenario_param_names.issubset(model_param_names):
@@ -208,15 +256,21 @@ def update_scenario(
                 detail=f"Invalid parameters: {invalid_params}",
             )
 
-    # Update fields
-    update_data = scenario_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(scenario, field, value)
-
+    # UPDATE ... RETURNING writes only the given columns and refreshes the
+    # loaded scenario in place, so no flush of the whole object or refresh
+    update_data = scenario_data.model_dump(exclude_unset=True)
+    if update_data:
+        scenario = db.scalars(
+            update(Scenario)
+            .where(Scenario.id == scenario_id)
+            .values(**update_data)
+            .returning(Scenario)
+        ).one()
+
+    response = ScenarioSchema.from_orm(scenario)
     db.commit()
-    db.refresh(scenario)
 
-    return ScenarioSchema.from_orm(scenario)
+    return response
 
 
 @router.delete("/{scenario_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -230,7 +284,7 @@ def delete_scenario(
     Users can only delete their own scenarios.
     Admins can delete any scenario.
     """
-    scenario = db.query(Scenario).filter(Scenario.id == scenario_id).first()
+    scenario = db.get(Scenario, scenario_id)
 
     if not scenario:
         raise HTTPException(
@@ -261,6 +315,7 @@ def delete_scenario(
 
     db.delete(scenario)
     db.commit()
+    cache_clear(MODELS_CACHE_NAMESPACE)  # scenario_count changed
 
     return None
 
@@ -276,37 +331,52 @@ def clone_scenario(
     Clone an existing scenario with a new name.
     Users can clone scenarios from their organization.
     """
-    original = db.query(Scenario).filter(Scenario.id == scenario_id).first()
-
-    if not original:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Scenario not found",
+    # Copy the row inside the database with INSERT ... SELECT, so the original's
+    # parameter_values never round-trip through the app
+    source = select(
+        literal(clone_data.name).label("name"),
+        (
+            literal(clone_data.description)
+            if clone_data.description
+            else literal("Cloned from ").concat(Scenario.name)
+        ).label("description"),
+        Scenario.model_id,
+        literal(current_user.organization_id, GUID).label("organization_id"),  # Always user's org
+        literal(current_user.id, GUID).label("created_by_id"),
+        Scenario.country_code,
+        Scenario.parameter_values,
+        literal(False).label("is_base_case"),  # Clones are never base case
+        literal(False).label("is_locked"),
+    ).where(Scenario.id == scenario_id)
+
+    # Check organization access as part of the copy
+    if current_user.role != "global_admin":
+        source = source.where(Scenario.organization_id == current_user.organization_id)
+
+    cloned = db.scalars(
+        insert(Scenario)
+        .from_select(
+            ["name", "description", "model_id", "organization_id", "created_by_id",
+             "country_code", "parameter_values", "is_base_case", "is_locked"],
+            source,
         )
+        .returning(Scenario)
+    ).first()
 
-    # Check organization access
-    if (current_user.role != "global_admin" and
-        str(original.organization_id) != str(current_user.organization_id)):
+    if cloned is None:
+        # Nothing copied: tell a missing scenario apart from another org's
+        if not db.scalar(select(exists().where(Scenario.id == scenario_id))):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Scenario not found",
+            )
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied. Cannot clone scenario from different organization.",
         )
 
-    # Create clone
-    cloned = Scenario(
-        name=clone_data.name,
-        description=clone_data.description or f"Cloned from {original.name}",
-        model_id=original.model_id,
-        organization_id=current_user.organization_id,  # Always user's org
-        created_by_id=current_user.id,
-        country_code=original.country_code,
-        parameter_values=original.parameter_values.copy(),  # Deep copy parameters
-        is_base_case=False,  # Clones are never base case
-        is_locked=False,
-    )
-
-    db.add(cloned)
+    response = ScenarioSchema.from_orm(cloned)
     db.commit()
-    db.refresh(cloned)
+    cache_clear(MODELS_CACHE_NAMESPACE)  # scenario_count changed
 
-    return ScenarioSchema.from_orm(cloned)
+    return response
@@ -1,50 +1,108 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from uuid import UUID
+from typing import List, Optional
+from uuid import UUID, uuid4
 from app.db.session import get_db
-from app.core.permissions import get_current_user
-from app.schemas.simulation import SimulationRequest, SimulationResponse
+from app.core.pagination import decode_cursor, set_next_cursor
+from app.core.permissions import get_current_user, filter_by_organization
+from app.schemas.simulation import SimulationRequest, SimulationResponse, PSASample
 from app.models.user import User
-from app.models.simulation import Simulation, SimulationType, SimulationStatus
+from app.models.simulation import Simulation, SimulationPSASample, SimulationType, SimulationStatus
 from app.models.scenario import Scenario
+from app.tasks.celery_app import queue_enabled
+from app.tasks.simulations import execute_psa, fail_simulation, run_psa_task
 from engine.markov.core import run_markov_analysis
 from engine.sensitivity.deterministic import tornado_analysis
-from engine.sensitivity.probabilistic import run_psa
 from datetime import datetime
 import time
 
 router = APIRouter()
 
+# Large JSON columns get_simulation only loads and returns when asked for with ?include=
+HEAVY_FIELDS = {"results", "sensitivity_results"}
 
-@router.post("/deterministic", response_model=SimulationResponse)
-async def run_deterministic_simulation(
-    request: SimulationRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
+# Columns behind the PSASample response fields
+_PSA_SAMPLE_COLUMNS = tuple(getattr(SimulationPSASample, field) for field in PSASample.model_fields)
+
+# Parameters varied ±20% by the tornado analysis, with the value used when a
+# scenario does not set one. Add a row here to include a new parameter
+TORNADO_PARAMETERS = {
+    "cost_drug_a": 3500,
+    "cost_drug_b": 500,
+    "prob_s_to_p_a": 0.10,
+    "prob_s_to_p_b": 0.25,
+}
+
+
+def tornado_ranges(parameter_values: dict) -> dict:
+    """(low, high) tornado range for each of TORNADO_PARAMETERS"""
+    ranges = {}
+    for name, default in TORNADO_PARAMETERS.items():
+        value = parameter_values.get(name, default)
+        ranges[name] = (value * 0.8, value * 1.2)
+    return ranges
+
+
+def _load_scenario(db: Session, scenario_id: UUID, current_user: User) -> Scenario:
     """
-    Run deterministic (base case) simulation
+    Scenario to simulate, with organization access enforced in the WHERE
+    clause. Scenarios the user cannot see are a 404, same as missing ones.
     """
-    # Get scenario
-    scenario = db.query(Scenario).filter(Scenario.id == request.scenario_id).first()
+    query = db.query(Scenario).filter(Scenario.id == scenario_id)
+    scenario = filter_by_organization(query, Scenario, current_user).first()
     if not scenario:
         raise HTTPException(status_code=404, detail="Scenario not found")
+    return scenario
 
-    # Check permissions (user must belong to same organization or be admin)
-    if current_user.role != "global_admin" and current_user.organization_id != scenario.organization_id:
-        raise HTTPException(status_code=403, detail="Not authorized")
 
-    # Create simulation record
+def _start_simulation(
+    db: Session,
+    scenario: Scenario,
+    current_user: User,
+    simulation_type: SimulationType,
+    **fields
+) -> Simulation:
+    """
+    New RUNNING simulation of the scenario, added to the session but not
+    flushed; it is written with its outcome by _commit_simulation
+    """
     simulation = Simulation(
-        scenario_id=request.scenario_id,
-        simulation_type=SimulationType.DETERMINISTIC,
+        scenario_id=scenario.id,
+        simulation_type=simulation_type,
         status=SimulationStatus.RUNNING,
         input_snapshot=scenario.parameter_values,
-        created_by_id=current_user.id
+        created_by_id=current_user.id,
+        **fields
     )
     db.add(simulation)
+    return simulation
+
+
+def _commit_simulation(db: Session, simulation: Simulation) -> SimulationResponse:
+    """
+    Write the simulation (INSERT/UPDATE in one flush), serialize it and commit.
+    Serializing before the commit avoids reloading the expired instance.
+    """
+    db.flush()
+    response = SimulationResponse.from_orm(simulation)
     db.commit()
-    db.refresh(simulation)
+    return response
+
+
+@router.post("/deterministic", response_model=SimulationResponse)
+def run_deterministic_simulation(
+    request: SimulationRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Run deterministic (base case) simulation
+    """
+    # Get scenario (access checked in the query)
+    scenario = _load_scenario(db, request.scenario_id, current_user)
+
+    # Create simulation record (written with its outcome in one transaction)
+    simulation = _start_simulation(db, scenario, current_user, SimulationType.DETERMINISTIC)
 
     try:
         # Run Markov model
@@ -57,20 +115,16 @@ async def run_deterministic_simulation(
         simulation.results = results
         simulation.execution_time_ms = execution_time
         simulation.completed_at = datetime.utcnow()
-        db.commit()
-        db.refresh(simulation)
 
     except Exception as e:
-        simulation.status = SimulationStatus.FAILED
-        simulation.error_message = str(e)
-        db.commit()
+        fail_simulation(db, simulation, e)
         raise HTTPException(status_code=500, detail=f"Simulation failed: {str(e)}")
 
-    return SimulationResponse.from_orm(simulation)
+    return _commit_simulation(db, simulation)
 
 
 @router.post("/tornado", response_model=SimulationResponse)
-async def run_tornado_analysis_endpoint(
+def run_tornado_analysis_endpoint(
     request: SimulationRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -78,133 +132,156 @@ async def run_tornado_analysis_endpoint(
     """
     Run tornado diagram (one-way sensitivity) analysis
     """
-    scenario = db.query(Scenario).filter(Scenario.id == request.scenario_id).first()
-    if not scenario:
-        raise HTTPException(status_code=404, detail="Scenario not found")
+    scenario = _load_scenario(db, request.scenario_id, current_user)
 
     # Create simulation record
-    simulation = Simulation(
-        scenario_id=request.scenario_id,
-        simulation_type=SimulationType.TORNADO,
-        status=SimulationStatus.RUNNING,
-        input_snapshot=scenario.parameter_values,
-        created_by_id=current_user.id
-    )
-    db.add(simulation)
-    db.commit()
-    db.refresh(simulation)
+    simulation = _start_simulation(db, scenario, current_user, SimulationType.TORNADO)
 
     try:
         # Define parameter ranges for sensitivity analysis
         base_params = scenario.parameter_values
-        param_ranges = {
-            "cost_drug_a": (base_params.get("cost_drug_a", 3500) * 0.8, base_params.get("cost_drug_a", 3500) * 1.2),
-            "cost_drug_b": (base_params.get("cost_drug_b", 500) * 0.8, base_params.get("cost_drug_b", 500) * 1.2),
-            "prob_s_to_p_a": (base_params.get("prob_s_to_p_a", 0.10) * 0.8, base_params.get("prob_s_to_p_a", 0.10) * 1.2),
-            "prob_s_to_p_b": (base_params.get("prob_s_to_p_b", 0.25) * 0.8, base_params.get("prob_s_to_p_b", 0.25) * 1.2),
-        }
+        param_ranges = tornado_ranges(base_params)
+
+        # Base case, also the tornado's pivot
+        base_results = run_markov_analysis(base_params)
 
         start_time = time.time()
-        tornado_results = tornado_analysis(base_params, param_ranges)
+        tornado_results = tornado_analysis(base_params, param_ranges, base_result=base_results)
         execution_time = int((time.time() - start_time) * 1000)
 
-        # Also run base case
-        base_results = run_markov_analysis(base_params)
-
         simulation.status = SimulationStatus.COMPLETED
         simulation.results = base_results
         simulation.sensitivity_results = {"tornado": tornado_results}
         simulation.execution_time_ms = execution_time
         simulation.completed_at = datetime.utcnow()
-        db.commit()
-        db.refresh(simulation)
 
     except Exception as e:
-        simulation.status = SimulationStatus.FAILED
-        simulation.error_message = str(e)
-        db.commit()
+        fail_simulation(db, simulation, e)
         raise HTTPException(status_code=500, detail=f"Simulation failed: {str(e)}")
 
-    return SimulationResponse.from_orm(simulation)
+    return _commit_simulation(db, simulation)
 
 
 @router.post("/psa", response_model=SimulationResponse)
-async def run_psa_simulation(
+def run_psa_simulation(
     request: SimulationRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Run Probabilistic Sensitivity Analysis (Monte Carlo)
-    Note: In production, this should use Celery for async processing
+    With Celery enabled the run is queued and the simulation is returned as
+    RUNNING; poll GET /simulations/{id}?include=results,sensitivity_results
+    for the results.
     """
-    scenario = db.query(Scenario).filter(Scenario.id == request.scenario_id).first()
-    if not scenario:
-        raise HTTPException(status_code=404, detail="Scenario not found")
+    scenario = _load_scenario(db, request.scenario_id, current_user)
 
     iterations = request.iterations or 1000
+    queued = queue_enabled()
 
     # Create simulation record
-    simulation = Simulation(
-        scenario_id=request.scenario_id,
-        simulation_type=SimulationType.PSA,
-        status=SimulationStatus.RUNNING,
-        input_snapshot=scenario.parameter_values,
-        created_by_id=current_user.id
+    simulation = _start_simulation(
+        db, scenario, current_user, SimulationType.PSA,
+        celery_task_id=str(uuid4()) if queued else None
     )
-    db.add(simulation)
-    db.commit()
-    db.refresh(simulation)
 
     try:
-        # Define distributions for PSA
-        distributions = {
-            "cost_drug_a": {"type": "gamma", "shape": 10, "scale": scenario.parameter_values.get("cost_drug_a", 3500) / 10},
-            "prob_s_to_p_a": {"type": "beta", "alpha": 10, "beta": 90},
-            "utility_stable": {"type": "beta", "alpha": 85, "beta": 15},
-            "utility_progression": {"type": "beta", "alpha": 50, "beta": 50},
-        }
+        if queued:
+            # The worker loads the simulation by id, so commit it before queueing
+            response = _commit_simulation(db, simulation)
+            run_psa_task.apply_async(
+                (str(simulation.id), iterations, request.seed),
+                task_id=simulation.celery_task_id
+            )
+            return response
 
-        start_time = time.time()
-        psa_results = run_psa(
-            scenario.parameter_values,
-            distributions,
-            n_iterations=iterations,
-            seed=request.seed
-        )
-        execution_time = int((time.time() - start_time) * 1000)
-
-        # Also run base case
-        base_results = run_markov_analysis(scenario.parameter_values)
-
-        simulation.status = SimulationStatus.COMPLETED
-        simulation.results = base_results
-        simulation.sensitivity_results = {"psa": psa_results}
-        simulation.execution_time_ms = execution_time
-        simulation.completed_at = datetime.utcnow()
-        db.commit()
-        db.refresh(simulation)
+        execute_psa(db, simulation, scenario.parameter_values, iterations, request.seed)
 
     except Exception as e:
-        simulation.status = SimulationStatus.FAILED
-        simulation.error_message = str(e)
-        db.commit()
+        fail_simulation(db, simulation, e)
         raise HTTPException(status_code=500, detail=f"Simulation failed: {str(e)}")
 
-    return SimulationResponse.from_orm(simulation)
+    return _commit_simulation(db, simulation)
 
 
-@router.get("/{simulation_id}", response_model=SimulationResponse)
-async def get_simulation(
+@router.get(
+    "/{simulation_id}",
+    response_model=SimulationResponse,
+    response_model_exclude_unset=True,
+    response_model_exclude_none=True,
+)
+def get_simulation(
     simulation_id: UUID,
+    include: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Get simulation results by ID
+    Get a simulation by ID.
+    results and sensitivity_results are left out unless listed in `include`
+    (comma-separated, e.g. ?include=results,sensitivity_results).
     """
-    simulation = db.query(Simulation).filter(Simulation.id == simulation_id).first()
-    if not simulation:
+    included = set(include.split(",")) if include else set()
+    columns = [
+        getattr(Simulation, field)
+        for field in SimulationResponse.model_fields
+        if field not in HEAVY_FIELDS or field in included
+    ]
+
+    # Only the requested columns are read, so the JSON blobs are not even loaded.
+    # Access goes through the scenario's organization; other organizations' simulations are a 404
+    query = (
+        db.query(*columns)
+        .join(Scenario, Scenario.id == Simulation.scenario_id)
+        .filter(Simulation.id == simulation_id)
+    )
+    row = filter_by_organization(query, Scenario, current_user).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Simulation not found")
 
-    return SimulationResponse.from_orm(simulation)
+    return SimulationResponse.model_construct(**row._mapping)
+
+
+@router.get("/{simulation_id}/samples", response_model=List[PSASample])
+def list_psa_samples(
+    simulation_id: UUID,
+    response: Response,
+    after: Optional[str] = None,
+    limit: int = 1000,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Per-iteration results of a PSA simulation, in iteration order.
+    Pass the X-Next-Cursor header of a full page as `after` to fetch the next one.
+    """
+    query = (
+        db.query(*_PSA_SAMPLE_COLUMNS)
+        .join(Simulation, Simulation.id == SimulationPSASample.simulation_id)
+        .join(Scenario, Scenario.id == Simulation.scenario_id)
+        .filter(SimulationPSASample.simulation_id == simulation_id)
+    )
+    query = filter_by_organization(query, Scenario, current_user)
+
+    if after:
+        (iteration,) = decode_cursor(after, int)
+        query = query.filter(SimulationPSASample.iteration > iteration)
+
+    rows = query.order_by(SimulationPSASample.iteration).limit(limit).all()
+
+    if not rows and not after:
+        # No samples: tell a simulation without any apart from a missing (or other organization's) one
+        simulation_query = (
+            db.query(Simulation.id)
+            .join(Scenario, Scenario.id == Simulation.scenario_id)
+            .filter(Simulation.id == simulation_id)
+        )
+        if not filter_by_organization(simulation_query, Scenario, current_user).first():
+            raise HTTPException(status_code=404, detail="Simulation not found")
+
+    result = [PSASample.model_construct(**row._mapping) for row in rows]
+
+    if result:
+        set_next_cursor(response, len(result), limit, result[-1].iteration)
+
+    return result
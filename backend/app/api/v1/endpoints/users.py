@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy import exists, select
 from typing import List
 from uuid import UUID
 
@@ -9,6 +10,7 @@ from app.models.organization import Organization
 from app.core.permissions import (
     get_current_user,
     require_global_admin,
+    forget_user,
 )
 from app.core.security import get_password_hash
 from app.schemas import (
@@ -21,6 +23,22 @@ from app.schemas import (
 
 router = APIRouter()
 
+# Columns behind the response fields of list/get_user; the organization's
+# name and country come from the same statement via an outer join
+_USER_COLUMNS = tuple(getattr(User, field) for field in UserSchema.model_fields)
+
+
+def _query_with_organization(db: Session):
+    """User columns with their organization's name and country, in one statement"""
+    return (
+        db.query(
+            *_USER_COLUMNS,
+            Organization.name.label("organization_name"),
+            Organization.country.label("organization_country"),
+        )
+        .outerjoin(Organization, Organization.id == User.organization_id)
+    )
+
 
 @router.get("/", response_model=List[UserWithOrganization])
 def list_users(
@@ -35,7 +53,7 @@ def list_users(
     List all users. Admin only.
     Optional filters: organization_id, role
     """
-    query = db.query(User)
+    query = _query_with_organization(db)
 
     if organization_id:
         query = query.filter(User.organization_id == organization_id)
@@ -43,20 +61,11 @@ def list_users(
     if role:
         query = query.filter(User.role == role)
 
-    users = query.offset(skip).limit(limit).all()
-
-    # Build response with organization details
-    result = []
-    for user in users:
-        user_dict = UserSchema.from_orm(user).model_dump()
-
-        if user.organization:
-            user_dict["organization_name"] = user.organization.name
-            user_dict["organization_country"] = user.organization.country
+    rows = query.offset(skip).limit(limit).all()
 
-        result.append(UserWithOrganization(**user_dict))
-
-    return result
+    # Build response with organization details. Rows come from the DB and already
+    # match the schema, so construct directly instead of validate -> dump -> validate
+    return [UserWithOrganization.model_construct(**row._mapping) for row in rows]
 
 
 @router.post("/", response_model=UserSchema, status_code=status.HTTP_201_CREATED)
@@ -67,20 +76,14 @@ def create_user(
 ):
     """Create a new user. Admin only."""
     # Check if email already exists
-    existing = db.query(User).filter(User.email == user_data.email).first()
-
-    if existing:
+    if db.scalar(select(exists().where(User.email == user_data.email))):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
 
     # Verify organization exists
-    organization = db.query(Organization).filter(
-        Organization.id == user_data.organization_id
-    ).first()
-
-    if not organization:
+    if not db.scalar(select(exists().where(Organization.id == user_data.organization_id))):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Organization not found",
@@ -100,10 +103,11 @@ def create_user(
     )
 
     db.add(user)
+    db.flush()  # INSERT ... RETURNING fills in the server defaults
+    response = UserSchema.from_orm(user)
     db.commit()
-    db.refresh(user)
 
-    return UserSchema.from_orm(user)
+    return response
 
 
 @router.get("/me", response_model=UserMe)
@@ -125,9 +129,9 @@ def get_user(
     - Admins can get any user
     - Users can only get themselves or users from their organization
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    row = _query_with_organization(db).filter(User.id == user_id).first()
 
-    if not user:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
@@ -136,21 +140,15 @@ def get_user(
     # Check access
     if current_user.role != "global_admin":
         # Users can only see themselves or users in their org
-        if (str(user.id) != str(current_user.id) and
-            str(user.organization_id) != str(current_user.organization_id)):
+        if (row.id != current_user.id and
+            row.organization_id != current_user.organization_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied",
             )
 
     # Build response with organization details
-    user_dict = UserSchema.from_orm(user).model_dump()
-
-    if user.organization:
-        user_dict["organization_name"] = user.organization.name
-        user_dict["organization_country"] = user.organization.country
-
-    return UserWithOrganization(**user_dict)
+    return UserWithOrganization.model_construct(**row._mapping)
 
 
 @router.patch("/{user_id}", response_model=UserSchema)
@@ -165,7 +163,7 @@ def update_user(
     - Admins can update any user
     - Users can only update themselves (limited fields)
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
 
     if not user:
         raise HTTPException(
@@ -174,7 +172,7 @@ def update_user(
         )
 
     # Check permissions
-    is_self = str(user.id) == str(current_user.id)
+    is_self = user.id == current_user.id
     is_admin = current_user.role == "global_admin"
 
     if not is_self and not is_admin:
@@ -194,9 +192,7 @@ def update_user(
 
     # Check if email is being changed and if it conflicts
     if user_data.email and user_data.email != user.email:
-        existing = db.query(User).filter(User.email == user_data.email).first()
-
-        if existing:
+        if db.scalar(select(exists().where(User.email == user_data.email))):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered",
@@ -204,11 +200,7 @@ def update_user(
 
     # Verify new organization exists if being changed
     if user_data.organization_id:
-        organization = db.query(Organization).filter(
-            Organization.id == user_data.organization_id
-        ).first()
-
-        if not organization:
+        if not db.scalar(select(exists().where(Organization.id == user_data.organization_id))):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Organization not found",
@@ -224,10 +216,12 @@ def update_user(
     if user_data.password:
         user.password_hash = get_password_hash(user_data.password)
 
+    db.flush()
+    response = UserSchema.from_orm(user)
     db.commit()
-    db.refresh(user)
+    forget_user(user.id)  # role/organization/is_active may have changed
 
-    return UserSchema.from_orm(user)
+    return response
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -240,7 +234,7 @@ def deactivate_user(
     Deactivate a user (soft delete). Admin only.
     We don't hard delete to preserve audit trail.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
 
     if not user:
         raise HTTPException(
@@ -249,7 +243,7 @@ def deactivate_user(
         )
 
     # Don't allow deactivating self
-    if str(user.id) == str(current_user.id):
+    if user.id == current_user.id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot deactivate your own account",
@@ -257,5 +251,6 @@ def deactivate_user(
 
     user.is_active = False
     db.commit()
+    forget_user(user.id)
 
     return None
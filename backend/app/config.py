@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from functools import lru_cache
 from typing import List
 import os
 
@@ -17,6 +18,22 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+    # Celery (PSA runs go to the worker instead of the request when enabled)
+    CELERY_ENABLED: bool = os.getenv("CELERY_ENABLED", "false").lower() == "true"
+
+    # Upper bound on Monte Carlo iterations accepted by the PSA endpoints
+    PSA_MAX_ITERATIONS: int = int(os.getenv("PSA_MAX_ITERATIONS", "100000"))
+
+    # Worker processes for CPU-bound analysis endpoints (0 runs them in the threadpool).
+    # Each API process has its own pool, so the default splits the cores between
+    # the WEB_CONCURRENCY uvicorn/gunicorn workers instead of giving each all of them
+    COMPUTE_PROCESSES: int = int(os.getenv(
+        "COMPUTE_PROCESSES",
+        max(1, (os.cpu_count() or 1) // max(1, int(os.getenv("WEB_CONCURRENCY", "1"))))
+    ))
+    # Cap on compute jobs in flight per API process (0 = no cap beyond the pool's queue)
+    COMPUTE_MAX_JOBS: int = int(os.getenv("COMPUTE_MAX_JOBS", "0"))
+
     # JWT
     SECRET_KEY: str = os.getenv("SECRET_KEY", "change-this-secret-key-in-production")
     ALGORITHM: str = "HS256"
@@ -35,4 +52,14 @@ class Settings(BaseSettings):
         env_file = ".env"
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    The application settings, read from the environment and .env once per
+    process. Use as a FastAPI dependency (Depends(get_settings)) where a test
+    needs to override them.
+    """
+    return Settings()
+
+
+settings = get_settings()
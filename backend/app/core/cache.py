@@ -0,0 +1,87 @@
+"""
+Optional Redis response cache.
+
+Caching is best-effort: if the redis package is missing or the server is
+unreachable, every lookup is a miss and the endpoints fall back to the DB.
+"""
+import json
+import logging
+import time
+from typing import Any, Optional
+
+from app.config import settings
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError as e:
+    REDIS_AVAILABLE = False
+    logging.warning(f"redis not available. Response cache disabled. Error: {e}")
+
+logger = logging.getLogger(__name__)
+
+# Namespace for cached list_models pages; cleared on every model/parameter/scenario write
+MODELS_CACHE_NAMESPACE = "models"
+
+# After a connection failure, skip Redis for this many seconds instead of
+# paying the connect timeout on every request
+RETRY_AFTER_SECONDS = 30
+
+_client = None
+_disabled_until = 0.0
+
+
+def _get_client():
+    global _client
+    if not REDIS_AVAILABLE or time.monotonic() < _disabled_until:
+        return None
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_connect_timeout=0.2,
+            socket_timeout=0.2,
+        )
+    return _client
+
+
+def _disable(error: Exception) -> None:
+    global _disabled_until
+    logger.warning(f"Redis cache unavailable, retrying in {RETRY_AFTER_SECONDS}s: {error}")
+    _disabled_until = time.monotonic() + RETRY_AFTER_SECONDS
+
+
+def cache_get(key: str) -> Optional[Any]:
+    """Return the cached JSON value for key, or None on miss/unavailable"""
+    client = _get_client()
+    if client is None:
+        return None
+    try:
+        raw = client.get(key)
+    except redis.RedisError as e:
+        _disable(e)
+        return None
+    return json.loads(raw) if raw is not None else None
+
+
+def cache_set(key: str, value: Any, expire: int = 60) -> None:
+    """Store a JSON-serializable value under key for expire seconds"""
+    client = _get_client()
+    if client is None:
+        return
+    try:
+        client.set(key, json.dumps(value), ex=expire)
+    except redis.RedisError as e:
+        _disable(e)
+
+
+def cache_clear(namespace: str) -> None:
+    """Delete every key under namespace (keys are '<namespace>:...')"""
+    client = _get_client()
+    if client is None:
+        return
+    try:
+        keys = list(client.scan_iter(match=f"{namespace}:*", count=100))
+        if keys:
+            client.delete(*keys)
+    except redis.RedisError as e:
+        _disable(e)
@@ -0,0 +1,92 @@
+"""
+Process pool for CPU-bound analysis work.
+
+Markov/PSA/tornado runs and report rendering are pure Python and NumPy and
+hold the GIL, so threadpool endpoints still run them one at a time. Handing
+them to worker processes lets concurrent requests use every core. Set
+COMPUTE_PROCESSES=0 to run them in the threadpool instead. COMPUTE_MAX_JOBS
+caps how many jobs one API process has submitted at a time; requests over the
+cap wait in the event loop, where a client disconnect drops them before they
+reach a worker.
+
+Every API process (uvicorn/gunicorn worker) owns a pool, so the host runs
+workers x COMPUTE_PROCESSES compute processes; the default divides the cores
+by WEB_CONCURRENCY to keep that at about one per core.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+
+_pool: Optional[ProcessPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """The shared pool, created on first use; None when disabled"""
+    global _pool
+    if _pool is None and settings.COMPUTE_PROCESSES != 0:
+        # spawn rather than fork: the API process has threads and open DB connections
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.COMPUTE_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def _get_slots() -> Optional[asyncio.Semaphore]:
+    """The COMPUTE_MAX_JOBS semaphore, created on first use; None when uncapped"""
+    global _slots
+    if _slots is None and settings.COMPUTE_MAX_JOBS > 0:
+        _slots = asyncio.Semaphore(settings.COMPUTE_MAX_JOBS)
+    return _slots
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next _get_pool starts a fresh one"""
+    global _pool
+    if _pool is pool:
+        _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _submit(call: Callable[[], Any]) -> Any:
+    pool = _get_pool()
+    if pool is None:
+        return await run_in_threadpool(call)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, call)
+    except BrokenProcessPool:
+        # A worker died (OOM kill, crash) and the executor refuses all further
+        # work; replace it and retry this job once
+        _discard_pool(pool)
+        return await asyncio.get_running_loop().run_in_executor(_get_pool(), call)
+
+
+async def run_compute(fn: Callable, *args: Any, **kwargs: Any) -> Any:
+    """
+    Await fn(*args, **kwargs) in a worker process.
+
+    fn must be a module-level function and its arguments and result
+    picklable. Exceptions raised by fn propagate to the caller.
+    """
+    call = partial(fn, *args, **kwargs)
+    slots = _get_slots()
+    if slots is None:
+        return await _submit(call)
+    async with slots:
+        return await _submit(call)
+
+
+def shutdown_compute_pool() -> None:
+    """Stop the worker processes (application shutdown)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
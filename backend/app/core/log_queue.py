@@ -0,0 +1,60 @@
+"""
+Non-blocking logging.
+
+The root logger's handlers are moved behind a queue: a QueueHandler on the
+root puts records on it and a QueueListener thread hands them to those
+handlers (or to stderr when none are configured), so a burst of logged errors
+(tracebacks included) does not stall the event loop on console writes.
+Propagation is left alone, so "app" records still reach every handler the
+operator configured on the root. Loggers with their own handlers and
+propagate=False (uvicorn's) are not affected.
+"""
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+_listener: Optional[QueueListener] = None
+_root_handlers: List[logging.Handler] = []
+
+
+def start_log_listener() -> None:
+    """Put the root logger's handlers behind the queue (application startup)"""
+    global _listener, _root_handlers
+    if _listener is not None:
+        return
+
+    root_logger = logging.getLogger()
+    _root_handlers = list(root_logger.handlers)
+    handlers = _root_handlers
+    if not handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers = [handler]
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    for handler in _root_handlers:
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(QueueHandler(log_queue))
+
+
+def stop_log_listener() -> None:
+    """Flush queued records and give the root its handlers back (application shutdown)"""
+    global _listener, _root_handlers
+    if _listener is None:
+        return
+
+    root_logger = logging.getLogger()
+    for handler in [h for h in root_logger.handlers if isinstance(h, QueueHandler)]:
+        root_logger.removeHandler(handler)
+    for handler in _root_handlers:
+        root_logger.addHandler(handler)
+    _root_handlers = []
+
+    _listener.stop()
+    _listener = None
@@ -0,0 +1,37 @@
+"""
+HTML pages served from memory.
+
+The page routes (/, /login, /app, ...) send the same few static files to
+every visitor. Each file is read once, on its first request, and kept with a
+SHA1 ETag, so later hits skip FileResponse's stat/open/read and a matching
+If-None-Match gets an empty 304. Edits to static/*.html need a restart.
+"""
+import hashlib
+from typing import Dict, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+PAGE_CACHE_CONTROL = "public, max-age=300"
+
+# path -> (content, ETag)
+_pages: Dict[str, Tuple[bytes, str]] = {}
+
+
+def _load_page(path: str) -> Tuple[bytes, str]:
+    page = _pages.get(path)
+    if page is None:
+        with open(path, "rb") as f:
+            content = f.read()
+        page = (content, f'"{hashlib.sha1(content).hexdigest()}"')
+        _pages[path] = page
+    return page
+
+
+def page_response(request: Request, path: str, cache_control: str = PAGE_CACHE_CONTROL) -> Response:
+    """The HTML file at path, or 304 Not Modified if the client has this version"""
+    content, etag = _load_page(path)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="text/html", headers=headers)
@@ -0,0 +1,51 @@
+"""
+Keyset (seek) pagination helpers.
+
+A cursor is the opaque, URL-safe encoding of the sort-key values of the last
+row on a page. The next page filters on `(sort keys) < cursor` instead of
+OFFSET, so the database never walks and discards the skipped rows.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Response, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort-key values of the last row on a page"""
+    raw = [
+        v.isoformat() if isinstance(v, datetime) else str(v) if isinstance(v, UUID) else v
+        for v in values
+    ]
+    return base64.urlsafe_b64encode(json.dumps(raw).encode()).decode()
+
+
+def decode_cursor(cursor: str, *types: Callable[[Any], Any]) -> Tuple:
+    """
+    Decode a cursor back into typed values.
+
+    Args:
+        cursor: Value produced by encode_cursor
+        types: One converter per sort key, e.g. datetime.fromisoformat, UUID, int
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if len(values) != len(types):
+            raise ValueError("cursor length mismatch")
+        return tuple(convert(value) for convert, value in zip(types, values))
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+
+
+def set_next_cursor(response: Response, page_size: int, limit: int, *last_values: Any) -> None:
+    """Expose the cursor for the next page when this page was full"""
+    if page_size and page_size == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*last_values)
@@ -1,19 +1,91 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.core.security import decode_token
 from app.models.user import User, UserRole
-from typing import List
+from functools import lru_cache
+from typing import List, Optional
+from uuid import UUID
+import threading
+import time
 
 security = HTTPBearer()
 
+# Authenticated users by id, reused for a short time so a burst of requests
+# from one client does not repeat the lookup. Entries are detached from their
+# session; update_user/deactivate_user evict them via forget_user. The cache
+# is per process, so other workers only notice a change when their entry
+# expires; require_role therefore re-reads is_active/role/organization from
+# the DB. FastAPI already resolves get_current_user once per request, however
+# many dependencies use it.
+USER_CACHE_SECONDS = 5
+USER_CACHE_SIZE = 4096
+_user_cache: dict = {}
+_user_cache_lock = threading.Lock()
+# Bumped by forget_user; a load that started before an eviction is not cached
+_user_cache_generation = 0
+
+
+def _cached_user(user_id: UUID) -> Optional[User]:
+    entry = _user_cache.get(user_id)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+
+def _cache_user(user: User, generation: int) -> None:
+    with _user_cache_lock:
+        if generation != _user_cache_generation:
+            # A user was evicted while this one loaded; it may be the stale copy
+            return
+        if len(_user_cache) >= USER_CACHE_SIZE:
+            # Dicts keep insertion order; drop the oldest entry
+            _user_cache.pop(next(iter(_user_cache)), None)
+        _user_cache[user.id] = (time.monotonic() + USER_CACHE_SECONDS, user)
+
+
+def forget_user(user_id: UUID) -> None:
+    """Drop a cached user after its row changes, so the next request reloads it"""
+    global _user_cache_generation
+    with _user_cache_lock:
+        _user_cache_generation += 1
+        _user_cache.pop(user_id, None)
+
+
+def _load_user(db: Session, user_id: UUID) -> User:
+    """Load a user from the DB and cache a detached copy"""
+    generation = _user_cache_generation
+    user = db.get(User, user_id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+    # Detach so commits in this request do not expire the cached copy
+    db.expunge(user)
+    _cache_user(user, generation)
+    return user
+
 
-async def get_current_user(
+@lru_cache(maxsize=4096)
+def _parse_user_id(sub: str) -> Optional[UUID]:
+    """Parse a token subject (hex or hyphenated UUID); repeat tokens hit the cache"""
+    try:
+        return UUID(sub)
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> User:
-    """Get current authenticated user from JWT token"""
+    """
+    Get current authenticated user from JWT token.
+    Sync so the blocking user lookup runs in the threadpool, not on the event loop.
+    """
     token = credentials.credentials
     payload = decode_token(token)
 
@@ -23,32 +95,63 @@ async def get_current_user(
             detail="Invalid authentication credentials",
         )
 
-    user_id = payload.get("sub")
+    sub = payload.get("sub")
+    user_id = _parse_user_id(sub) if isinstance(sub, str) else None
     if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = _cached_user(user_id)
     if user is None:
+        user = _load_user(db, user_id)
+
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user",
+        )
+
+    return user
+
+
+def _current_user_state(db: Session, user: User) -> User:
+    """
+    The user with is_active, role and organization as stored now. A cached
+    user may be up to USER_CACHE_SECONDS old on this worker, so privileged
+    routes check those columns against the DB and reload the user when one
+    of them changed.
+    """
+    row = db.execute(
+        select(User.is_active, User.role, User.organization_id).where(User.id == user.id)
+    ).first()
+    if row is None:
+        forget_user(user.id)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
 
+    if tuple(row) != (user.is_active, user.role, user.organization_id):
+        forget_user(user.id)
+        user = _load_user(db, user.id)
+
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user",
         )
-
     return user
 
 
 def require_role(allowed_roles: List[UserRole]):
-    """Decorator to require specific roles"""
-    def role_checker(current_user: User = Depends(get_current_user)) -> User:
+    """Decorator to require specific roles, checked against the stored user"""
+    def role_checker(
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+    ) -> User:
+        current_user = _current_user_state(db, current_user)
         if current_user.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -89,7 +192,7 @@ def require_organization_access(resource_attr: str = "organization_id"):
             )
 
         # Check if user belongs to same organization
-        if str(resource_org_id) != str(current_user.organization_id):
+        if resource_org_id != current_user.organization_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied. Resource belongs to different organization.",
@@ -148,12 +251,12 @@ def can_edit_resource(resource, current_user: User, resource_attr: str = "create
 
     # Check organization access
     if hasattr(resource, 'organization_id'):
-        if str(resource.organization_id) != str(current_user.organization_id):
+        if resource.organization_id != current_user.organization_id:
             return False
 
     # Local users can edit their own resources
     if hasattr(resource, resource_attr):
         creator_id = getattr(resource, resource_attr)
-        return str(creator_id) == str(current_user.id)
+        return creator_id == current_user.id
 
     return False
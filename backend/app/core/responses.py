@@ -0,0 +1,62 @@
+"""
+JSON response class.
+
+FastAPI still validates and shapes responses through the endpoint's
+response_model; only the final encode to bytes changes. msgspec encodes
+large payloads (simulation results, input snapshots) several times faster
+than json.dumps. Without it, the stock JSONResponse is used.
+"""
+import logging
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError as e:
+    MSGSPEC_AVAILABLE = False
+    logging.warning(f"msgspec not available. Using standard JSON encoder. Error: {e}")
+
+
+def encode_numpy(obj: Any) -> Any:
+    """
+    msgspec enc_hook for NumPy scalars and arrays. Engine results carry them
+    (np.mean, round() of a float64) and, unlike json.dumps, msgspec does not
+    encode float subclasses such as np.float64 on its own.
+    """
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    raise NotImplementedError(f"Objects of type {type(obj).__name__} are not supported")
+
+
+_encoder = msgspec.json.Encoder(enc_hook=encode_numpy) if MSGSPEC_AVAILABLE else None
+
+
+class MsgspecJSONResponse(JSONResponse):
+    """JSONResponse rendered with msgspec"""
+
+    def render(self, content: Any) -> bytes:
+        return _encoder.encode(content)
+
+
+DefaultJSONResponse = MsgspecJSONResponse if MSGSPEC_AVAILABLE else JSONResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def iter_ndjson(items: Iterable[Any], batch_size: int = 256) -> Iterator[bytes]:
+    """
+    NDJSON body for a StreamingResponse: one JSON document per line, sent
+    batch_size lines at a time rather than one write per item
+    """
+    encode = _encoder.encode if MSGSPEC_AVAILABLE else (lambda item: JSONResponse(item).body)
+    batch = []
+    for item in items:
+        batch.append(encode(item))
+        if len(batch) >= batch_size:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
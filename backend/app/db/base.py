@@ -1,3 +1,10 @@
 from sqlalchemy.ext.declarative import declarative_base
 
-Base = declarative_base()
+
+class _Base:
+    # created_at/updated_at are set by the database; fetch them with RETURNING on
+    # flush instead of expiring them and lazy-loading with a SELECT on next access
+    __mapper_args__ = {"eager_defaults": True}
+
+
+Base = declarative_base(cls=_Base)
@@ -1,8 +1,10 @@
 """
 Database compatibility layer for SQLite and PostgreSQL
 """
-from sqlalchemy import String, Text
-from sqlalchemy.dialects import postgresql
+from sqlalchemy import DateTime, String, Text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 from sqlalchemy.types import TypeDecorator
 import json
 
@@ -67,3 +69,37 @@ class JSONType(TypeDecorator):
             return value
         else:
             return json.loads(value)
+
+
+def dialect_insert(bind):
+    """Dialect-specific insert() for the bound engine.
+    Both PostgreSQL and SQLite variants support ON CONFLICT and RETURNING.
+    """
+    if bind.dialect.name == 'postgresql':
+        return postgresql.insert
+    return sqlite.insert
+
+
+class utcnow(FunctionElement):
+    """Current UTC time, evaluated by the database.
+    Uses now() on PostgreSQL. On SQLite, renders the same text format SQLAlchemy
+    stores DateTime values in, so server-filled timestamps compare correctly
+    against bound datetimes.
+    """
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, 'postgresql')
+def _utcnow_postgresql(element, compiler, **kw):
+    return "now()"
+
+
+@compiles(utcnow, 'sqlite')
+def _utcnow_sqlite(element, compiler, **kw):
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
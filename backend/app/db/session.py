@@ -1,11 +1,50 @@
-from sqlalchemy import create_engine
+import logging
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.core.responses import encode_numpy
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+logger = logging.getLogger(__name__)
+
+_json_encoder = msgspec.json.Encoder(enc_hook=encode_numpy) if msgspec is not None else None
+
+
+def _json_serializer(value) -> str:
+    return _json_encoder.encode(value).decode()
+
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+# JSONB columns (parameter_values, input_snapshot, results, ...) are encoded
+# and decoded with msgspec when available instead of the json module
+_json_options = (
+    {"json_serializer": _json_serializer, "json_deserializer": msgspec.json.decode}
+    if msgspec is not None
+    else {}
+)
+
+engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True, **_json_options)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def warm_up_pool():
+    """
+    Open a pooled connection at startup so the first request after a cold
+    start does not pay the connect/TLS handshake. Failures are only logged;
+    requests will connect (and report errors) as usual.
+    """
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except SQLAlchemyError as e:
+        logger.warning(f"Database warm-up failed: {e}")
+
+
 def get_db():
     """
     Dependency for FastAPI endpoints to get database session
@@ -1,40 +1,89 @@
-from fastapi import FastAPI, HTTPException, Request, Cookie
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Cookie
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, Response, RedirectResponse
-from pydantic import BaseModel
+from fastapi.responses import Response, RedirectResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, field_validator
+from starlette.background import BackgroundTask
+import asyncio
+import functools
+import itertools
+import os
+import time
+import logging
+import re
+import tempfile
 from datetime import datetime
-import traceback
-from typing import Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from app.config import settings
 from app.api.v1.router import api_router
-from app.services.report_service import report_service
+from app.core.compute import run_compute, shutdown_compute_pool
+from app.core.log_queue import start_log_listener, stop_log_listener
+from app.core.pages import page_response
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.responses import DefaultJSONResponse, NDJSON_MEDIA_TYPE, iter_ndjson
+from app.db.session import warm_up_pool
+from app.services.report_cache import (
+    CachedReport, analysis_key, get_analysis, get_report, report_etag, report_key,
+    store_analysis, store_report
+)
+from app.services.report_service import render_analysis_report, render_report, render_report_file
 from engine.markov.core import run_markov_analysis
-from engine.markov.flexible import run_flexible_markov_analysis
 from engine.sensitivity.probabilistic import run_psa
 from engine.sensitivity.deterministic import tornado_analysis
-from engine.sensitivity.value_of_information import run_voi_analysis
-from engine.budget_impact import run_budget_impact_analysis
-from engine.decision_tree import run_decision_tree_analysis
-from engine.survival import run_survival_analysis
-from app.services.ai import get_assistant, quick_interpret
+from app.services.ai import PharmacoeconomicsExpert, get_assistant, quick_interpret, close_http_client
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
     docs_url=f"{settings.API_V1_PREFIX}/docs",
+    default_response_class=DefaultJSONResponse,
 )
 
 # Admin user creation is handled by create-admin-sql.py script in start.sh
 
-# CORS
+
+@app.on_event("startup")
+def start_logging():
+    """Write app log records from a background thread"""
+    start_log_listener()
+
+
+@app.on_event("startup")
+def warm_database_pool():
+    """Connect to the database before the first request arrives"""
+    warm_up_pool()
+
+
+@app.on_event("shutdown")
+def stop_compute_pool():
+    """Stop the analysis worker processes"""
+    shutdown_compute_pool()
+
+
+@app.on_event("shutdown")
+async def close_assistant_client():
+    """Close the assistant's pooled LLM connections"""
+    await close_http_client()
+
+
+@app.on_event("shutdown")
+def stop_logging():
+    """Flush queued log records"""
+    stop_log_listener()
+
+
+# CORS. Browsers on other origins can only read the response headers listed in
+# expose_headers: the pagination cursor and the report ETag are sent back by clients
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 # Servir archivos estáticos
@@ -45,6 +94,9 @@ app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
 
 class CalculationRequest(BaseModel):
+    # Flat scalar fields only, so params() can copy __dict__ instead of model_dump()
+    model_config = ConfigDict(frozen=True)
+
     time_horizon: int
     discount_rate: float
     cohort_size: int
@@ -59,16 +111,80 @@ class CalculationRequest(BaseModel):
     utility_stable: float
     utility_progression: float
 
+    def params(self) -> dict:
+        """Field values as a new dict, for the engine"""
+        return dict(self.__dict__)
+
+
+# Base-case results per CalculationRequest, kept in the API process: the engine's
+# own memo lives in whichever compute worker ran the model, so /api/calculate
+# followed by exports of the same inputs would otherwise run it again
+MARKOV_RESULTS_CACHE_SIZE = 512
+_markov_results_cache: dict = {}
+# Runs in progress by key, so concurrent requests for the same inputs (a
+# dashboard firing /api/psa, /api/tornado and exports at once) share one run
+_markov_results_pending: Dict[tuple, asyncio.Task] = {}
+
+
+async def _compute_markov_results(key: tuple, params: dict) -> dict:
+    try:
+        results = await run_compute(run_markov_analysis, params)
+        if len(_markov_results_cache) >= MARKOV_RESULTS_CACHE_SIZE:
+            # Dicts keep insertion order; drop the oldest entry
+            _markov_results_cache.pop(next(iter(_markov_results_cache)), None)
+        _markov_results_cache[key] = results
+        return results
+    finally:
+        _markov_results_pending.pop(key, None)
+
+
+async def _markov_results(request: CalculationRequest) -> dict:
+    """run_markov_analysis for the request's parameters, cached; treat the result as read-only"""
+    key = tuple(request.__dict__.values())
+    results = _markov_results_cache.get(key)
+    if results is not None:
+        return results
+
+    task = _markov_results_pending.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_compute_markov_results(key, request.params()))
+        _markov_results_pending[key] = task
+    # Shielded: a disconnected client must not cancel a run others are waiting on
+    return await asyncio.shield(task)
+
+
+def _file_timestamp() -> str:
+    """Current local time as YYYYmmdd_HHMMSS for download filenames"""
+    # time.strftime formats the C struct directly, without building a datetime
+    return time.strftime("%Y%m%d_%H%M%S")
+
+
+def http_500_on_error(detail: str, log_message: Optional[str] = None):
+    """
+    Decorator for async endpoints: any exception is logged (as log_message,
+    or detail) and answered with a 500 whose detail is "<detail>: <error>"
+    """
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            except Exception as e:
+                logger.exception(log_message or detail)
+                raise HTTPException(status_code=500, detail=f"{detail}: {str(e)}")
+        return wrapper
+    return decorator
+
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Serve the professional landing page"""
-    return FileResponse('static/landing.html')
+    return page_response(request, "static/landing.html")
 
 @app.get("/login")
-async def login_page():
+async def login_page(request: Request):
     """Serve login page"""
-    return FileResponse('static/login.html')
+    return page_response(request, "static/login.html")
 
 @app.get("/app")
 async def app_page(request: Request):
@@ -95,86 +211,135 @@ async def app_page(request: Request):
         return RedirectResponse(url="/login", status_code=302)
 
     # Token is valid, serve the app
-    return FileResponse('static/app.html', headers={"Cache-Control": "no-store"})
+    return page_response(request, "static/app.html", cache_control="no-store")
 
 @app.get("/demo")
-async def demo():
+async def demo(request: Request):
     """Serve the original demo interface"""
-    return FileResponse('static/index.html')
+    return page_response(request, "static/index.html")
 
 @app.get("/model-builder")
-async def model_builder():
+async def model_builder(request: Request):
     """Serve the Model Builder wizard (admin only)"""
-    return FileResponse('static/model-builder.html', headers={"Cache-Control": "no-store"})
+    return page_response(request, "static/model-builder.html", cache_control="no-store")
 
 
 @app.get("/demo-guidance")
-async def demo_guidance():
+async def demo_guidance(request: Request):
     """Serve the Model Builder Guidance Demo page"""
-    return FileResponse('static/demo-guidance.html')
+    return page_response(request, "static/demo-guidance.html")
 
 
 @app.get("/welcome")
-async def welcome_page():
+async def welcome_page(request: Request):
     """Serve the onboarding/welcome page for new users"""
-    return FileResponse('static/onboarding.html')
+    return page_response(request, "static/onboarding.html")
 
 
 @app.get("/getting-started")
-async def getting_started():
+async def getting_started(request: Request):
     """Alias for welcome page"""
-    return FileResponse('static/onboarding.html')
+    return page_response(request, "static/onboarding.html")
 
 
 @app.get("/budget-impact")
-async def budget_impact_page():
+async def budget_impact_page(request: Request):
     """Serve the Budget Impact Analysis page"""
-    return FileResponse('static/budget-impact.html')
+    return page_response(request, "static/budget-impact.html")
 
 
 @app.get("/decision-tree")
-async def decision_tree_page():
+async def decision_tree_page(request: Request):
     """Serve the Decision Tree Analysis page"""
-    return FileResponse('static/decision-tree.html')
+    return page_response(request, "static/decision-tree.html")
 
 
 @app.get("/survival")
-async def survival_page():
+async def survival_page(request: Request):
     """Serve the Survival Analysis page"""
-    return FileResponse('static/survival-analysis.html')
+    return page_response(request, "static/survival-analysis.html")
 
 
 @app.get("/voi")
-async def voi_page():
+async def voi_page(request: Request):
     """Serve the Value of Information Analysis page"""
-    return FileResponse('static/voi-analysis.html')
+    return page_response(request, "static/voi-analysis.html")
+
+
+# PSA: gamma distributions around the requested drug costs, fixed beta
+# distributions for the rest. Read-only, shared by every request
+PSA_COST_SHAPE = 10
+PSA_COST_PARAMETERS = ("cost_drug_a", "cost_drug_b")
+PSA_FIXED_DISTRIBUTIONS = {
+    "prob_s_to_p_a": {"type": "beta", "alpha": 10, "beta": 90},
+    "prob_s_to_p_b": {"type": "beta", "alpha": 15, "beta": 85},
+    "utility_stable": {"type": "beta", "alpha": 85, "beta": 15},
+    "utility_progression": {"type": "beta", "alpha": 65, "beta": 35},
+}
+
+# Tornado: (parameter, low factor, high factor, clamp to [0, 1])
+TORNADO_RANGES = (
+    ("cost_drug_a", 0.8, 1.2, False),
+    ("cost_drug_b", 0.8, 1.2, False),
+    ("prob_s_to_p_a", 0.8, 1.2, True),
+    ("prob_s_to_p_b", 0.8, 1.2, True),
+    ("utility_stable", 0.9, 1.1, True),
+    ("utility_progression", 0.9, 1.1, True),
+    ("discount_rate", 0.5, 1.5, False),
+)
 
 
 @app.post("/api/calculate")
 async def calculate(request: CalculationRequest):
     """Endpoint público para cálculos sin autenticación"""
-    params = request.model_dump()
-    result = run_markov_analysis(params)
+    result = await _markov_results(request)
     return result
 
 
 @app.post("/api/psa")
-async def calculate_psa(request: CalculationRequest, iterations: int = 1000):
-    """Endpoint público para PSA sin autenticación"""
-    params = request.model_dump()
+async def calculate_psa(
+    request: CalculationRequest,
+    iterations: int = Query(1000, ge=1, le=settings.PSA_MAX_ITERATIONS),
+    format: Literal["json", "ndjson"] = "json"
+):
+    """
+    Endpoint público para PSA sin autenticación
+
+    format=ndjson streams every iteration instead of the first 1000: the
+    first line is the usual response without psa_iterations, then one line
+    per iteration. Either way iterations is capped at PSA_MAX_ITERATIONS.
+    """
+    params = request.params()
+    stream = format == "ndjson"
 
     # Define distributions for PSA
     distributions = {
-        "cost_drug_a": {"type": "gamma", "shape": 10, "scale": params.get("cost_drug_a", 3500) / 10},
-        "cost_drug_b": {"type": "gamma", "shape": 10, "scale": params.get("cost_drug_b", 2800) / 10},
-        "prob_s_to_p_a": {"type": "beta", "alpha": 10, "beta": 90},
-        "prob_s_to_p_b": {"type": "beta", "alpha": 15, "beta": 85},
-        "utility_stable": {"type": "beta", "alpha": 85, "beta": 15},
-        "utility_progression": {"type": "beta", "alpha": 65, "beta": 35},
+        name: {"type": "gamma", "shape": PSA_COST_SHAPE, "scale": params[name] / PSA_COST_SHAPE}
+        for name in PSA_COST_PARAMETERS
     }
-
-    psa_results = run_psa(params, distributions, n_iterations=iterations, seed=42)
-    base_results = run_markov_analysis(params)
+    distributions.update(PSA_FIXED_DISTRIBUTIONS)
+
+    # Independent runs, so they go to two workers at once
+    psa_results, base_results = await asyncio.gather(
+        run_compute(
+            run_psa, params, distributions, n_iterations=iterations, seed=42,
+            max_returned_iterations=None if stream else 1000
+        ),
+        _markov_results(request),
+    )
+
+    if stream:
+        psa_iterations = psa_results.pop("psa_iterations")
+        header = {
+            "status": "success",
+            "base_case": base_results,
+            "psa_results": psa_results,
+            "iterations": iterations
+        }
+        return StreamingResponse(
+            iter_ndjson(itertools.chain([header], psa_iterations)),
+            media_type=NDJSON_MEDIA_TYPE
+        )
 
     return {
         "status": "success",
@@ -187,21 +352,19 @@ async def calculate_psa(request: CalculationRequest, iterations: int = 1000):
 @app.post("/api/tornado")
 async def calculate_tornado(request: CalculationRequest):
     """Endpoint público para Tornado sin autenticación"""
-    params = request.model_dump()
+    params = request.params()
 
     # Define parameter ranges for sensitivity (±20%)
-    param_ranges = {
-        "cost_drug_a": (params["cost_drug_a"] * 0.8, params["cost_drug_a"] * 1.2),
-        "cost_drug_b": (params["cost_drug_b"] * 0.8, params["cost_drug_b"] * 1.2),
-        "prob_s_to_p_a": (max(0, params["prob_s_to_p_a"] * 0.8), min(1, params["prob_s_to_p_a"] * 1.2)),
-        "prob_s_to_p_b": (max(0, params["prob_s_to_p_b"] * 0.8), min(1, params["prob_s_to_p_b"] * 1.2)),
-        "utility_stable": (max(0, params["utility_stable"] * 0.9), min(1, params["utility_stable"] * 1.1)),
-        "utility_progression": (max(0, params["utility_progression"] * 0.9), min(1, params["utility_progression"] * 1.1)),
-        "discount_rate": (params["discount_rate"] * 0.5, params["discount_rate"] * 1.5),
-    }
+    param_ranges = {}
+    for name, low, high, bounded in TORNADO_RANGES:
+        value = params[name]
+        if bounded:
+            param_ranges[name] = (max(0, value * low), min(1, value * high))
+        else:
+            param_ranges[name] = (value * low, value * high)
 
-    tornado_results = tornado_analysis(params, param_ranges)
-    base_results = run_markov_analysis(params)
+    base_results = await _markov_results(request)
+    tornado_results = await run_compute(tornado_analysis, params, param_ranges, base_result=base_results)
 
     return {
         "status": "success",
@@ -210,44 +373,71 @@ async def calculate_tornado(request: CalculationRequest):
     }
 
 
-@app.post("/api/export/pdf")
-async def export_pdf_quick(request: CalculationRequest):
-    """Export PDF from quick analysis results (no authentication required)"""
+# Read size when streaming a rendered report file
+REPORT_CHUNK_SIZE = 64 * 1024
+
+
+async def _report_file_response(
+    method: str, suffix: str, media_type: str, filename: str, **kwargs: Any
+) -> StreamingResponse:
+    """
+    Render report_service.<method> into a temp file in a compute worker and
+    stream it. The path is unlinked as soon as the file is open, or when the
+    render fails or the request is cancelled, so a client that goes away
+    before the body is sent cannot leave it on disk; the space is freed when
+    the handle is closed.
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
     try:
-        params = request.model_dump()
-        results = run_markov_analysis(params)
+        await run_compute(render_report_file, method, path, **kwargs)
+        report_file = open(path, "rb")
+    finally:
+        os.unlink(path)
+
+    return StreamingResponse(
+        iter(lambda: report_file.read(REPORT_CHUNK_SIZE), b""),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Content-Length": str(os.fstat(report_file.fileno()).st_size),
+        },
+        background=BackgroundTask(report_file.close),
+    )
 
-        pdf_bytes = report_service.generate_pdf_report(
-            scenario_name="Quick Analysis",
-            user_email="anonymous@ecomodel.com",
-            organization="Demo",
-            parameters=params,
-            results_drug_a=results["drug_a_results"],
-            results_drug_b=results["drug_b_results"]
-        )
 
-        # Return PDF
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=EcoModel_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            }
-        )
-    except Exception as e:
-        print(f"PDF Generation Error: {str(e)}")
-        print(traceback.format_exc())
-        raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(e)}")
+@app.post("/api/export/pdf")
+@http_500_on_error("PDF generation failed")
+async def export_pdf_quick(request: CalculationRequest):
+    """Export PDF from quick analysis results (no authentication required)"""
+    params = request.params()
+    results = await _markov_results(request)
+
+    # Stream PDF from its temp file
+    return await _report_file_response(
+        "generate_pdf_report", ".pdf", "application/pdf",
+        f"EcoModel_Report_{_file_timestamp()}.pdf",
+        scenario_name="Quick Analysis",
+        user_email="anonymous@ecomodel.com",
+        organization="Demo",
+        parameters=params,
+        results_drug_a=results["drug_a_results"],
+        results_drug_b=results["drug_b_results"]
+    )
 
 
 @app.post("/api/export/excel")
 async def export_excel_quick(request: CalculationRequest):
     """Export Excel from quick analysis results (no authentication required)"""
     try:
-        params = request.model_dump()
-        results = run_markov_analysis(params)
-
-        excel_bytes = report_service.generate_excel_report(
+        params = request.params()
+        results = await _markov_results(request)
+
+        # Stream Excel from its temp file
+        return await _report_file_response(
+            "generate_excel_report", ".xlsx",
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            f"EcoModel_Report_{_file_timestamp()}.xlsx",
             scenario_name="Quick Analysis",
             user_email="anonymous@ecomodel.com",
             parameters={
@@ -267,47 +457,35 @@ async def export_excel_quick(request: CalculationRequest):
             psa_results=None,
             tornado_results=None
         )
-
-        # Return Excel
-        return Response(
-            content=excel_bytes,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f"attachment; filename=EcoModel_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            }
-        )
     except Exception as e:
         return {"error": str(e)}
 
 
 @app.post("/api/export/word")
+@http_500_on_error("Word generation failed")
 async def export_word_quick(request: CalculationRequest):
     """Export Word document from quick analysis results (no authentication required)"""
-    try:
-        params = request.model_dump()
-        results = run_markov_analysis(params)
-
-        word_bytes = report_service.generate_word_report(
-            scenario_name="Quick Analysis",
-            user_email="anonymous@heravalue.com",
-            organization="Demo",
-            parameters=params,
-            results_drug_a=results["drug_a_results"],
-            results_drug_b=results["drug_b_results"]
-        )
-
-        # Return Word document
-        return Response(
-            content=word_bytes,
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            headers={
-                "Content-Disposition": f"attachment; filename=HERA_Value_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
-            }
-        )
-    except Exception as e:
-        print(f"Word Generation Error: {str(e)}")
-        print(traceback.format_exc())
-        raise HTTPException(status_code=500, detail=f"Word generation failed: {str(e)}")
+    params = request.params()
+    results = await _markov_results(request)
+
+    word_bytes = await run_compute(
+        render_report, "generate_word_report",
+        scenario_name="Quick Analysis",
+        user_email="anonymous@heravalue.com",
+        organization="Demo",
+        parameters=params,
+        results_drug_a=results["drug_a_results"],
+        results_drug_b=results["drug_b_results"]
+    )
+
+    # Return Word document
+    return Response(
+        content=word_bytes,
+        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        headers={
+            "Content-Disposition": f"attachment; filename=HERA_Value_Report_{_file_timestamp()}.docx"
+        }
+    )
 
 
 @app.get("/health")
@@ -319,38 +497,213 @@ async def health_check():
 # NUEVOS ENDPOINTS PARA FUNCIONALIDADES AVANZADAS
 # ============================================================================
 
+def _no_cache(cache_control: Optional[str]) -> bool:
+    """Whether a Cache-Control request header asks for a fresh response"""
+    return bool(cache_control) and "no-cache" in cache_control.lower()
+
+
+# An entity tag in an If-None-Match list: optional W/ prefix, then a quoted opaque tag
+_ENTITY_TAG = re.compile(r'(?:W/)?("[^"]*")')
+
+
+def _if_none_match_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches a current representation with
+    this ETag (RFC 9110 13.1.2): "*" matches any, otherwise one of the listed
+    entity tags must equal it under weak comparison (W/ prefixes ignored)
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = _ENTITY_TAG.fullmatch(etag).group(1)
+    return opaque_tag in _ENTITY_TAG.findall(if_none_match)
+
+
+async def _analysis_pdf_response(
+    analysis, report_method: str, request: "AnalysisRequest", default_name: str, filename_prefix: str,
+    cache_control: Optional[str] = None, if_none_match: Optional[str] = None
+) -> Response:
+    """
+    Shared body of the /api/export/<analysis>/pdf endpoints: run the analysis
+    and render its PDF report in the compute pool. A cached render of the same
+    request is reused, and so are cached results of the same analysis when
+    only the report labels changed, unless cache_control asks for a fresh run.
+    A cached PDF prints the time it was rendered, which the download filename
+    repeats, and is re-rendered once older than REPORT_CACHE_SECONDS.
+
+    The ETag is a hash of the PDF. These are POST endpoints, so a client that
+    sends it back in If-None-Match while that report is still cached gets
+    412 Precondition Failed (RFC 9110 13.1.2), not a 304: it already has the
+    current document.
+    """
+    params = request.params()
+    refresh = _no_cache(cache_control)
+    key = report_key(report_method, params)
+
+    cached = get_report(key)
+    if cached is not None and _if_none_match_matches(if_none_match, cached.etag):
+        return Response(status_code=412, headers={"ETag": cached.etag})
+
+    report = None if refresh else cached
+    if report is None:
+        generated_at = datetime.now()
+        labels = dict(
+            scenario_name=request.scenario_name or default_name,
+            user_email=request.user_email or 'anonymous@ecomodel.com',
+            organization=request.organization or 'Demo Organization',
+            generated_at=generated_at
+        )
+        results_key = analysis_key(analysis.__name__, params)
+        results = None if refresh else get_analysis(results_key)
+        if results is None:
+            results, pdf_bytes = await run_compute(
+                render_analysis_report, analysis, report_method, params, **labels
+            )
+            store_analysis(results_key, results)
+        else:
+            pdf_bytes = await run_compute(
+                render_report, report_method, parameters=params, results=results, **labels
+            )
+        report = CachedReport(pdf_bytes, generated_at, report_etag(pdf_bytes))
+        store_report(key, report)
+
+    # Same timestamp as the date printed in the report, also for a cached one
+    timestamp = report.generated_at.strftime("%Y%m%d_%H%M%S")
+    headers = {
+        "ETag": report.etag,
+        "Content-Disposition": f"attachment; filename={filename_prefix}_{timestamp}.pdf",
+    }
+    return Response(content=report.pdf, media_type="application/pdf", headers=headers)
+
+
+class AnalysisRequest(BaseModel):
+    """
+    Body of an advanced analysis endpoint. The fields each engine reads are
+    typed and validated; the engines apply their own defaults for anything
+    left out, and unknown keys (report metadata, nested options) pass through.
+    """
+    model_config = ConfigDict(extra="allow")
+
+    # Report labels for the PDF exports; the engines ignore them
+    scenario_name: Optional[str] = None
+    user_email: Optional[str] = None
+    organization: Optional[str] = None
+
+    @field_validator("scenario_name", "user_email", "organization", mode="before")
+    @classmethod
+    def _label_to_str(cls, value: Any) -> Any:
+        """Labels are free text; accept numbers (e.g. "scenario_name": 2024) as before they were typed"""
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        return value
+
+    def params(self) -> dict:
+        """The fields that were sent (plus extras), as the engine's params dict"""
+        return self.model_dump(exclude_unset=True)
+
+
+class BudgetImpactRequest(AnalysisRequest):
+    time_horizon: Optional[int] = None
+    perspective: Optional[str] = None
+    currency: Optional[str] = None
+    discount_rate: Optional[float] = None
+    total_population: Optional[int] = None
+    prevalence_rate: Optional[float] = None
+    incidence_rate: Optional[float] = None
+    diagnosis_rate: Optional[float] = None
+    treatment_eligible_rate: Optional[float] = None
+    growth_type: Optional[str] = None
+    annual_growth_rate: Optional[float] = None
+    treatments: Optional[List[Dict[str, Any]]] = None
+    cost_soc: Optional[float] = None
+    monitoring_cost_soc: Optional[float] = None
+    cost_new: Optional[float] = None
+    admin_cost_new: Optional[float] = None
+    monitoring_cost_new: Optional[float] = None
+    current_market_shares: Optional[Dict[str, float]] = None
+    new_treatment_name: Optional[str] = None
+    max_market_share: Optional[float] = None
+    uptake_type: Optional[str] = None
+
+
+class DecisionTreeRequest(AnalysisRequest):
+    name: Optional[str] = None
+    perspective: Optional[str] = None
+    currency: Optional[str] = None
+    effectiveness_measure: Optional[str] = None
+    wtp_threshold: Optional[float] = None
+    tree: Optional[Dict[str, Any]] = None
+
+
+class SurvivalRequest(AnalysisRequest):
+    times: Optional[List[float]] = None
+    events: Optional[List[int]] = None
+    distribution: Optional[str] = None
+    max_time: Optional[float] = None
+    hazard_ratio: Optional[float] = None
+    cycle_length: Optional[float] = None
+    n_cycles: Optional[int] = None
+    compare_distributions: Optional[bool] = None
+
+
+class FlexibleMarkovRequest(AnalysisRequest):
+    # model_name is an engine field, not pydantic's model_ namespace
+    model_config = ConfigDict(extra="allow", protected_namespaces=())
+
+    model_name: Optional[str] = None
+    time_horizon: Optional[int] = None
+    cycle_length: Optional[float] = None
+    discount_rate: Optional[float] = None
+    half_cycle_correction: Optional[bool] = None
+    cohort_size: Optional[int] = None
+    states: Optional[List[Dict[str, Any]]] = None
+    initial_distribution: Optional[Dict[str, float]] = None
+    strategies: Optional[List[Dict[str, Any]]] = None
+
+
+class VOIRequest(AnalysisRequest):
+    wtp_threshold: Optional[float] = None
+    population_size: Optional[int] = None
+    decision_horizon: Optional[int] = None
+    discount_rate: Optional[float] = None
+    currency: Optional[str] = None
+    psa_results: Optional[List[Dict[str, Any]]] = None
+
+
 @app.post("/api/budget-impact")
-async def calculate_budget_impact(request: dict):
+@http_500_on_error("BIA calculation failed")
+async def calculate_budget_impact(request: BudgetImpactRequest):
     """
     Budget Impact Analysis (BIA)
 
     Analiza el impacto presupuestario de introducir un nuevo tratamiento.
     Requerido por agencias HTA como AEMPS, NICE, SMC.
     """
-    try:
-        result = run_budget_impact_analysis(request)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"BIA calculation failed: {str(e)}")
+    from engine.budget_impact import run_budget_impact_analysis
+
+    result = await run_compute(run_budget_impact_analysis, request.params())
+    return result
 
 
 @app.post("/api/decision-tree")
-async def calculate_decision_tree(request: dict):
+@http_500_on_error("Decision tree analysis failed")
+async def calculate_decision_tree(request: DecisionTreeRequest):
     """
     Decision Tree Analysis
 
     Análisis de árbol de decisión con roll-back y cálculo de ICER.
     Soporta múltiples estrategias y análisis de sensibilidad.
     """
-    try:
-        result = run_decision_tree_analysis(request)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Decision tree analysis failed: {str(e)}")
+    from engine.decision_tree import run_decision_tree_analysis
+
+    result = await run_compute(run_decision_tree_analysis, request.params())
+    return result
 
 
 @app.post("/api/survival")
-async def calculate_survival(request: dict):
+@http_500_on_error("Survival analysis failed")
+async def calculate_survival(request: SurvivalRequest):
     """
     Parametric Survival Analysis
 
@@ -358,15 +711,15 @@ async def calculate_survival(request: dict):
     (Exponencial, Weibull, Log-normal, Log-logística, Gompertz, Gamma).
     Convierte a probabilidades de transición para modelos Markov.
     """
-    try:
-        result = run_survival_analysis(request)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Survival analysis failed: {str(e)}")
+    from engine.survival import run_survival_analysis
+
+    result = await run_compute(run_survival_analysis, request.params())
+    return result
 
 
 @app.post("/api/markov-flexible")
-async def calculate_markov_flexible(request: dict):
+@http_500_on_error("Flexible Markov analysis failed")
+async def calculate_markov_flexible(request: FlexibleMarkovRequest):
     """
     Flexible Markov Model
 
@@ -374,15 +727,15 @@ async def calculate_markov_flexible(request: dict):
     Soporta estados absorbentes, transitorios y túnel.
     Permite probabilidades dependientes del tiempo.
     """
-    try:
-        result = run_flexible_markov_analysis(request)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Flexible Markov analysis failed: {str(e)}")
+    from engine.markov.flexible import run_flexible_markov_analysis
+
+    result = await run_compute(run_flexible_markov_analysis, request.params())
+    return result
 
 
 @app.post("/api/voi")
-async def calculate_voi(request: dict):
+@http_500_on_error("VOI analysis failed")
+async def calculate_voi(request: VOIRequest):
     """
     Value of Information Analysis (EVPI/EVPPI)
 
@@ -390,11 +743,77 @@ async def calculate_voi(request: dict):
     Permite priorizar investigación futura basándose en la incertidumbre
     de los parámetros del modelo.
     """
-    try:
-        result = run_voi_analysis(request)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"VOI analysis failed: {str(e)}")
+    from engine.sensitivity.value_of_information import run_voi_analysis
+
+    result = await run_compute(run_voi_analysis, request.params())
+    return result
+
+
+CAPABILITIES = {
+    "platform": "EcoModel Hub",
+    "version": "2.0.0",
+    "modules": {
+        "markov_basic": {
+            "name": "Basic Markov Model",
+            "description": "3-state Markov model (Stable, Progression, Death)",
+            "endpoint": "/api/calculate",
+            "status": "active"
+        },
+        "markov_flexible": {
+            "name": "Flexible Markov Model",
+            "description": "N-state configurable Markov model with time-dependent transitions",
+            "endpoint": "/api/markov-flexible",
+            "status": "active"
+        },
+        "decision_tree": {
+            "name": "Decision Tree Analysis",
+            "description": "Decision tree with roll-back analysis and ICER calculation",
+            "endpoint": "/api/decision-tree",
+            "status": "active"
+        },
+        "budget_impact": {
+            "name": "Budget Impact Analysis",
+            "description": "Budget impact model following ISPOR guidelines",
+            "endpoint": "/api/budget-impact",
+            "status": "active"
+        },
+        "survival_analysis": {
+            "name": "Parametric Survival Analysis",
+            "description": "Fit survival data to parametric distributions (Weibull, Gompertz, etc.)",
+            "endpoint": "/api/survival",
+            "status": "active"
+        },
+        "psa": {
+            "name": "Probabilistic Sensitivity Analysis",
+            "description": "Monte Carlo simulation with multiple distributions",
+            "endpoint": "/api/psa",
+            "status": "active"
+        },
+        "tornado": {
+            "name": "Deterministic Sensitivity Analysis",
+            "description": "One-way sensitivity analysis (Tornado diagram)",
+            "endpoint": "/api/tornado",
+            "status": "active"
+        },
+        "voi": {
+            "name": "Value of Information",
+            "description": "EVPI and EVPPI analysis for research prioritization",
+            "endpoint": "/api/voi",
+            "status": "active"
+        }
+    },
+    "exports": ["pdf", "excel"],
+    "hta_compliance": ["NICE", "AEMPS", "SMC", "HAS", "G-BA", "ISPOR"],
+    "ai_assistant": {
+        "name": "PharmEcon AI Assistant",
+        "description": "AI-powered assistant for interpreting results and guiding analysis",
+        "endpoint": "/api/assistant/chat",
+        "status": "active"
+    }
+}
+
+# Static, so encoded once at import instead of on every request
+_CAPABILITIES_JSON = DefaultJSONResponse(CAPABILITIES).body
 
 
 @app.get("/api/capabilities")
@@ -402,68 +821,7 @@ async def get_capabilities():
     """
     Lista de capacidades y módulos disponibles en la plataforma
     """
-    return {
-        "platform": "EcoModel Hub",
-        "version": "2.0.0",
-        "modules": {
-            "markov_basic": {
-                "name": "Basic Markov Model",
-                "description": "3-state Markov model (Stable, Progression, Death)",
-                "endpoint": "/api/calculate",
-                "status": "active"
-            },
-            "markov_flexible": {
-                "name": "Flexible Markov Model",
-                "description": "N-state configurable Markov model with time-dependent transitions",
-                "endpoint": "/api/markov-flexible",
-                "status": "active"
-            },
-            "decision_tree": {
-                "name": "Decision Tree Analysis",
-                "description": "Decision tree with roll-back analysis and ICER calculation",
-                "endpoint": "/api/decision-tree",
-                "status": "active"
-            },
-            "budget_impact": {
-                "name": "Budget Impact Analysis",
-                "description": "Budget impact model following ISPOR guidelines",
-                "endpoint": "/api/budget-impact",
-                "status": "active"
-            },
-            "survival_analysis": {
-                "name": "Parametric Survival Analysis",
-                "description": "Fit survival data to parametric distributions (Weibull, Gompertz, etc.)",
-                "endpoint": "/api/survival",
-                "status": "active"
-            },
-            "psa": {
-                "name": "Probabilistic Sensitivity Analysis",
-                "description": "Monte Carlo simulation with multiple distributions",
-                "endpoint": "/api/psa",
-                "status": "active"
-            },
-            "tornado": {
-                "name": "Deterministic Sensitivity Analysis",
-                "description": "One-way sensitivity analysis (Tornado diagram)",
-                "endpoint": "/api/tornado",
-                "status": "active"
-            },
-            "voi": {
-                "name": "Value of Information",
-                "description": "EVPI and EVPPI analysis for research prioritization",
-                "endpoint": "/api/voi",
-                "status": "active"
-            }
-        },
-        "exports": ["pdf", "excel"],
-        "hta_compliance": ["NICE", "AEMPS", "SMC", "HAS", "G-BA", "ISPOR"],
-        "ai_assistant": {
-            "name": "PharmEcon AI Assistant",
-            "description": "AI-powered assistant for interpreting results and guiding analysis",
-            "endpoint": "/api/assistant/chat",
-            "status": "active"
-        }
-    }
+    return Response(content=_CAPABILITIES_JSON, media_type="application/json")
 
 
 # ============================================================================
@@ -483,7 +841,14 @@ class InterpretRequest(BaseModel):
     analysis_type: str  # markov, bia, psa, tornado, decision_tree, survival, voi
 
 
+class SuggestParametersRequest(BaseModel):
+    """Request para sugerencia de parámetros"""
+    disease_area: str = "general"
+    treatment_type: str = "oral"
+
+
 @app.post("/api/assistant/chat")
+@http_500_on_error("Assistant error")
 async def assistant_chat(request: ChatRequest):
     """
     Chat con el asistente de IA de farmacoeconomía
@@ -497,84 +862,120 @@ async def assistant_chat(request: ChatRequest):
     Funciona con OpenAI/Anthropic si hay API key, o en modo offline con
     base de conocimiento local.
     """
-    try:
-        assistant = get_assistant()
+    assistant = get_assistant()
 
-        if request.context:
-            assistant.set_analysis_context(request.context)
+    if request.context:
+        assistant.set_analysis_context(request.context)
 
-        response = await assistant.chat(request.message)
+    response = await assistant.chat(request.message)
 
-        return {
-            "status": "success",
-            "response": response,
-            "session_id": request.session_id
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Assistant error: {str(e)}")
+    return {
+        "status": "success",
+        "response": response,
+        "session_id": request.session_id
+    }
 
 
 @app.post("/api/assistant/interpret")
+@http_500_on_error("Interpretation error")
 async def assistant_interpret(request: InterpretRequest):
     """
     Interpretación automática de resultados por el asistente IA
 
     Genera explicación en lenguaje natural de los resultados del análisis.
     """
-    try:
-        interpretation = await quick_interpret(request.results, request.analysis_type)
+    interpretation = await quick_interpret(request.results, request.analysis_type)
 
-        return {
-            "status": "success",
-            "interpretation": interpretation,
-            "analysis_type": request.analysis_type
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Interpretation error: {str(e)}")
+    return {
+        "status": "success",
+        "interpretation": interpretation,
+        "analysis_type": request.analysis_type
+    }
 
 
 @app.post("/api/assistant/executive-summary")
+@http_500_on_error("Summary generation error")
 async def assistant_executive_summary(request: dict):
     """
     Genera un resumen ejecutivo de todos los análisis
 
     Ideal para presentar a directivos o comités de decisión.
     """
-    try:
-        assistant = get_assistant()
-        summary = await assistant.generate_executive_summary(request)
+    assistant = get_assistant()
+    summary = await assistant.generate_executive_summary(request)
 
-        return {
-            "status": "success",
-            "summary": summary
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Summary generation error: {str(e)}")
+    return {
+        "status": "success",
+        "summary": summary
+    }
 
 
 @app.post("/api/assistant/suggest-parameters")
-async def assistant_suggest_parameters(request: dict):
+@http_500_on_error("Suggestion error")
+async def assistant_suggest_parameters(request: SuggestParametersRequest):
     """
     Sugiere parámetros típicos basados en área terapéutica
 
     Útil para usuarios que empiezan un nuevo modelo y no conocen
     los rangos típicos de parámetros.
     """
-    try:
-        assistant = get_assistant()
-        disease_area = request.get("disease_area", "general")
-        treatment_type = request.get("treatment_type", "oral")
+    assistant = get_assistant()
+    disease_area = request.disease_area
+    treatment_type = request.treatment_type
 
-        suggestions = await assistant.suggest_parameters(disease_area, treatment_type)
+    suggestions = await assistant.suggest_parameters(disease_area, treatment_type)
 
-        return {
-            "status": "success",
-            "suggestions": suggestions,
-            "disease_area": disease_area,
-            "treatment_type": treatment_type
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Suggestion error: {str(e)}")
+    return {
+        "status": "success",
+        "suggestions": suggestions,
+        "disease_area": disease_area,
+        "treatment_type": treatment_type
+    }
+
+
+ASSISTANT_HELP_EXAMPLES = [
+    {
+        "category": "Conceptos",
+        "questions": [
+            "¿Qué es el ICER?",
+            "¿Cómo se calculan los QALYs?",
+            "¿Qué distribución uso para costes en el PSA?"
+        ]
+    },
+    {
+        "category": "Configuración",
+        "questions": [
+            "¿Qué horizonte temporal uso para oncología?",
+            "¿Cómo configuro un análisis de impacto presupuestario?",
+            "¿Qué estados necesito en un modelo Markov de diabetes?"
+        ]
+    },
+    {
+        "category": "Interpretación",
+        "questions": [
+            "¿Qué significa un ICER de 25,000 €/QALY?",
+            "¿Mi tratamiento es coste-efectivo?",
+            "¿Cómo interpreto el diagrama tornado?"
+        ]
+    },
+    {
+        "category": "HTA",
+        "questions": [
+            "¿Qué requisitos tiene NICE para submissions?",
+            "¿Qué tasa de descuento usa la AEMPS?",
+            "¿Cómo justifico mi horizonte temporal?"
+        ]
+    }
+]
+
+# The help text comes from the offline knowledge base, which always gives the
+# same answer to "ayuda", so the whole response is encoded once. An LLM reply
+# (or its error fallback) would vary and must not be cached
+_ASSISTANT_HELP_JSON = DefaultJSONResponse({
+    "status": "success",
+    "help": PharmacoeconomicsExpert.generate_offline_response([{"role": "user", "content": "ayuda"}]),
+    "examples": ASSISTANT_HELP_EXAMPLES
+}).body
 
 
 @app.get("/api/assistant/help")
@@ -582,184 +983,151 @@ async def assistant_help():
     """
     Muestra la ayuda del asistente y ejemplos de uso
     """
-    assistant = get_assistant()
-    help_text = await assistant.chat("ayuda")
-
-    return {
-        "status": "success",
-        "help": help_text,
-        "examples": [
-            {
-                "category": "Conceptos",
-                "questions": [
-                    "¿Qué es el ICER?",
-                    "¿Cómo se calculan los QALYs?",
-                    "¿Qué distribución uso para costes en el PSA?"
-                ]
-            },
-            {
-                "category": "Configuración",
-                "questions": [
-                    "¿Qué horizonte temporal uso para oncología?",
-                    "¿Cómo configuro un análisis de impacto presupuestario?",
-                    "¿Qué estados necesito en un modelo Markov de diabetes?"
-                ]
-            },
-            {
-                "category": "Interpretación",
-                "questions": [
-                    "¿Qué significa un ICER de 25,000 €/QALY?",
-                    "¿Mi tratamiento es coste-efectivo?",
-                    "¿Cómo interpreto el diagrama tornado?"
-                ]
-            },
-            {
-                "category": "HTA",
-                "questions": [
-                    "¿Qué requisitos tiene NICE para submissions?",
-                    "¿Qué tasa de descuento usa la AEMPS?",
-                    "¿Cómo justifico mi horizonte temporal?"
-                ]
-            }
-        ]
-    }
+    return Response(content=_ASSISTANT_HELP_JSON, media_type="application/json")
 
 
 # ============================================================================
 # QUICK-START TEMPLATES
 # ============================================================================
 
+TEMPLATES = [
+    {
+        "id": "oncology_nsclc",
+        "name": "Oncology - NSCLC",
+        "description": "Non-small cell lung cancer with immunotherapy vs chemotherapy",
+        "disease_area": "Oncology",
+        "parameters": {
+            "time_horizon": 20,
+            "discount_rate": 3.0,
+            "cost_drug_a": 8500,
+            "cost_drug_b": 1200,
+            "cost_stable": 300,
+            "cost_progression": 4500,
+            "prob_progression_a": 8,
+            "prob_progression_b": 15,
+            "utility_stable": 0.78,
+            "utility_progression": 0.45,
+            "wtp_threshold": 30000
+        },
+        "notes": "Based on typical NSCLC immunotherapy trial data. Adjust progression rates based on specific trial results."
+    },
+    {
+        "id": "oncology_breast",
+        "name": "Oncology - Breast Cancer",
+        "description": "HER2+ breast cancer with targeted therapy",
+        "disease_area": "Oncology",
+        "parameters": {
+            "time_horizon": 25,
+            "discount_rate": 3.0,
+            "cost_drug_a": 6000,
+            "cost_drug_b": 800,
+            "cost_stable": 250,
+            "cost_progression": 3800,
+            "prob_progression_a": 6,
+            "prob_progression_b": 12,
+            "utility_stable": 0.82,
+            "utility_progression": 0.50,
+            "wtp_threshold": 30000
+        },
+        "notes": "HER2+ breast cancer model. Consider adding adverse event costs for targeted therapy."
+    },
+    {
+        "id": "diabetes_t2dm",
+        "name": "Diabetes - Type 2",
+        "description": "SGLT2 inhibitor vs standard of care in T2DM",
+        "disease_area": "Metabolic",
+        "parameters": {
+            "time_horizon": 40,
+            "discount_rate": 3.0,
+            "cost_drug_a": 1500,
+            "cost_drug_b": 200,
+            "cost_stable": 150,
+            "cost_progression": 2500,
+            "prob_progression_a": 3,
+            "prob_progression_b": 5,
+            "utility_stable": 0.88,
+            "utility_progression": 0.65,
+            "wtp_threshold": 25000
+        },
+        "notes": "Long-term T2DM model. Progression represents complications (nephropathy, cardiovascular events)."
+    },
+    {
+        "id": "cardiovascular_hf",
+        "name": "Cardiovascular - Heart Failure",
+        "description": "Novel therapy for HFrEF",
+        "disease_area": "Cardiovascular",
+        "parameters": {
+            "time_horizon": 15,
+            "discount_rate": 3.0,
+            "cost_drug_a": 2200,
+            "cost_drug_b": 300,
+            "cost_stable": 400,
+            "cost_progression": 5000,
+            "prob_progression_a": 10,
+            "prob_progression_b": 18,
+            "utility_stable": 0.72,
+            "utility_progression": 0.45,
+            "wtp_threshold": 30000
+        },
+        "notes": "Heart failure with reduced ejection fraction. Includes hospitalization costs in progression state."
+    },
+    {
+        "id": "autoimmune_ra",
+        "name": "Autoimmune - Rheumatoid Arthritis",
+        "description": "JAK inhibitor vs biologic DMARD in RA",
+        "disease_area": "Autoimmune",
+        "parameters": {
+            "time_horizon": 30,
+            "discount_rate": 3.0,
+            "cost_drug_a": 3500,
+            "cost_drug_b": 2800,
+            "cost_stable": 200,
+            "cost_progression": 1800,
+            "prob_progression_a": 5,
+            "prob_progression_b": 8,
+            "utility_stable": 0.80,
+            "utility_progression": 0.55,
+            "wtp_threshold": 30000
+        },
+        "notes": "Rheumatoid arthritis with active disease. Consider adding joint replacement costs."
+    },
+    {
+        "id": "rare_disease_sma",
+        "name": "Rare Disease - SMA",
+        "description": "Gene therapy for spinal muscular atrophy",
+        "disease_area": "Rare Disease",
+        "parameters": {
+            "time_horizon": 50,
+            "discount_rate": 3.0,
+            "cost_drug_a": 150000,
+            "cost_drug_b": 5000,
+            "cost_stable": 2000,
+            "cost_progression": 15000,
+            "prob_progression_a": 2,
+            "prob_progression_b": 12,
+            "utility_stable": 0.70,
+            "utility_progression": 0.35,
+            "wtp_threshold": 100000
+        },
+        "notes": "Rare disease with one-time gene therapy. Higher WTP threshold often applied for rare diseases."
+    }
+]
+
+# Static, so encoded once at import; single templates are looked up by id
+_TEMPLATES_JSON = DefaultJSONResponse({"status": "success", "templates": TEMPLATES}).body
+_TEMPLATE_JSON_BY_ID = {
+    template["id"]: DefaultJSONResponse({"status": "success", "template": template}).body
+    for template in TEMPLATES
+}
+
+
 @app.get("/api/templates")
 async def get_templates():
     """
     Returns pre-configured templates for common analysis scenarios.
     Users can load these as starting points for their analyses.
     """
-    return {
-        "status": "success",
-        "templates": [
-            {
-                "id": "oncology_nsclc",
-                "name": "Oncology - NSCLC",
-                "description": "Non-small cell lung cancer with immunotherapy vs chemotherapy",
-                "disease_area": "Oncology",
-                "parameters": {
-                    "time_horizon": 20,
-                    "discount_rate": 3.0,
-                    "cost_drug_a": 8500,
-                    "cost_drug_b": 1200,
-                    "cost_stable": 300,
-                    "cost_progression": 4500,
-                    "prob_progression_a": 8,
-                    "prob_progression_b": 15,
-                    "utility_stable": 0.78,
-                    "utility_progression": 0.45,
-                    "wtp_threshold": 30000
-                },
-                "notes": "Based on typical NSCLC immunotherapy trial data. Adjust progression rates based on specific trial results."
-            },
-            {
-                "id": "oncology_breast",
-                "name": "Oncology - Breast Cancer",
-                "description": "HER2+ breast cancer with targeted therapy",
-                "disease_area": "Oncology",
-                "parameters": {
-                    "time_horizon": 25,
-                    "discount_rate": 3.0,
-                    "cost_drug_a": 6000,
-                    "cost_drug_b": 800,
-                    "cost_stable": 250,
-                    "cost_progression": 3800,
-                    "prob_progression_a": 6,
-                    "prob_progression_b": 12,
-                    "utility_stable": 0.82,
-                    "utility_progression": 0.50,
-                    "wtp_threshold": 30000
-                },
-                "notes": "HER2+ breast cancer model. Consider adding adverse event costs for targeted therapy."
-            },
-            {
-                "id": "diabetes_t2dm",
-                "name": "Diabetes - Type 2",
-                "description": "SGLT2 inhibitor vs standard of care in T2DM",
-                "disease_area": "Metabolic",
-                "parameters": {
-                    "time_horizon": 40,
-                    "discount_rate": 3.0,
-                    "cost_drug_a": 1500,
-                    "cost_drug_b": 200,
-                    "cost_stable": 150,
-                    "cost_progression": 2500,
-                    "prob_progression_a": 3,
-                    "prob_progression_b": 5,
-                    "utility_stable": 0.88,
-                    "utility_progression": 0.65,
-                    "wtp_threshold": 25000
-                },
-                "notes": "Long-term T2DM model. Progression represents complications (nephropathy, cardiovascular events)."
-            },
-            {
-                "id": "cardiovascular_hf",
-                "name": "Cardiovascular - Heart Failure",
-                "description": "Novel therapy for HFrEF",
-                "disease_area": "Cardiovascular",
-                "parameters": {
-                    "time_horizon": 15,
-                    "discount_rate": 3.0,
-                    "cost_drug_a": 2200,
-                    "cost_drug_b": 300,
-                    "cost_stable": 400,
-                    "cost_progression": 5000,
-                    "prob_progression_a": 10,
-                    "prob_progression_b": 18,
-                    "utility_stable": 0.72,
-                    "utility_progression": 0.45,
-                    "wtp_threshold": 30000
-                },
-                "notes": "Heart failure with reduced ejection fraction. Includes hospitalization costs in progression state."
-            },
-            {
-                "id": "autoimmune_ra",
-                "name": "Autoimmune - Rheumatoid Arthritis",
-                "description": "JAK inhibitor vs biologic DMARD in RA",
-                "disease_area": "Autoimmune",
-                "parameters": {
-                    "time_horizon": 30,
-                    "discount_rate": 3.0,
-                    "cost_drug_a": 3500,
-                    "cost_drug_b": 2800,
-                    "cost_stable": 200,
-                    "cost_progression": 1800,
-                    "prob_progression_a": 5,
-                    "prob_progression_b": 8,
-                    "utility_stable": 0.80,
-                    "utility_progression": 0.55,
-                    "wtp_threshold": 30000
-                },
-                "notes": "Rheumatoid arthritis with active disease. Consider adding joint replacement costs."
-            },
-            {
-                "id": "rare_disease_sma",
-                "name": "Rare Disease - SMA",
-                "description": "Gene therapy for spinal muscular atrophy",
-                "disease_area": "Rare Disease",
-                "parameters": {
-                    "time_horizon": 50,
-                    "discount_rate": 3.0,
-                    "cost_drug_a": 150000,
-                    "cost_drug_b": 5000,
-                    "cost_stable": 2000,
-                    "cost_progression": 15000,
-                    "prob_progression_a": 2,
-                    "prob_progression_b": 12,
-                    "utility_stable": 0.70,
-                    "utility_progression": 0.35,
-                    "wtp_threshold": 100000
-                },
-                "notes": "Rare disease with one-time gene therapy. Higher WTP threshold often applied for rare diseases."
-            }
-        ]
-    }
+    return Response(content=_TEMPLATES_JSON, media_type="application/json")
 
 
 @app.get("/api/templates/{template_id}")
@@ -767,16 +1135,12 @@ async def get_template(template_id: str):
     """
     Returns a specific template by ID
     """
-    templates = (await get_templates())["templates"]
-    template = next((t for t in templates if t["id"] == template_id), None)
+    content = _TEMPLATE_JSON_BY_ID.get(template_id)
 
-    if not template:
+    if content is None:
         raise HTTPException(status_code=404, detail=f"Template '{template_id}' not found")
 
-    return {
-        "status": "success",
-        "template": template
-    }
+    return Response(content=content, media_type="application/json")
 
 
 # ============================================================================
@@ -784,155 +1148,90 @@ async def get_template(template_id: str):
 # ============================================================================
 
 @app.post("/api/export/budget-impact/pdf")
-async def export_budget_impact_pdf(request: dict):
+@http_500_on_error("PDF generation failed", log_message="BIA PDF export failed")
+async def export_budget_impact_pdf(
+    request: BudgetImpactRequest,
+    cache_control: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Export Budget Impact Analysis results to professional PDF report
     """
-    try:
-        # Run BIA
-        results = run_budget_impact_analysis(request)
-
-        # Generate PDF
-        pdf_bytes = report_service.generate_budget_impact_pdf(
-            scenario_name=request.get('scenario_name', 'Budget Impact Analysis'),
-            user_email=request.get('user_email', 'anonymous@ecomodel.com'),
-            organization=request.get('organization', 'Demo Organization'),
-            parameters=request,
-            results=results
-        )
+    from engine.budget_impact import run_budget_impact_analysis
 
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=BIA_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            }
-        )
-    except Exception as e:
-        print(f"BIA PDF Export Error: {str(e)}")
-        print(traceback.format_exc())
-        raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(e)}")
+    return await _analysis_pdf_response(
+        run_budget_impact_analysis, "generate_budget_impact_pdf", request,
+        'Budget Impact Analysis', "BIA_Report", cache_control, if_none_match
+    )
 
 
 @app.post("/api/export/decision-tree/pdf")
-async def export_decision_tree_pdf(request: dict):
+@http_500_on_error("PDF generation failed", log_message="Decision Tree PDF export failed")
+async def export_decision_tree_pdf(
+    request: DecisionTreeRequest,
+    cache_control: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Export Decision Tree Analysis results to professional PDF report
     """
-    try:
-        # Run Decision Tree Analysis
-        results = run_decision_tree_analysis(request)
-
-        # Generate PDF
-        pdf_bytes = report_service.generate_decision_tree_pdf(
-            scenario_name=request.get('scenario_name', 'Decision Tree Analysis'),
-            user_email=request.get('user_email', 'anonymous@ecomodel.com'),
-            organization=request.get('organization', 'Demo Organization'),
-            parameters=request,
-            results=results
-        )
+    from engine.decision_tree import run_decision_tree_analysis
 
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=DecisionTree_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            }
-        )
-    except Exception as e:
-        print(f"Decision Tree PDF Export Error: {str(e)}")
-        print(traceback.format_exc())
-        raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(e)}")
+    return await _analysis_pdf_response(
+        run_decision_tree_analysis, "generate_decision_tree_pdf", request,
+        'Decision Tree Analysis', "DecisionTree_Report", cache_control, if_none_match
+    )
 
 
 @app.post("/api/export/survival/pdf")
-async def export_survival_pdf(request: dict):
+@http_500_on_error("PDF generation failed", log_message="Survival PDF export failed")
+async def export_survival_pdf(
+    request: SurvivalRequest,
+    cache_control: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Export Survival Analysis results to professional PDF report
     """
-    try:
-        # Run Survival Analysis
-        results = run_survival_analysis(request)
-
-        # Generate PDF
-        pdf_bytes = report_service.generate_survival_analysis_pdf(
-            scenario_name=request.get('scenario_name', 'Survival Analysis'),
-            user_email=request.get('user_email', 'anonymous@ecomodel.com'),
-            organization=request.get('organization', 'Demo Organization'),
-            parameters=request,
-            results=results
-        )
+    from engine.survival import run_survival_analysis
 
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=Survival_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            }
-        )
-    except Exception as e:
-        print(f"Survival PDF Export Error: {str(e)}")
-        print(traceback.format_exc())
-        raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(e)}")
+    return await _analysis_pdf_response(
+        run_survival_analysis, "generate_survival_analysis_pdf", request,
+        'Survival Analysis', "Survival_Report", cache_control, if_none_match
+    )
 
 
 @app.post("/api/export/voi/pdf")
-async def export_voi_pdf(request: dict):
+@http_500_on_error("PDF generation failed", log_message="VOI PDF export failed")
+async def export_voi_pdf(
+    request: VOIRequest,
+    cache_control: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Export Value of Information Analysis results to professional PDF report
     """
-    try:
-        # Run VOI Analysis
-        results = run_voi_analysis(request)
-
-        # Generate PDF
-        pdf_bytes = report_service.generate_voi_analysis_pdf(
-            scenario_name=request.get('scenario_name', 'Value of Information Analysis'),
-            user_email=request.get('user_email', 'anonymous@ecomodel.com'),
-            organization=request.get('organization', 'Demo Organization'),
-            parameters=request,
-            results=results
-        )
+    from engine.sensitivity.value_of_information import run_voi_analysis
 
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=VOI_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            }
-        )
-    except Exception as e:
-        print(f"VOI PDF Export Error: {str(e)}")
-        print(traceback.format_exc())
-        raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(e)}")
+    return await _analysis_pdf_response(
+        run_voi_analysis, "generate_voi_analysis_pdf", request,
+        'Value of Information Analysis', "VOI_Report", cache_control, if_none_match
+    )
 
 
 @app.post("/api/export/markov-flexible/pdf")
-async def export_markov_flexible_pdf(request: dict):
+@http_500_on_error("PDF generation failed", log_message="Markov Flexible PDF export failed")
+async def export_markov_flexible_pdf(
+    request: FlexibleMarkovRequest,
+    cache_control: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Export Flexible Markov Model results to professional PDF report
     """
-    try:
-        # Run Flexible Markov Analysis
-        results = run_flexible_markov_analysis(request)
-
-        # Generate PDF
-        pdf_bytes = report_service.generate_markov_flexible_pdf(
-            scenario_name=request.get('scenario_name', 'Flexible Markov Analysis'),
-            user_email=request.get('user_email', 'anonymous@ecomodel.com'),
-            organization=request.get('organization', 'Demo Organization'),
-            parameters=request,
-            results=results
-        )
+    from engine.markov.flexible import run_flexible_markov_analysis
 
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=MarkovFlex_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            }
-        )
-    except Exception as e:
-        print(f"Markov Flexible PDF Export Error: {str(e)}")
-        print(traceback.format_exc())
-        raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(e)}")
+    return await _analysis_pdf_response(
+        run_flexible_markov_analysis, "generate_markov_flexible_pdf", request,
+        'Flexible Markov Analysis', "MarkovFlex_Report", cache_control, if_none_match
+    )
@@ -3,7 +3,8 @@ from app.models.organization import Organization
 from app.models.economic_model import EconomicModel
 from app.models.parameter import Parameter
 from app.models.scenario import Scenario
-from app.models.simulation import Simulation
+from app.models.simulation import Simulation, SimulationPSASample
+from app.models.report import ReportJob
 
 __all__ = [
     "User",
@@ -12,4 +13,6 @@ __all__ = [
     "Parameter",
     "Scenario",
     "Simulation",
+    "SimulationPSASample",
+    "ReportJob",
 ]
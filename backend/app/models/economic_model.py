@@ -1,11 +1,10 @@
-from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, ForeignKey, Index, CheckConstraint, text
 
 from sqlalchemy.orm import relationship
-from datetime import datetime
 import uuid
 import enum
 from app.db.base import Base
-from app.db.compat import GUID, JSONType
+from app.db.compat import GUID, JSONType, utcnow
 
 class ModelType(str, enum.Enum):
     MARKOV = "markov"
@@ -14,22 +13,30 @@ class ModelType(str, enum.Enum):
 
 class EconomicModel(Base):
     __tablename__ = "economic_models"
+    __table_args__ = (
+        # Partial index for the published-only listing in list_models
+        Index("ix_models_published_id", "id", postgresql_where=text("is_published = true")),
+        # Keyset pagination in list_models
+        Index("ix_economic_models_created_at_id", "created_at", "id"),
+        CheckConstraint(
+            "model_type IN ('markov', 'decision_tree', 'partition_survival')",
+            name="ck_economic_models_model_type",
+        ),
+    )
 
     id = Column(GUID, primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
     description = Column(Text)
-    model_type = Column(
-        SQLEnum(ModelType, values_callable=lambda obj: [e.value for e in obj]),
-        nullable=False, default=ModelType.MARKOV
-    )
+    # String + CHECK instead of a native enum, validated against ModelType
+    model_type = Column(String, nullable=False, default=ModelType.MARKOV.value)
     script_content = Column(Text)  # Python script uploaded by Global Admin
     script_hash = Column(String)  # SHA256 for versioning
     config = Column(JSONType, default={})  # Model configuration
     version = Column(String, default="1.0")
     is_published = Column(Boolean, default=False)
     created_by_id = Column(GUID, ForeignKey("users.id"))
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=utcnow())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=utcnow(), onupdate=utcnow())
 
     # Relationships
     parameters = relationship("Parameter", back_populates="model", cascade="all, delete-orphan")
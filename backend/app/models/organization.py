@@ -1,20 +1,24 @@
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
-from datetime import datetime
 import uuid
 from app.db.base import Base
-from app.db.compat import GUID, JSONType
+from app.db.compat import GUID, JSONType, utcnow
 
 
 class Organization(Base):
     __tablename__ = "organizations"
+    __table_args__ = (
+        UniqueConstraint("name", name="uq_organizations_name"),
+        # Keyset pagination in list_organizations
+        Index("ix_organizations_created_at_id", "created_at", "id"),
+    )
 
     id = Column(GUID, primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
     country = Column(String(2), nullable=False)  # ISO 3166-1 alpha-2
     settings = Column(JSONType, default={})
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=utcnow())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=utcnow(), onupdate=utcnow())
 
     # Relationships
     users = relationship("User", back_populates="organization")
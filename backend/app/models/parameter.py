@@ -1,11 +1,10 @@
-from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, ForeignKey, Index, CheckConstraint
 
 from sqlalchemy.orm import relationship
-from datetime import datetime
 import uuid
 import enum
 from app.db.base import Base
-from app.db.compat import GUID, JSONType
+from app.db.compat import GUID, JSONType, utcnow
 
 class DataType(str, enum.Enum):
     FLOAT = "float"
@@ -22,6 +21,19 @@ class InputType(str, enum.Enum):
 
 class Parameter(Base):
     __tablename__ = "parameters"
+    __table_args__ = (
+        Index("ix_parameters_model_display", "model_id", "display_order"),
+        # Parameter names are unique within a model
+        Index("ix_parameters_model_name", "model_id", "name", unique=True),
+        CheckConstraint(
+            "data_type IN ('float', 'int', 'percentage', 'currency', 'boolean')",
+            name="ck_parameters_data_type",
+        ),
+        CheckConstraint(
+            "input_type IN ('slider', 'number', 'select', 'checkbox')",
+            name="ck_parameters_input_type",
+        ),
+    )
 
     id = Column(GUID, primary_key=True, default=uuid.uuid4)
     model_id = Column(GUID, ForeignKey("economic_models.id"), nullable=False)
@@ -29,23 +41,18 @@ class Parameter(Base):
     display_name = Column(String, nullable=False)  # UI label
     description = Column(Text)
     category = Column(String)  # For accordion grouping: "Costes", "Utilidades", etc.
-    data_type = Column(
-        SQLEnum(DataType, values_callable=lambda obj: [e.value for e in obj]),
-        nullable=False, default=DataType.FLOAT
-    )
-    input_type = Column(
-        SQLEnum(InputType, values_callable=lambda obj: [e.value for e in obj]),
-        nullable=False, default=InputType.NUMBER
-    )
+    # String + CHECK instead of native enums, validated against DataType / InputType
+    data_type = Column(String, nullable=False, default=DataType.FLOAT.value)
+    input_type = Column(String, nullable=False, default=InputType.NUMBER.value)
     default_value = Column(JSONType, nullable=True)
     constraints = Column(JSONType, default={})  # {min, max, step, options}
     distribution = Column(JSONType)  # For PSA: {type: "beta", alpha: 10, beta: 90}
     is_country_specific = Column(Boolean, default=False)
     is_editable_by_local = Column(Boolean, default=True)
-    display_order = Column(Integer, default=0)
+    display_order = Column(Integer, nullable=False, default=0)
     unit = Column(String)  # "EUR", "%", "days"
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=utcnow())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=utcnow(), onupdate=utcnow())
 
     # Relationships
     model = relationship("EconomicModel", back_populates="parameters")
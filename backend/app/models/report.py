@@ -0,0 +1,39 @@
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, LargeBinary, CheckConstraint
+
+import uuid
+import enum
+from app.db.base import Base
+from app.db.compat import GUID, JSONType, utcnow
+
+class ReportFormat(str, enum.Enum):
+    PDF = "pdf"
+    EXCEL = "excel"
+
+class ReportJobStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    GENERATING = "GENERATING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+class ReportJob(Base):
+    """A simulation report rendered by the Celery worker (reports queue)"""
+    __tablename__ = "report_jobs"
+    __table_args__ = (
+        CheckConstraint("format IN ('pdf', 'excel')", name="ck_report_jobs_format"),
+        CheckConstraint(
+            "status IN ('PENDING', 'GENERATING', 'COMPLETED', 'FAILED')",
+            name="ck_report_jobs_status",
+        ),
+    )
+
+    id = Column(GUID, primary_key=True, default=uuid.uuid4)
+    simulation_id = Column(GUID, ForeignKey("simulations.id", ondelete="CASCADE"), nullable=False)
+    created_by_id = Column(GUID, ForeignKey("users.id"), nullable=False)
+    format = Column(String, nullable=False)
+    options = Column(JSONType, default={})  # include_psa / include_tornado for Excel
+    status = Column(String, nullable=False, default=ReportJobStatus.PENDING.value)
+    filename = Column(String)
+    content = Column(LargeBinary)  # The rendered document, once COMPLETED
+    error_message = Column(Text)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=utcnow())
+    completed_at = Column(DateTime(timezone=True))
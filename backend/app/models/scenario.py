@@ -1,17 +1,20 @@
-from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Index
 
 from sqlalchemy.orm import relationship
-from datetime import datetime
 import uuid
 from app.db.base import Base
-from app.db.compat import GUID, JSONType
+from app.db.compat import GUID, JSONType, utcnow
 
 class Scenario(Base):
     __tablename__ = "scenarios"
+    __table_args__ = (
+        # Keyset pagination in list_scenarios
+        Index("ix_scenarios_created_at_id", "created_at", "id"),
+    )
 
     id = Column(GUID, primary_key=True, default=uuid.uuid4)
-    model_id = Column(GUID, ForeignKey("economic_models.id"), nullable=False)
-    organization_id = Column(GUID, ForeignKey("organizations.id"), nullable=False)
+    model_id = Column(GUID, ForeignKey("economic_models.id"), nullable=False, index=True)
+    organization_id = Column(GUID, ForeignKey("organizations.id"), nullable=False, index=True)
     name = Column(String, nullable=False)
     description = Column(Text)
     country_code = Column(String(2))  # ISO 3166-1 alpha-2
@@ -19,8 +22,8 @@ class Scenario(Base):
     is_base_case = Column(Boolean, default=False)
     is_locked = Column(Boolean, default=False)  # For viewers
     created_by_id = Column(GUID, ForeignKey("users.id"))
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=utcnow())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=utcnow(), onupdate=utcnow())
 
     # Relationships
     model = relationship("EconomicModel", back_populates="scenarios")
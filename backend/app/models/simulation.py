@@ -1,11 +1,10 @@
-from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, Integer, Float, DateTime, ForeignKey, Index, Enum as SQLEnum
 
 from sqlalchemy.orm import relationship
-from datetime import datetime
 import uuid
 import enum
 from app.db.base import Base
-from app.db.compat import GUID, JSONType
+from app.db.compat import GUID, JSONType, utcnow
 
 class SimulationType(str, enum.Enum):
     DETERMINISTIC = "deterministic"
@@ -21,6 +20,10 @@ class SimulationStatus(str, enum.Enum):
 
 class Simulation(Base):
     __tablename__ = "simulations"
+    __table_args__ = (
+        # Per-scenario counts, and the latest completed run via a backward index scan
+        Index("ix_simulations_scenario_status_created", "scenario_id", "status", "created_at"),
+    )
 
     id = Column(GUID, primary_key=True, default=uuid.uuid4)
     scenario_id = Column(GUID, ForeignKey("scenarios.id"), nullable=False)
@@ -29,13 +32,32 @@ class Simulation(Base):
     celery_task_id = Column(String)
     input_snapshot = Column(JSONType, default={})  # Inputs at execution time
     results = Column(JSONType, default={})  # {drug_a, drug_b, incremental}
-    sensitivity_results = Column(JSONType)  # For SA/PSA: tornado, psa_iterations, ceac_data
+    sensitivity_results = Column(JSONType)  # For SA/PSA: tornado, PSA summary and ceac_data
     execution_time_ms = Column(Integer)
     error_message = Column(Text)
     created_by_id = Column(GUID, ForeignKey("users.id"))
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=utcnow())
     completed_at = Column(DateTime)
 
     # Relationships
     scenario = relationship("Scenario", back_populates="simulations")
     created_by_user = relationship("User", back_populates="simulations")
+    psa_samples = relationship(
+        "SimulationPSASample",
+        back_populates="simulation",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+
+class SimulationPSASample(Base):
+    """One Monte Carlo iteration of a PSA simulation"""
+    __tablename__ = "simulation_psa_samples"
+
+    simulation_id = Column(GUID, ForeignKey("simulations.id", ondelete="CASCADE"), primary_key=True)
+    iteration = Column(Integer, primary_key=True)
+    delta_cost = Column(Float, nullable=False)
+    delta_qaly = Column(Float, nullable=False)
+    icer = Column(Float)
+
+    simulation = relationship("Simulation", back_populates="psa_samples")
@@ -1,11 +1,10 @@
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, CheckConstraint, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
-from datetime import datetime
 import uuid
 import enum
 from app.db.base import Base
-from app.db.compat import GUID, JSONType
+from app.db.compat import GUID, JSONType, utcnow
 
 class UserRole(str, enum.Enum):
     GLOBAL_ADMIN = "global_admin"
@@ -14,6 +13,12 @@ class UserRole(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        CheckConstraint(
+            "role IN ('global_admin', 'local_user', 'viewer')",
+            name="ck_users_role",
+        ),
+    )
 
     id = Column(GUID, primary_key=True, default=uuid.uuid4)
     email = Column(String, unique=True, nullable=False, index=True)
@@ -22,9 +27,9 @@ class User(Base):
     # Use String type to avoid enum mapping issues, validation will use UserRole enum
     role = Column(String, nullable=False, default="local_user")
     is_active = Column(Boolean, default=True)
-    organization_id = Column(GUID, ForeignKey("organizations.id"), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    organization_id = Column(GUID, ForeignKey("organizations.id"), nullable=True, index=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=utcnow())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=utcnow(), onupdate=utcnow())
 
     # Relationships
     organization = relationship("Organization", back_populates="users")
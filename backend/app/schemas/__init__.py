@@ -1,5 +1,5 @@
 from .auth import LoginRequest, LoginResponse, TokenResponse, UserResponse
-from .simulation import SimulationRequest, SimulationResponse
+from .simulation import SimulationRequest, SimulationResponse, PSASample
 from .organization import (
     Organization,
     OrganizationCreate,
@@ -52,6 +52,7 @@ __all__ = [
     # Simulation
     "SimulationRequest",
     "SimulationResponse",
+    "PSASample",
     # Organization
     "Organization",
     "OrganizationCreate",
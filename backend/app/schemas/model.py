@@ -1,15 +1,19 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import datetime
 from uuid import UUID
 
+ModelTypeName = Literal[
+    "MARKOV", "DECISION_TREE", "PARTITION_SURVIVAL", "markov", "decision_tree", "partition_survival"
+]
+
 
 class ModelBase(BaseModel):
     model_config = ConfigDict(protected_namespaces=())
 
     name: str = Field(..., min_length=1, max_length=200)
     description: Optional[str] = None
-    model_type: str = Field(..., pattern="^(MARKOV|DECISION_TREE|PARTITION_SURVIVAL|markov|decision_tree|partition_survival)$")
+    model_type: ModelTypeName
     script_content: Optional[str] = None
     config: Optional[dict] = Field(default_factory=dict)
     version: str = Field(default="1.0")
@@ -22,7 +26,7 @@ class ModelCreate(ModelBase):
 class ModelUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=200)
     description: Optional[str] = None
-    model_type: Optional[str] = Field(None, pattern="^(MARKOV|DECISION_TREE|PARTITION_SURVIVAL|markov|decision_tree|partition_survival)$")
+    model_type: Optional[ModelTypeName] = None
     script_content: Optional[str] = None
     config: Optional[dict] = None
     version: Optional[str] = None
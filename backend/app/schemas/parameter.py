@@ -1,8 +1,11 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import datetime
 from uuid import UUID
 
+DataTypeName = Literal["FLOAT", "INT", "PERCENTAGE", "CURRENCY", "BOOLEAN"]
+InputTypeName = Literal["SLIDER", "NUMBER", "SELECT", "CHECKBOX"]
+
 
 class ParameterBase(BaseModel):
     model_config = ConfigDict(protected_namespaces=())
@@ -11,8 +14,9 @@ class ParameterBase(BaseModel):
     display_name: str = Field(..., min_length=1, max_length=200, description="Human-readable name")
     description: Optional[str] = None
     category: str = Field(default="general", max_length=100, description="e.g., 'costs', 'probabilities', 'utilities'")
-    data_type: str = Field(default="FLOAT", pattern="^(FLOAT|INT|PERCENTAGE|CURRENCY|BOOLEAN|float|int|percentage|currency|boolean)$")
-    input_type: str = Field(default="NUMBER", pattern="^(SLIDER|NUMBER|SELECT|CHECKBOX|slider|number|select|checkbox)$")
+    # Stored lowercase; either case is accepted on create
+    data_type: Literal[DataTypeName, "float", "int", "percentage", "currency", "boolean"] = "FLOAT"
+    input_type: Literal[InputTypeName, "slider", "number", "select", "checkbox"] = "NUMBER"
     constraints: Optional[dict] = Field(default_factory=dict, description="min, max, step, options")
     default_value: Optional[float] = None
     distribution: Optional[dict] = Field(default_factory=dict, description="type, params for PSA")
@@ -36,8 +40,8 @@ class ParameterUpdate(BaseModel):
     display_name: Optional[str] = Field(None, min_length=1, max_length=200)
     description: Optional[str] = None
     category: Optional[str] = Field(None, max_length=100)
-    data_type: Optional[str] = Field(None, pattern="^(FLOAT|INT|PERCENTAGE|CURRENCY|BOOLEAN)$")
-    input_type: Optional[str] = Field(None, pattern="^(SLIDER|NUMBER|SELECT|CHECKBOX)$")
+    data_type: Optional[DataTypeName] = None
+    input_type: Optional[InputTypeName] = None
     constraints: Optional[dict] = None
     default_value: Optional[float] = None
     distribution: Optional[dict] = None
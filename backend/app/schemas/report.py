@@ -1,12 +1,12 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import datetime
 from uuid import UUID
 
 
 class ReportGenerateRequest(BaseModel):
     simulation_ids: List[UUID] = Field(..., min_items=1, description="Simulations to include in report")
-    template_type: str = Field(default="comprehensive", pattern="^(comprehensive|deterministic|tornado|psa)$")
+    template_type: Literal["comprehensive", "deterministic", "tornado", "psa"] = "comprehensive"
     title: Optional[str] = Field(None, max_length=200)
     include_charts: bool = Field(default=True, description="Include visualizations")
     include_sensitivity: bool = Field(default=True, description="Include sensitivity analysis if available")
@@ -20,7 +20,7 @@ class ReportExcelRequest(BaseModel):
 
 class ReportStatus(BaseModel):
     id: UUID
-    status: str = Field(..., pattern="^(PENDING|GENERATING|COMPLETED|FAILED)$")
+    status: Literal["PENDING", "GENERATING", "COMPLETED", "FAILED"]
     progress: int = Field(default=0, ge=0, le=100, description="Generation progress percentage")
     created_at: datetime
     completed_at: Optional[datetime] = None
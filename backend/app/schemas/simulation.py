@@ -1,13 +1,14 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Dict, Optional
 from uuid import UUID
+from app.config import settings
 from app.models.simulation import SimulationType, SimulationStatus
 
 
 class SimulationRequest(BaseModel):
     scenario_id: UUID
     simulation_type: SimulationType = SimulationType.DETERMINISTIC
-    iterations: Optional[int] = None  # For PSA
+    iterations: Optional[int] = Field(None, ge=1, le=settings.PSA_MAX_ITERATIONS)  # For PSA
     seed: Optional[int] = None  # For reproducibility
 
 
@@ -22,3 +23,13 @@ class SimulationResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class PSASample(BaseModel):
+    iteration: int
+    delta_cost: float
+    delta_qaly: float
+    icer: Optional[float] = None
+
+    class Config:
+        from_attributes = True
@@ -1,13 +1,15 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime
 from uuid import UUID
 
+UserRoleName = Literal["global_admin", "local_user", "viewer"]
+
 
 class UserBase(BaseModel):
     email: EmailStr
     full_name: str = Field(..., min_length=1, max_length=200)
-    role: str = Field(..., pattern="^(global_admin|local_user|viewer)$")
+    role: UserRoleName
 
 
 class UserCreate(UserBase):
@@ -18,7 +20,7 @@ class UserCreate(UserBase):
 class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
     full_name: Optional[str] = Field(None, min_length=1, max_length=200)
-    role: Optional[str] = Field(None, pattern="^(global_admin|local_user|viewer)$")
+    role: Optional[UserRoleName] = None
     password: Optional[str] = Field(None, min_length=8, max_length=100)
     organization_id: Optional[UUID] = None
 
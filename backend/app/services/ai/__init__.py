@@ -4,7 +4,8 @@ from .assistant import (
     LLMProvider,
     PharmacoeconomicsExpert,
     get_assistant,
-    quick_interpret
+    quick_interpret,
+    close_http_client
 )
 
 __all__ = [
@@ -13,5 +14,6 @@ __all__ = [
     "LLMProvider",
     "PharmacoeconomicsExpert",
     "get_assistant",
-    "quick_interpret"
+    "quick_interpret",
+    "close_http_client"
 ]
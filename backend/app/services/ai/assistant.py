@@ -37,6 +37,30 @@ class AssistantConfig:
     language: str = "es"  # Español por defecto
 
 
+# Cliente HTTP único para los clientes LLM: las conexiones (y sesiones TLS)
+# con el proveedor se reutilizan entre llamadas al asistente
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+HTTP_TIMEOUT = 30.0
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Cliente HTTP compartido, creado en el primer uso"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Cerrar el cliente HTTP compartido (apagado de la aplicación)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
 class BaseLLMClient(ABC):
     """Clase base para clientes LLM"""
 
@@ -57,27 +81,26 @@ class OpenAIClient(BaseLLMClient):
         if not self.api_key:
             return self._fallback_response(messages)
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    self.base_url,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": kwargs.get("model", self.config.model),
-                        "messages": messages,
-                        "temperature": kwargs.get("temperature", self.config.temperature),
-                        "max_tokens": kwargs.get("max_tokens", self.config.max_tokens)
-                    },
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data["choices"][0]["message"]["content"]
-            except Exception as e:
-                return self._fallback_response(messages, str(e))
+        client = get_http_client()
+        try:
+            response = await client.post(
+                self.base_url,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": kwargs.get("model", self.config.model),
+                    "messages": messages,
+                    "temperature": kwargs.get("temperature", self.config.temperature),
+                    "max_tokens": kwargs.get("max_tokens", self.config.max_tokens)
+                }
+            )
+            response.raise_for_status()
+            data = response.json()
+            return data["choices"][0]["message"]["content"]
+        except Exception as e:
+            return self._fallback_response(messages, str(e))
 
     def _fallback_response(self, messages: List[Dict], error: str = None) -> str:
         """Respuesta de fallback cuando no hay API disponible"""
@@ -100,28 +123,27 @@ class AnthropicClient(BaseLLMClient):
         system_msg = next((m["content"] for m in messages if m["role"] == "system"), "")
         conversation = [m for m in messages if m["role"] != "system"]
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    self.base_url,
-                    headers={
-                        "x-api-key": self.api_key,
-                        "Content-Type": "application/json",
-                        "anthropic-version": "2023-06-01"
-                    },
-                    json={
-                        "model": kwargs.get("model", "claude-3-haiku-20240307"),
-                        "system": system_msg,
-                        "messages": conversation,
-                        "max_tokens": kwargs.get("max_tokens", self.config.max_tokens)
-                    },
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data["content"][0]["text"]
-            except Exception:
-                return PharmacoeconomicsExpert.generate_offline_response(messages)
+        client = get_http_client()
+        try:
+            response = await client.post(
+                self.base_url,
+                headers={
+                    "x-api-key": self.api_key,
+                    "Content-Type": "application/json",
+                    "anthropic-version": "2023-06-01"
+                },
+                json={
+                    "model": kwargs.get("model", "claude-3-haiku-20240307"),
+                    "system": system_msg,
+                    "messages": conversation,
+                    "max_tokens": kwargs.get("max_tokens", self.config.max_tokens)
+                }
+            )
+            response.raise_for_status()
+            data = response.json()
+            return data["content"][0]["text"]
+        except Exception:
+            return PharmacoeconomicsExpert.generate_offline_response(messages)
 
 
 class PharmacoeconomicsExpert:
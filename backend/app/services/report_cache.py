@@ -0,0 +1,123 @@
+"""
+In-process caches for the analysis PDF reports.
+
+The public export endpoints rerun the analysis and ReportLab on every
+request, although the same body always renders the same document. Two
+caches sit in front of that work, both keyed by SHA-256 of the canonical
+encoding of the request:
+
+- rendered PDFs, keyed by the report type and the whole request, kept
+  with the render time printed on them and reused for at most
+  REPORT_CACHE_SECONDS so that date stays current; each carries an ETag
+  computed from the PDF bytes
+- analysis results, keyed by the engine and the request without the
+  cosmetic report fields (REPORT_COSMETIC_KEYS), so re-exporting with only
+  a new title or organization re-renders without rerunning the model
+
+The canonical encoding is msgspec MessagePack with sorted keys, several
+times faster than json.dumps(sort_keys=True) on large request bodies. Unlike
+msgspec's JSON encoder, which writes NaN and Infinity as null, it keeps
+non-finite floats apart from None and from each other (the json.dumps
+fallback writes them as NaN/Infinity literals). REPORT_VERSION is
+part of every key; bump it when a report template or an engine changes its
+output, so entries rendered by the previous code are not served.
+"""
+import hashlib
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+try:
+    import msgspec
+    _canonical_encoder = msgspec.msgpack.Encoder(enc_hook=str, order="sorted")
+except ImportError:
+    _canonical_encoder = None
+
+# Part of every cache key; bump when report templates or engine results change
+REPORT_VERSION = 1
+
+REPORT_CACHE_SIZE = 128
+REPORT_CACHE_SECONDS = 300
+ANALYSIS_CACHE_SIZE = 128
+
+# Request fields that only label the report; the engines never read them
+REPORT_COSMETIC_KEYS = ("scenario_name", "user_email", "organization")
+
+
+class CachedReport(NamedTuple):
+    pdf: bytes
+    generated_at: datetime  # Render time printed on the report
+    etag: str  # Strong ETag of pdf
+
+
+def report_etag(pdf: bytes) -> str:
+    """Strong ETag for a rendered PDF: a hash of its bytes, render date included"""
+    return f'"{hashlib.sha256(pdf).hexdigest()}"'
+
+
+# key -> (monotonic expiry, report)
+_reports: Dict[str, Tuple[float, CachedReport]] = {}
+_analyses: Dict[str, dict] = {}
+
+
+def _canonical_bytes(params: dict) -> bytes:
+    if _canonical_encoder is not None:
+        return _canonical_encoder.encode(params)
+    return json.dumps(params, sort_keys=True, separators=(",", ":"), default=str).encode()
+
+
+def _hash_key(namespace: str, params: dict) -> str:
+    namespace = f"{namespace}@v{REPORT_VERSION}"
+    return hashlib.sha256(namespace.encode() + b"\n" + _canonical_bytes(params)).hexdigest()
+
+
+def _lru_get(cache: Dict[str, Any], key: str) -> Optional[Any]:
+    value = cache.pop(key, None)
+    if value is not None:
+        cache[key] = value
+    return value
+
+
+def _lru_store(cache: Dict[str, Any], key: str, value: Any, size: int) -> None:
+    cache.pop(key, None)
+    if len(cache) >= size:
+        # Dicts keep insertion order and hits are moved to the end
+        cache.pop(next(iter(cache)), None)
+    cache[key] = value
+
+
+def report_key(report: str, params: dict) -> str:
+    """Cache key for one report type rendered from a request body"""
+    return _hash_key(report, params)
+
+
+def get_report(key: str) -> Optional[CachedReport]:
+    """Cached report for key, marked as most recently used; None on a miss or once expired"""
+    entry = _lru_get(_reports, key)
+    if entry is None:
+        return None
+    if entry[0] <= time.monotonic():
+        _reports.pop(key, None)
+        return None
+    return entry[1]
+
+
+def store_report(key: str, report: CachedReport) -> None:
+    """Cache a rendered report, evicting the least recently used one when full"""
+    _lru_store(_reports, key, (time.monotonic() + REPORT_CACHE_SECONDS, report), REPORT_CACHE_SIZE)
+
+
+def analysis_key(analysis: str, params: dict) -> str:
+    """Cache key for an engine's results: the request minus the cosmetic report fields"""
+    return _hash_key(analysis, {k: v for k, v in params.items() if k not in REPORT_COSMETIC_KEYS})
+
+
+def get_analysis(key: str) -> Optional[dict]:
+    """Cached analysis results for key, marked as most recently used; None on a miss"""
+    return _lru_get(_analyses, key)
+
+
+def store_analysis(key: str, results: dict) -> None:
+    """Cache analysis results, evicting the least recently used ones when full"""
+    _lru_store(_analyses, key, results, ANALYSIS_CACHE_SIZE)
@@ -5,7 +5,7 @@ Handles PDF and Excel export of simulation results
 
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, BinaryIO, Callable, Tuple, Union
 import io
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
@@ -105,8 +105,9 @@ class ReportService:
         parameters: Dict[str, Any],
         results_drug_a: Dict[str, float],
         results_drug_b: Dict[str, float],
-        psa_results: Optional[Dict[str, Any]] = None
-    ) -> bytes:
+        psa_results: Optional[Dict[str, Any]] = None,
+        output: Optional[BinaryIO] = None
+    ) -> Union[bytes, BinaryIO]:
         """
         Generate PDF report from simulation results using reportlab
 
@@ -118,9 +119,10 @@ class ReportService:
             results_drug_a: Results for Drug A
             results_drug_b: Results for Drug B
             psa_results: Optional PSA results
+            output: Optional binary file to write the PDF into
 
         Returns:
-            bytes: PDF file content
+            bytes: PDF file content, or output itself when given
         """
         # Calculate key metrics
         delta_costs = results_drug_a['total_cost'] - results_drug_b['total_cost']
@@ -135,7 +137,7 @@ class ReportService:
         is_cost_effective = icer <= wtp_threshold
 
         # Create PDF buffer
-        buffer = io.BytesIO()
+        buffer = output if output is not None else io.BytesIO()
         doc = SimpleDocTemplate(
             buffer,
             pagesize=A4,
@@ -313,6 +315,9 @@ class ReportService:
         # Build PDF
         doc.build(story)
 
+        if output is not None:
+            return output
+
         buffer.seek(0)
         return buffer.getvalue()
 
@@ -324,8 +329,9 @@ class ReportService:
         results_drug_a: Dict[str, float],
         results_drug_b: Dict[str, float],
         psa_results: Optional[Dict[str, Any]] = None,
-        tornado_results: Optional[Dict[str, Any]] = None
-    ) -> bytes:
+        tornado_results: Optional[Dict[str, Any]] = None,
+        output: Optional[BinaryIO] = None
+    ) -> Union[bytes, BinaryIO]:
         """
         Generate Excel report with multiple sheets
 
@@ -337,9 +343,10 @@ class ReportService:
             results_drug_b: Results for Drug B
             psa_results: Optional PSA results
             tornado_results: Optional Tornado results
+            output: Optional seekable binary file to write the workbook into
 
         Returns:
-            bytes: Excel file content
+            bytes: Excel file content, or output itself when given
         """
         wb = Workbook()
 
@@ -395,6 +402,10 @@ class ReportService:
                 header_font, header_fill, title_font, border
             )
 
+        if output is not None:
+            wb.save(output)
+            return output
+
         # Save to bytes
         excel_buffer = io.BytesIO()
         wb.save(excel_buffer)
@@ -671,7 +682,8 @@ class ReportService:
         user_email: str,
         organization: str,
         parameters: Dict[str, Any],
-        results: Dict[str, Any]
+        results: Dict[str, Any],
+        generated_at: Optional[datetime] = None
     ) -> bytes:
         """
         Generate PDF report for Budget Impact Analysis
@@ -682,6 +694,7 @@ class ReportService:
             organization: Organization name
             parameters: BIA parameters
             results: BIA results
+            generated_at: Render time printed on the report (default: now)
 
         Returns:
             bytes: PDF file content
@@ -713,7 +726,7 @@ class ReportService:
         metadata = [
             ['Organization:', organization or 'N/A'],
             ['Generated by:', user_email],
-            ['Date:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+            ['Date:', (generated_at or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')],
             ['Time Horizon:', f"{parameters.get('time_horizon', 'N/A')} years"],
             ['Target Population:', f"{parameters.get('target_population', 0):,} patients"],
         ]
@@ -823,7 +836,8 @@ class ReportService:
         user_email: str,
         organization: str,
         parameters: Dict[str, Any],
-        results: Dict[str, Any]
+        results: Dict[str, Any],
+        generated_at: Optional[datetime] = None
     ) -> bytes:
         """
         Generate PDF report for Decision Tree Analysis
@@ -855,7 +869,7 @@ class ReportService:
         metadata = [
             ['Organization:', organization or 'N/A'],
             ['Generated by:', user_email],
-            ['Date:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+            ['Date:', (generated_at or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')],
             ['Number of Strategies:', str(len(results.get('strategies', [])))],
         ]
 
@@ -922,7 +936,8 @@ class ReportService:
         user_email: str,
         organization: str,
         parameters: Dict[str, Any],
-        results: Dict[str, Any]
+        results: Dict[str, Any],
+        generated_at: Optional[datetime] = None
     ) -> bytes:
         """
         Generate PDF report for Survival Analysis
@@ -954,7 +969,7 @@ class ReportService:
         metadata = [
             ['Organization:', organization or 'N/A'],
             ['Generated by:', user_email],
-            ['Date:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+            ['Date:', (generated_at or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')],
             ['Analysis Type:', 'Parametric Survival Modeling'],
         ]
 
@@ -1047,7 +1062,8 @@ class ReportService:
         user_email: str,
         organization: str,
         parameters: Dict[str, Any],
-        results: Dict[str, Any]
+        results: Dict[str, Any],
+        generated_at: Optional[datetime] = None
     ) -> bytes:
         """
         Generate PDF report for Flexible Markov Model Analysis
@@ -1079,7 +1095,7 @@ class ReportService:
         metadata = [
             ['Organization:', organization or 'N/A'],
             ['Generated by:', user_email],
-            ['Date:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+            ['Date:', (generated_at or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')],
             ['Number of States:', str(len(parameters.get('states', [])))],
             ['Time Horizon:', f"{parameters.get('time_horizon', 'N/A')} cycles"],
         ]
@@ -1169,7 +1185,8 @@ class ReportService:
         user_email: str,
         organization: str,
         parameters: Dict[str, Any],
-        results: Dict[str, Any]
+        results: Dict[str, Any],
+        generated_at: Optional[datetime] = None
     ) -> bytes:
         """
         Generate PDF report for Value of Information Analysis
@@ -1201,7 +1218,7 @@ class ReportService:
         metadata = [
             ['Organization:', organization or 'N/A'],
             ['Generated by:', user_email],
-            ['Date:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+            ['Date:', (generated_at or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')],
             ['Analysis Type:', 'EVPI & EVPPI'],
         ]
 
@@ -1293,3 +1310,35 @@ class ReportService:
 
 # Global instance
 report_service = ReportService()
+
+
+def render_report(method: str, **kwargs) -> bytes:
+    """
+    report_service.<method>(**kwargs) as a plain function, so it can be sent
+    to a compute worker process (the service instance itself is not picklable)
+    """
+    return getattr(report_service, method)(**kwargs)
+
+
+def render_analysis_report(
+    analysis: Callable[[dict], dict], method: str, parameters: dict, **kwargs
+) -> Tuple[dict, bytes]:
+    """
+    Run analysis(parameters) and render its results with render_report, as
+    one compute job, so the results are not pickled out again for the render.
+    Returns (results, pdf) so the caller can cache the results as well.
+    """
+    results = analysis(parameters)
+    return results, render_report(method, parameters=parameters, results=results, **kwargs)
+
+
+def render_report_file(method: str, path: str, **kwargs) -> None:
+    """
+    render_report written straight to the file at path, which the caller
+    creates, streams and deletes, so the document is never held in memory or
+    pickled back from the worker as one bytes object. The file is opened
+    without creating it: if the caller has already given up and removed it,
+    nothing is left behind. Only for methods that take an `output` file.
+    """
+    with open(path, "r+b") as output:
+        getattr(report_service, method)(output=output, **kwargs)
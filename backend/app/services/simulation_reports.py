@@ -0,0 +1,89 @@
+"""
+Report inputs for a stored simulation.
+
+Shared by the /reports endpoints, which render in the request, and the
+Celery reports task, which renders queued report jobs. Both pass the
+keyword arguments built here to report_service.generate_pdf_report /
+generate_excel_report, so the two paths produce the same document.
+"""
+from typing import Optional
+
+from app.models.scenario import Scenario
+from app.models.simulation import Simulation
+
+PDF_MEDIA_TYPE = "application/pdf"
+EXCEL_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Per-strategy result fields passed to report_service
+RESULT_FIELDS = ('total_costs', 'total_qalys', 'life_years', 'discounted_costs', 'discounted_qalys')
+
+
+def _strategy_results(results: dict, strategy: str) -> dict:
+    """Pick the report fields for one strategy, defaulting missing values to 0"""
+    strategy_results = results.get(strategy) or {}
+    return {field: strategy_results.get(field, 0) for field in RESULT_FIELDS}
+
+
+def _psa_summary(sensitivity_results: dict) -> dict:
+    """PSA summary block expected by report_service"""
+    percentiles = sensitivity_results.get('percentiles') or {}
+    return {
+        'mean_icer': sensitivity_results.get('mean_icer', 0),
+        'percentiles': {
+            'p2_5': percentiles.get('p2_5', 0),
+            'p50': percentiles.get('p50', 0),
+            'p97_5': percentiles.get('p97_5', 0),
+        },
+        'prob_cost_effective': sensitivity_results.get('prob_cost_effective', 0),
+        'n_iterations': sensitivity_results.get('n_iterations', 1000),
+    }
+
+
+def report_filename(scenario: Scenario, simulation: Simulation, extension: str) -> str:
+    """Download filename for a simulation report"""
+    return f"ecomodel_report_{scenario.name.replace(' ', '_')}_{str(simulation.id)[:8]}.{extension}"
+
+
+def pdf_report_kwargs(simulation: Simulation, scenario: Scenario, organization: Optional[str]) -> dict:
+    """generate_pdf_report arguments (all but user_email and output)"""
+    # PSA results if available
+    psa_results = None
+    if simulation.simulation_type == "PSA" and simulation.sensitivity_results:
+        psa_results = _psa_summary(simulation.sensitivity_results)
+
+    results = simulation.results or {}
+    return {
+        'scenario_name': scenario.name,
+        'organization': organization or "N/A",
+        'parameters': simulation.input_snapshot or scenario.parameter_values,
+        'results_drug_a': _strategy_results(results, 'drug_a'),
+        'results_drug_b': _strategy_results(results, 'drug_b'),
+        'psa_results': psa_results,
+    }
+
+
+def excel_report_kwargs(
+    simulation: Simulation,
+    scenario: Scenario,
+    include_psa: bool = False,
+    include_tornado: bool = False,
+) -> dict:
+    """generate_excel_report arguments (all but user_email and output)"""
+    psa_results = None
+    tornado_results = None
+
+    if include_psa and simulation.simulation_type == "PSA" and simulation.sensitivity_results:
+        psa_results = _psa_summary(simulation.sensitivity_results)
+
+    if include_tornado and simulation.simulation_type == "TORNADO" and simulation.sensitivity_results:
+        tornado_results = simulation.sensitivity_results
+
+    results = simulation.results or {}
+    return {
+        'scenario_name': scenario.name,
+        'parameters': simulation.input_snapshot or scenario.parameter_values,
+        'results_drug_a': _strategy_results(results, 'drug_a'),
+        'results_drug_b': _strategy_results(results, 'drug_b'),
+        'psa_results': psa_results,
+        'tornado_results': tornado_results,
+    }
@@ -0,0 +1,36 @@
+"""
+Celery application for long-running simulations and reports.
+
+Started by the celery_worker service in docker/docker-compose.yml. The API only
+hands work to it when settings.CELERY_ENABLED is set and celery is installed;
+otherwise simulations and reports run inside the request as before.
+"""
+import logging
+
+from app.config import settings
+
+try:
+    from celery import Celery
+    CELERY_AVAILABLE = True
+except ImportError as e:
+    CELERY_AVAILABLE = False
+    if settings.CELERY_ENABLED:
+        logging.warning(f"celery not available. Simulations and reports will run inline. Error: {e}")
+
+celery_app = None
+if CELERY_AVAILABLE:
+    celery_app = Celery(
+        "ecomodel",
+        broker=settings.REDIS_URL,
+        include=["app.tasks.simulations", "app.tasks.reports"],
+    )
+    celery_app.conf.task_ignore_result = True
+    celery_app.conf.task_routes = {
+        "app.tasks.simulations.*": {"queue": "simulations_heavy"},
+        "app.tasks.reports.*": {"queue": "reports"},
+    }
+
+
+def queue_enabled() -> bool:
+    """Whether simulations and reports should be enqueued for the worker instead of run inline"""
+    return celery_app is not None and settings.CELERY_ENABLED
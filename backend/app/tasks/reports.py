@@ -0,0 +1,103 @@
+"""
+Simulation reports rendered by the Celery worker (reports queue).
+
+The API stores a PENDING ReportJob and enqueues run_report_task with the
+job id; the worker renders the document into the job row, where
+GET /reports/jobs/{id}/download picks it up.
+"""
+import io
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.organization import Organization
+from app.models.report import ReportFormat, ReportJob, ReportJobStatus
+from app.models.scenario import Scenario
+from app.models.simulation import Simulation
+from app.models.user import User
+from app.services.report_service import report_service
+from app.services.simulation_reports import excel_report_kwargs, pdf_report_kwargs, report_filename
+from app.tasks.celery_app import celery_app
+
+
+def render_report_job(db: Session, job: ReportJob) -> None:
+    """Render the job's report into job.content and job.filename (caller commits)"""
+    simulation, scenario = (
+        db.query(Simulation, Scenario)
+        .join(Scenario, Scenario.id == Simulation.scenario_id)
+        .filter(Simulation.id == job.simulation_id)
+        .one()
+    )
+    user_email, organization = (
+        db.query(User.email, Organization.name)
+        .outerjoin(Organization, Organization.id == User.organization_id)
+        .filter(User.id == job.created_by_id)
+        .one()
+    )
+
+    buffer = io.BytesIO()
+    if job.format == ReportFormat.EXCEL.value:
+        options = job.options or {}
+        report_service.generate_excel_report(
+            user_email=user_email,
+            output=buffer,
+            **excel_report_kwargs(
+                simulation, scenario,
+                include_psa=options.get("include_psa", False),
+                include_tornado=options.get("include_tornado", False),
+            )
+        )
+        extension = "xlsx"
+    else:
+        report_service.generate_pdf_report(
+            user_email=user_email,
+            output=buffer,
+            **pdf_report_kwargs(simulation, scenario, organization)
+        )
+        extension = "pdf"
+
+    job.content = buffer.getvalue()
+    job.filename = report_filename(scenario, simulation, extension)
+
+
+def fail_report_job(db: Session, job: ReportJob, error: Exception) -> None:
+    """
+    Store a report job that could not be rendered or queued as FAILED and
+    commit. The session is rolled back first: the error may have come from a
+    flush and left the transaction unusable.
+    """
+    db.rollback()
+    job.status = ReportJobStatus.FAILED.value
+    job.error_message = str(error)
+    job.completed_at = datetime.now(timezone.utc)
+    db.commit()
+
+
+def run_report_job(job_id: str) -> None:
+    """Worker entry point: render a queued report job and store the outcome"""
+    db = SessionLocal()
+    try:
+        job = db.get(ReportJob, job_id)
+        if job is None:
+            return
+        job.status = ReportJobStatus.GENERATING.value
+        db.commit()
+
+        try:
+            render_report_job(db, job)
+            job.status = ReportJobStatus.COMPLETED.value
+            job.completed_at = datetime.now(timezone.utc)
+            db.commit()
+        except Exception as e:
+            fail_report_job(db, job, e)
+    finally:
+        db.close()
+
+
+# Registered only when celery is installed (see celery_app.queue_enabled)
+run_report_task = (
+    celery_app.task(name="app.tasks.reports.run_report_task")(run_report_job)
+    if celery_app is not None
+    else None
+)
@@ -0,0 +1,112 @@
+"""
+Probabilistic sensitivity analysis runs, shared by the inline endpoint path
+and the Celery worker.
+"""
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import insert, inspect
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.simulation import Simulation, SimulationPSASample, SimulationStatus
+from app.tasks.celery_app import celery_app
+from engine.markov.core import run_markov_analysis
+from engine.sensitivity.probabilistic import run_psa
+
+
+def psa_distributions(parameter_values: Dict) -> Dict[str, Dict]:
+    """Distributions sampled by the PSA for a scenario's parameter values"""
+    return {
+        "cost_drug_a": {"type": "gamma", "shape": 10, "scale": parameter_values.get("cost_drug_a", 3500) / 10},
+        "prob_s_to_p_a": {"type": "beta", "alpha": 10, "beta": 90},
+        "utility_stable": {"type": "beta", "alpha": 85, "beta": 15},
+        "utility_progression": {"type": "beta", "alpha": 50, "beta": 50},
+    }
+
+
+def execute_psa(
+    db: Session,
+    simulation: Simulation,
+    parameter_values: Dict,
+    iterations: int,
+    seed: Optional[int] = None
+) -> None:
+    """
+    Run the PSA plus the base case and store the results (caller commits).
+    The simulation keeps the summary and CEAC; every iteration goes to
+    simulation_psa_samples instead of the sensitivity_results JSON.
+    """
+    start_time = time.time()
+    psa_results = run_psa(
+        parameter_values,
+        psa_distributions(parameter_values),
+        n_iterations=iterations,
+        seed=seed,
+        max_returned_iterations=None
+    )
+    execution_time = int((time.time() - start_time) * 1000)
+
+    # Also run base case
+    base_results = run_markov_analysis(parameter_values)
+
+    samples = psa_results.pop("psa_iterations")
+
+    simulation.status = SimulationStatus.COMPLETED
+    simulation.results = base_results
+    simulation.sensitivity_results = {"psa": psa_results}
+    simulation.execution_time_ms = execution_time
+    simulation.completed_at = datetime.utcnow()
+
+    # The samples reference the simulation row, so write it first
+    db.flush()
+    if samples:
+        db.execute(
+            insert(SimulationPSASample),
+            [{"simulation_id": simulation.id, **sample} for sample in samples]
+        )
+
+
+def fail_simulation(db: Session, simulation: Simulation, error: Exception) -> None:
+    """
+    Store a simulation whose run raised as FAILED and commit. The error may
+    come from a flush (execute_psa writes the samples itself), which leaves
+    the session unusable until it is rolled back, so the run's changes are
+    discarded first and only the failure is written.
+    """
+    db.rollback()
+    if inspect(simulation).transient:
+        # Added in the failed transaction; the rollback discarded its INSERT
+        db.add(simulation)
+    simulation.status = SimulationStatus.FAILED
+    simulation.results = None
+    simulation.sensitivity_results = None
+    simulation.completed_at = None
+    simulation.error_message = str(error)
+    db.commit()
+
+
+def run_psa_simulation(simulation_id: str, iterations: int, seed: Optional[int] = None) -> None:
+    """Worker entry point: run a queued PSA against its input snapshot"""
+    db = SessionLocal()
+    try:
+        simulation = db.get(Simulation, simulation_id)
+        if simulation is None:
+            return
+
+        try:
+            execute_psa(db, simulation, simulation.input_snapshot or {}, iterations, seed)
+            db.commit()
+        except Exception as e:
+            fail_simulation(db, simulation, e)
+    finally:
+        db.close()
+
+
+# Registered only when celery is installed (see celery_app.queue_enabled)
+run_psa_task = (
+    celery_app.task(name="app.tasks.simulations.run_psa_task")(run_psa_simulation)
+    if celery_app is not None
+    else None
+)
@@ -1,7 +1,11 @@
 import numpy as np
-from typing import Dict, List, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+# Distinct parameter sets whose Markov results are kept in memory
+MARKOV_CACHE_SIZE = 1024
+
 
 @dataclass
 class MarkovConfig:
@@ -34,6 +38,11 @@ class ComparisonResults:
     conclusion: str
 
 
+def _running_total(values: np.ndarray) -> float:
+    """Sum of values added left to right, 0.0 when empty"""
+    return float(np.cumsum(values)[-1]) if len(values) else 0.0
+
+
 class MarkovModel:
     """
     Three-state Markov model for pharmacoeconomic evaluation
@@ -116,41 +125,38 @@ class MarkovModel:
         utility_stable = params.get("utility_stable", 0.85)
         utility_progression = params.get("utility_progression", 0.50)
 
-        total_cost = 0.0
-        total_qalys = 0.0
-        total_life_years = 0.0
+        # All cycles at once, one array element per cycle (cycle 0 is the start state)
+        cycles = np.arange(1, self.n_cycles + 1)
 
-        for cycle in range(1, self.n_cycles + 1):
-            # Discount factor
-            discount_factor_cost = 1 / ((1 + self.config.discount_rate_costs) ** cycle)
-            discount_factor_qaly = 1 / ((1 + self.config.discount_rate_outcomes) ** cycle)
-
-            # Number of patients in each state
-            n_stable = trace[cycle][0]
-            n_progression = trace[cycle][1]
-            n_death = trace[cycle][2]
-            n_alive = n_stable + n_progression
-
-            # Costs for this cycle
-            cycle_cost = (
-                (n_stable + n_progression) * cost_drug +  # Drug cost for alive patients
-                n_stable * cost_state_s +  # Monitoring cost stable
-                n_progression * cost_state_p  # Event cost progression
-            )
-            total_cost += cycle_cost * discount_factor_cost
-
-            # QALYs for this cycle
-            cycle_qalys = (
-                n_stable * utility_stable +
-                n_progression * utility_progression
-            )
-            total_qalys += cycle_qalys * discount_factor_qaly
-
-            # Life years
-            total_life_years += n_alive
+        # Discount factor
+        discount_factor_cost = 1 / ((1 + self.config.discount_rate_costs) ** cycles)
+        discount_factor_qaly = 1 / ((1 + self.config.discount_rate_outcomes) ** cycles)
+
+        # Number of patients in each state
+        n_stable = trace[1:, 0]
+        n_progression = trace[1:, 1]
+        n_alive = n_stable + n_progression
+
+        # Costs per cycle
+        cycle_cost = (
+            (n_stable + n_progression) * cost_drug +  # Drug cost for alive patients
+            n_stable * cost_state_s +  # Monitoring cost stable
+            n_progression * cost_state_p  # Event cost progression
+        )
+
+        # QALYs per cycle
+        cycle_qalys = (
+            n_stable * utility_stable +
+            n_progression * utility_progression
+        )
+
+        # cumsum adds in cycle order, so totals match a running sum bit for bit
+        # (np.sum uses pairwise summation)
+        total_cost = _running_total(cycle_cost * discount_factor_cost)
+        total_qalys = _running_total(cycle_qalys * discount_factor_qaly)
 
         # Convert life years to actual years (divide by cohort size)
-        total_life_years = total_life_years / self.config.cohort_size
+        total_life_years = _running_total(n_alive) / self.config.cohort_size
 
         return StrategyResults(
             total_cost=round(total_cost, 2),
@@ -212,7 +218,42 @@ def run_markov_analysis(params: Dict) -> Dict:
     """
     Main entry point for Markov analysis
     Returns results as dictionary for JSON serialization
+
+    Results are memoized per parameter set (tornado pivots, repeated base
+    cases); callers get their own copy and may modify it.
     """
+    try:
+        # Value types are part of the key: 10 and 10.0 do not behave the same here
+        key = tuple(sorted((name, type(value), value) for name, value in params.items()))
+        result = _cached_markov_analysis(key)
+    except TypeError:
+        # Unhashable or unorderable parameter values; run uncached
+        return _run_markov_analysis(params)
+    return _copy_result(result)
+
+
+@lru_cache(maxsize=MARKOV_CACHE_SIZE)
+def _cached_markov_analysis(key: Tuple) -> Dict:
+    return _run_markov_analysis({name: value for name, _, value in key})
+
+
+def _copy_result(result: Dict) -> Dict:
+    """Copy of a run_markov_analysis result, down to the state trace rows"""
+    return {
+        "status": result["status"],
+        "summary": dict(result["summary"]),
+        "drug_a_results": {
+            **result["drug_a_results"],
+            "state_trace": [list(row) for row in result["drug_a_results"]["state_trace"]],
+        },
+        "drug_b_results": {
+            **result["drug_b_results"],
+            "state_trace": [list(row) for row in result["drug_b_results"]["state_trace"]],
+        },
+    }
+
+
+def _run_markov_analysis(params: Dict) -> Dict:
     config = MarkovConfig(
         time_horizon=params.get("time_horizon", 10),
         discount_rate_costs=params.get("discount_rate", 0.03),
@@ -260,12 +301,128 @@ def run_markov_analysis(params: Dict) -> Dict:
             "total_cost": float(results.strategy_a.total_cost),
             "total_qalys": float(results.strategy_a.total_qalys),
             "life_years": float(results.strategy_a.life_years),
-            "state_trace": [[float(x) for x in row] for row in results.strategy_a.state_trace]
+            "state_trace": results.strategy_a.state_trace  # Already Python floats (ndarray.tolist)
         },
         "drug_b_results": {
             "total_cost": float(results.strategy_b.total_cost),
             "total_qalys": float(results.strategy_b.total_qalys),
             "life_years": float(results.strategy_b.life_years),
-            "state_trace": [[float(x) for x in row] for row in results.strategy_b.state_trace]
+            "state_trace": results.strategy_b.state_trace
         }
     }
+
+
+def _batch_strategy_outcomes(
+    p_sp, p_sd, p_pd, cost_drug, cost_state_s, cost_state_p,
+    utility_stable, utility_progression,
+    n_cycles: int, discount_rate, cohort_size, n: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Unrounded total cost and per-patient QALYs of one strategy for n parameter
+    sets at once. Mirrors MarkovModel.run_cohort_simulation/calculate_outcomes,
+    stepping the cycles in the same order with every array running over the sets.
+    """
+    p_ss = 1.0 - p_sp - p_sd
+    p_pp = 1.0 - p_pd
+
+    n_stable = np.zeros(n) + cohort_size
+    n_progression = np.zeros(n)
+
+    total_cost = np.zeros(n)
+    total_qalys = np.zeros(n)
+
+    for cycle in range(1, n_cycles + 1):
+        # Death is absorbing and carries no cost or utility, so only S and P are tracked
+        n_stable, n_progression = n_stable * p_ss, n_stable * p_sp + n_progression * p_pp
+
+        discount_factor = 1 / ((1 + discount_rate) ** cycle)
+
+        cycle_cost = (
+            (n_stable + n_progression) * cost_drug +
+            n_stable * cost_state_s +
+            n_progression * cost_state_p
+        )
+        total_cost = total_cost + cycle_cost * discount_factor
+
+        cycle_qalys = (
+            n_stable * utility_stable +
+            n_progression * utility_progression
+        )
+        total_qalys = total_qalys + cycle_qalys * discount_factor
+
+    return total_cost, total_qalys / cohort_size
+
+
+def run_markov_summary_batch(
+    params: Dict,
+    samples: Dict[str, np.ndarray],
+    n: int
+) -> List[Optional[Dict]]:
+    """
+    Summary (delta_cost, delta_qaly, icer) of run_markov_analysis for n sampled
+    parameter sets, computed with array arithmetic instead of n model runs.
+
+    Args:
+        params: Base parameters
+        samples: Arrays of length n overriding individual parameters
+        n: Number of parameter sets
+
+    Returns:
+        One summary per set, or None where the transition probabilities are invalid
+
+    The cycle count (time_horizon) is fixed for a batch and always read from params.
+    """
+    def value(name, default):
+        return samples[name] if name in samples else params.get(name, default)
+
+    n_cycles = params.get("time_horizon", 10) // 1
+    discount_rate = value("discount_rate", 0.03)
+    cohort_size = value("cohort_size", 1000)
+
+    prob_s_to_d = value("prob_s_to_d", 0.02)
+    prob_p_to_d = value("prob_p_to_d", 0.15)
+    cost_state_s = value("cost_state_s", 200)
+    cost_state_p = value("cost_state_p", 4500)
+    utility_stable = value("utility_stable", 0.85)
+    utility_progression = value("utility_progression", 0.50)
+
+    prob_s_to_p_a = value("prob_s_to_p_a", 0.10)
+    prob_s_to_p_b = value("prob_s_to_p_b", 0.25)
+
+    cost_a, qalys_a = _batch_strategy_outcomes(
+        prob_s_to_p_a, prob_s_to_d, prob_p_to_d, value("cost_drug_a", 3500),
+        cost_state_s, cost_state_p, utility_stable, utility_progression,
+        n_cycles, discount_rate, cohort_size, n
+    )
+    cost_b, qalys_b = _batch_strategy_outcomes(
+        prob_s_to_p_b, prob_s_to_d, prob_p_to_d, value("cost_drug_b", 500),
+        cost_state_s, cost_state_p, utility_stable, utility_progression,
+        n_cycles, discount_rate, cohort_size, n
+    )
+
+    # Same rule as build_transition_matrix, which raises for these sets
+    invalid = (
+        (np.zeros(n) + prob_s_to_p_a + prob_s_to_d > 1.0) |
+        (np.zeros(n) + prob_s_to_p_b + prob_s_to_d > 1.0)
+    )
+
+    # Round per set exactly as compare_strategies does
+    summaries = []
+    for is_invalid, ca, qa, cb, qb in zip(
+        invalid.tolist(), cost_a.tolist(), qalys_a.tolist(), cost_b.tolist(), qalys_b.tolist()
+    ):
+        if is_invalid:
+            summaries.append(None)
+            continue
+
+        delta_cost = round(ca, 2) - round(cb, 2)
+        delta_qaly = round(qa, 4) - round(qb, 4)
+        icer = delta_cost / delta_qaly if delta_qaly != 0 else None
+
+        summaries.append({
+            "delta_cost": round(delta_cost, 2),
+            "delta_qaly": round(delta_qaly, 4),
+            "icer": round(icer, 2) if icer is not None else None,
+        })
+
+    return summaries
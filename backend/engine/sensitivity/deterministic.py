@@ -1,20 +1,26 @@
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Optional
 from engine.markov.core import run_markov_analysis
 
 
-def tornado_analysis(base_params: Dict, param_ranges: Dict) -> Dict:
+def tornado_analysis(
+    base_params: Dict,
+    param_ranges: Dict,
+    base_result: Optional[Dict] = None
+) -> Dict:
     """
     Perform tornado diagram analysis (one-way sensitivity analysis)
 
     Args:
         base_params: Base case parameter values
         param_ranges: Dict of {param_name: (low_value, high_value)}
+        base_result: run_markov_analysis(base_params), if the caller already has it
 
     Returns:
         Dict with tornado chart data sorted by impact
     """
-    base_result = run_markov_analysis(base_params)
+    if base_result is None:
+        base_result = run_markov_analysis(base_params)
     base_icer = base_result["summary"]["icer"]
 
     tornado_data = []
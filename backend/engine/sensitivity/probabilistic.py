@@ -1,10 +1,14 @@
 import numpy as np
-from typing import Dict, List, Callable
+from typing import Dict, List, Callable, Optional, Union
 # from scipy import stats  # Not needed - using numpy distributions
-from engine.markov.core import run_markov_analysis
+from engine.markov.core import run_markov_summary_batch
 
 
-def sample_from_distribution(dist_config: Dict, rng: np.random.Generator) -> float:
+def sample_from_distribution(
+    dist_config: Dict,
+    rng: np.random.Generator,
+    size: Optional[int] = None
+) -> Union[float, np.ndarray]:
     """
     Sample a value from a statistical distribution
 
@@ -12,28 +16,30 @@ def sample_from_distribution(dist_config: Dict, rng: np.random.Generator) -> flo
     - beta: for probabilities
     - gamma: for costs
     - normal: for utilities
+
+    With size, returns an array of that many draws from one generator call.
     """
     dist_type = dist_config.get("type", "normal")
 
     if dist_type == "beta":
         alpha = dist_config.get("alpha", 1)
         beta = dist_config.get("beta", 1)
-        return rng.beta(alpha, beta)
+        return rng.beta(alpha, beta, size)
 
     elif dist_type == "gamma":
         shape = dist_config.get("shape", 1)
         scale = dist_config.get("scale", 1)
-        return rng.gamma(shape, scale)
+        return rng.gamma(shape, scale, size)
 
     elif dist_type == "normal":
         mean = dist_config.get("mean", 0)
         std = dist_config.get("std", 1)
-        return rng.normal(mean, std)
+        return rng.normal(mean, std, size)
 
     elif dist_type == "lognormal":
         mean = dist_config.get("mean", 0)
         std = dist_config.get("std", 1)
-        return rng.lognormal(mean, std)
+        return rng.lognormal(mean, std, size)
 
     else:
         raise ValueError(f"Unsupported distribution type: {dist_type}")
@@ -44,7 +50,8 @@ def run_psa(
     distributions: Dict[str, Dict],
     n_iterations: int = 1000,
     seed: int = None,
-    progress_callback: Callable = None
+    progress_callback: Callable = None,
+    max_returned_iterations: Optional[int] = 1000
 ) -> Dict:
     """
     Run Probabilistic Sensitivity Analysis (Monte Carlo simulation)
@@ -55,37 +62,37 @@ def run_psa(
         n_iterations: Number of Monte Carlo iterations
         seed: Random seed for reproducibility
         progress_callback: Optional callback function(iteration, total)
+        max_returned_iterations: Cap on psa_iterations in the result (None for all)
 
     Returns:
         Dict with PSA results including scatter cloud and CEAC data
     """
     rng = np.random.default_rng(seed)
 
-    psa_iterations = []
-
-    for i in range(n_iterations):
-        # Sample parameters from their distributions
-        sampled_params = base_params.copy()
-
-        for param_name, dist_config in distributions.items():
-            if param_name in base_params:
-                sampled_params[param_name] = sample_from_distribution(dist_config, rng)
+    # Draw every iteration's samples up front, one vectorized call per parameter
+    samples = {
+        param_name: sample_from_distribution(dist_config, rng, size=n_iterations)
+        for param_name, dist_config in distributions.items()
+        if param_name in base_params
+    }
 
-        # Run model with sampled parameters
-        try:
-            result = run_markov_analysis(sampled_params)
+    # Evaluate all iterations in one array pass over the Markov cycles
+    summaries = run_markov_summary_batch(base_params, samples, n_iterations)
 
-            psa_iterations.append({
-                "iteration": i + 1,
-                "delta_cost": result["summary"]["delta_cost"],
-                "delta_qaly": result["summary"]["delta_qaly"],
-                "icer": result["summary"]["icer"]
-            })
+    psa_iterations = []
 
-        except Exception as e:
-            # Skip invalid parameter combinations
+    for i, summary in enumerate(summaries):
+        # Skip invalid parameter combinations
+        if summary is None:
             continue
 
+        psa_iterations.append({
+            "iteration": i + 1,
+            "delta_cost": summary["delta_cost"],
+            "delta_qaly": summary["delta_qaly"],
+            "icer": summary["icer"]
+        })
+
         # Progress callback
         if progress_callback and i % 50 == 0:
             progress_callback(i + 1, n_iterations)
@@ -131,7 +138,7 @@ def run_psa(
             "ci_lower": round(ci_lower, 2) if ci_lower else None,
             "ci_upper": round(ci_upper, 2) if ci_upper else None
         },
-        "psa_iterations": psa_iterations[:1000],  # Limit to 1000 for response size
+        "psa_iterations": psa_iterations[:max_returned_iterations],  # Limited for response size
         "ceac_data": ceac_data
     }
 
@@ -145,31 +152,24 @@ def calculate_ceac(
 
     For each WTP threshold, calculate % of iterations where treatment is cost-effective
     """
-    ceac_data = []
-
-    for wtp in wtp_range:
-        cost_effective_count = 0
-
-        for iteration in psa_iterations:
-            icer = iteration.get("icer")
-            delta_cost = iteration.get("delta_cost")
-            delta_qaly = iteration.get("delta_qaly")
+    # Whole-curve pass: one (thresholds x iterations) comparison instead of a
+    # Python loop over every iteration for each threshold
+    delta_cost = np.array([it.get("delta_cost") for it in psa_iterations], dtype=float)
+    delta_qaly = np.array([it.get("delta_qaly") for it in psa_iterations], dtype=float)
+    icer = np.array([it.get("icer") for it in psa_iterations], dtype=float)  # None -> nan
+
+    # Treatment is cost-effective if:
+    # 1. ICER < WTP threshold (never true for a missing ICER)
+    # 2. OR it's dominant (lower cost, higher QALY)
+    dominant = (delta_cost < 0) & (delta_qaly > 0)
+    with np.errstate(invalid="ignore"):
+        below_wtp = icer[np.newaxis, :] < np.asarray(wtp_range)[:, np.newaxis]
+    cost_effective_counts = (below_wtp | dominant).sum(axis=1)
 
-            # Treatment is cost-effective if:
-            # 1. ICER < WTP threshold
-            # 2. OR it's dominant (lower cost, higher QALY)
-            is_cost_effective = False
-
-            if delta_cost < 0 and delta_qaly > 0:
-                # Dominant: cheaper and more effective
-                is_cost_effective = True
-            elif icer is not None and icer < wtp:
-                is_cost_effective = True
-
-            if is_cost_effective:
-                cost_effective_count += 1
+    ceac_data = []
 
-        prob_cost_effective = cost_effective_count / len(psa_iterations)
+    for wtp, cost_effective_count in zip(wtp_range, cost_effective_counts):
+        prob_cost_effective = int(cost_effective_count) / len(psa_iterations)
 
         ceac_data.append({
             "wtp": round(wtp, 2),
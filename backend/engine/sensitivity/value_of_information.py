@@ -336,18 +336,21 @@ def run_voi_analysis(params: Dict) -> Dict:
         voi.add_psa_results(psa_results)
     else:
         # Generar datos de ejemplo
-        np.random.seed(42)
+        rng = np.random.default_rng(42)
         n_iter = 1000
         strategies = ["Drug A", "Drug B"]
 
-        psa_results = []
-        for _ in range(n_iter):
-            # Parámetros con incertidumbre
-            cost_a = np.random.gamma(100, 35)
-            cost_b = np.random.gamma(100, 28)
-            eff_a = np.random.beta(85, 15)
-            eff_b = np.random.beta(75, 25)
+        # Parámetros con incertidumbre, una llamada por parámetro
+        cost_a_draws = rng.gamma(100, 35, n_iter)
+        cost_b_draws = rng.gamma(100, 28, n_iter)
+        eff_a_draws = rng.beta(85, 15, n_iter)
+        eff_b_draws = rng.beta(75, 25, n_iter)
 
+        psa_results = []
+        for cost_a, cost_b, eff_a, eff_b in zip(
+            cost_a_draws.tolist(), cost_b_draws.tolist(),
+            eff_a_draws.tolist(), eff_b_draws.tolist()
+        ):
             costs = {"Drug A": cost_a * 10, "Drug B": cost_b * 10}
             qalys = {"Drug A": eff_a * 8, "Drug B": eff_b * 8}
 
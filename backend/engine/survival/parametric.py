@@ -438,12 +438,12 @@ def run_survival_analysis(params: Dict) -> Dict:
     # Si no hay datos, usar ejemplo
     if not times:
         # Datos simulados de ejemplo
-        np.random.seed(42)
+        rng = np.random.default_rng(42)
         n = 100
         # Weibull con scale=5, shape=1.5
-        times = list(np.random.weibull(1.5, n) * 5)
+        times = list(rng.weibull(1.5, n) * 5)
         # 80% eventos, 20% censurados
-        events = list(np.random.binomial(1, 0.8, n))
+        events = list(rng.binomial(1, 0.8, n))
 
     data = SurvivalData(time=times, event=events)
 
@@ -82,4 +82,6 @@ python verify-users.py || echo "⚠️  User verification skipped"
 echo ""
 echo "🚀 Starting server..."
 cd /app/backend || { echo "Failed to cd to /app/backend"; exit 1; }
-exec uvicorn app.main:app --host 0.0.0.0 --port ${PORT:-8080}
+# uvloop/httptools come with uvicorn[standard]; name them so a missing one fails the boot
+# instead of silently falling back to the pure-Python asyncio loop and h11
+exec uvicorn app.main:app --host 0.0.0.0 --port ${PORT:-8080} --loop uvloop --http httptools